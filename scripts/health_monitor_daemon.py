@@ -16,6 +16,7 @@ os.chdir(project_root)
 sys.path.insert(0, str(project_root))
 
 from src.infrastructure import HealthMonitor, Alerting
+from src.infrastructure.http_client import close_session
 
 class HealthMonitorDaemon:
     """健康监控守护进程"""
@@ -72,10 +73,16 @@ class HealthMonitorDaemon:
                 await asyncio.sleep(60)
 
     def stop(self):
-        """停止守护进程"""
+        """停止守护进程（仅置位退出标志，资源在 aclose 中于事件循环内释放）"""
         logger.info("Stopping health monitor daemon...")
         self.running = False
-        self.health_monitor.cleanup()
+
+    async def aclose(self):
+        """释放健康检查缓存的 AI 客户端与当前事件循环的共享 HTTP 会话"""
+        try:
+            await self.health_monitor.aclose()
+        finally:
+            await close_session()
 
 
 async def main():
@@ -94,6 +101,8 @@ async def main():
     except KeyboardInterrupt:
         logger.info("Keyboard interrupt received")
         daemon.stop()
+    finally:
+        await daemon.aclose()
 
 
 if __name__ == "__main__":
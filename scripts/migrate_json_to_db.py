@@ -18,43 +18,54 @@ from src.core.database import DatabaseManager
 from src.core.data_repository import DataRepository
 
 
-def migrate_json_to_db(json_path: str = "data/trending.json", db_path: str = "data/trending.db"):
+def _iter_json_records(json_file: Path, backup_dir: Path):
+    """遍历旧版单文件与按 时间范围/日期 分区的备份文件，产出 (time_range, date_str, repos_dict)"""
+    if json_file.exists():
+        with open(json_file, 'r', encoding='utf-8') as f:
+            all_data = json.load(f)
+        for time_range, date_records in all_data.items():
+            for date_str, repos_dict in date_records.items():
+                yield time_range, date_str, repos_dict
+
+    if backup_dir.is_dir():
+        for day_file in sorted(backup_dir.glob("*/*.json")):
+            with open(day_file, 'r', encoding='utf-8') as f:
+                yield day_file.parent.name, day_file.stem, json.load(f)
+
+
+def migrate_json_to_db(json_path: str = "data/trending.json", db_path: str = "data/trending.db",
+                       backup_dir: str = "data/trending"):
     """迁移 JSON 数据到数据库"""
     json_file = Path(json_path)
+    backup_path = Path(backup_dir)
 
-    if not json_file.exists():
-        logger.warning(f"JSON file {json_path} not found, skipping migration")
+    if not json_file.exists() and not backup_path.is_dir():
+        logger.warning(f"JSON file {json_path} and backup dir {backup_dir} not found, skipping migration")
         return
 
-    logger.info(f"Starting migration from {json_path} to {db_path}...")
+    logger.info(f"Starting migration from {json_path} and {backup_dir} to {db_path}...")
 
     db_manager = DatabaseManager(db_path=db_path)
     db_manager.init_db()
     data_repo = DataRepository(db_manager)
 
     try:
-        with open(json_file, 'r', encoding='utf-8') as f:
-            all_data = json.load(f)
-
         total_migrated = 0
 
-        for time_range, date_records in all_data.items():
-            logger.info(f"Migrating {time_range} records...")
+        for time_range, date_str, repos_dict in _iter_json_records(json_file, backup_path):
+            try:
+                record_date = datetime.strptime(date_str, "%Y-%m-%d")
+            except ValueError:
+                logger.warning(f"Invalid date format: {date_str}, skipping")
+                continue
 
-            for date_str, repos_dict in date_records.items():
-                try:
-                    record_date = datetime.strptime(date_str, "%Y-%m-%d")
-                except ValueError:
-                    logger.warning(f"Invalid date format: {date_str}, skipping")
-                    continue
-
-                repos_list = []
-                for repo_name, repo_data in repos_dict.items():
-                    repos_list.append(repo_data)
-
-                count = data_repo.save_trending_data(repos_list, time_range, record_date)
-                total_migrated += count
-                logger.info(f"Migrated {count} records for {date_str} ({time_range})")
+            repos_list = []
+            for repo_name, repo_data in repos_dict.items():
+                repos_list.append(repo_data)
+
+            count = data_repo.save_trending_data(repos_list, time_range, record_date)
+            total_migrated += count
+            logger.info(f"Migrated {count} records for {date_str} ({time_range})")
 
         logger.success(f"Migration completed! Total {total_migrated} records migrated")
 
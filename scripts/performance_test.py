@@ -14,6 +14,7 @@ os.chdir(project_root)
 sys.path.insert(0, str(project_root))
 from src.collectors import AsyncScraperTrending, ScraperTrending
 from src.analyzers import AsyncAISummarizer
+from src.infrastructure.http_client import close_session
 
 
 async def test_async_scraper():
@@ -22,7 +23,10 @@ async def test_async_scraper():
     scraper = AsyncScraperTrending(max_concurrent=5)
 
     start_time = time.time()
-    results = await scraper.scrape_all_ranges(['daily'])
+    try:
+        results = await scraper.scrape_all_ranges(['daily'])
+    finally:
+        await close_session()
     elapsed = time.time() - start_time
 
     total_repos = sum(len(repos) for repos in results.values())
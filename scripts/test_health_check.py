@@ -12,6 +12,7 @@ project_root = Path(__file__).parent.parent
 os.chdir(project_root)
 sys.path.insert(0, str(project_root))
 from src.infrastructure import HealthMonitor
+from src.infrastructure.http_client import close_session
 
 
 async def main():
@@ -54,7 +55,8 @@ async def main():
         logger.error(f"Health check failed: {e}")
         raise
     finally:
-        monitor.cleanup()
+        await monitor.aclose()
+        await close_session()
 
 
 if __name__ == "__main__":
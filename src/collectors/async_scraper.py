@@ -14,6 +14,7 @@ from typing import List, Dict, Optional
 
 from ..constants import DEFAULT_TIMEOUT_SECONDS, DEFAULT_CRAWL_DELAY
 from .utils import parse_github_number
+from ..infrastructure.http_client import get_session
 
 try:
     from ..infrastructure.rate_limiter import AdaptiveRateLimiter
@@ -22,11 +23,11 @@ except ImportError:
     AdaptiveRateLimiter = None
 
 try:
-    from ..infrastructure.robots_checker import check_robots_permission, get_recommended_delay
+    from ..infrastructure.robots_checker import check_robots_permission_async, get_recommended_delay_async
 except ImportError:
     logger.warning("robots_checker module not found, robots.txt checking disabled")
-    def check_robots_permission(url): return True
-    def get_recommended_delay(url): return None
+    async def check_robots_permission_async(url): return True
+    async def get_recommended_delay_async(url): return None
 
 
 class AsyncScraperTrending:
@@ -46,18 +47,13 @@ class AsyncScraperTrending:
         self._session: Optional[aiohttp.ClientSession] = None
 
     async def _get_session(self) -> aiohttp.ClientSession:
-        """获取或创建复用的ClientSession"""
-        if self._session is None or self._session.closed:
-            connector = aiohttp.TCPConnector(limit=10, limit_per_host=5, ssl=self.ssl_context)
-            self._session = aiohttp.ClientSession(connector=connector)
-            logger.info("Created new aiohttp ClientSession with SSL verification")
+        """获取与健康检查共用的 ClientSession（并发由 semaphore 控制）"""
+        self._session = await get_session()
         return self._session
 
     async def close(self):
-        """关闭ClientSession释放资源"""
-        if self._session and not self._session.closed:
-            await self._session.close()
-            logger.info("Closed aiohttp ClientSession")
+        """释放对共享 ClientSession 的引用（会话由所属事件循环的持有者通过 close_session 关闭）"""
+        self._session = None
 
     async def __aenter__(self):
         """异步上下文管理器入口"""
@@ -78,7 +74,7 @@ class AsyncScraperTrending:
                     await self.rate_limiter.wait_async()
 
                 async with self.semaphore:
-                    async with session.get(url, headers=self.headers, timeout=self.timeout) as response:
+                    async with session.get(url, headers=self.headers, timeout=self.timeout, ssl=self.ssl_context) as response:
                         if response.status == 200:
                             if self.rate_limiter:
                                 await self.rate_limiter.record_success_async()
@@ -113,6 +109,7 @@ class AsyncScraperTrending:
         repos = []
         doc = pq(html)
         items = doc('article.Box-row').items()
+        today = datetime.now().date().isoformat()
 
         for item in items:
             try:
@@ -147,7 +144,7 @@ class AsyncScraperTrending:
                 stars_today_text = stars_today_elem.text().strip() if stars_today_elem else '0'
                 repo_info['stars_daily'] = parse_github_number(stars_today_text)
 
-                repo_info['updated_at'] = datetime.now().strftime('%Y-%m-%d')
+                repo_info['updated_at'] = today
 
                 repos.append(repo_info)
 
@@ -165,12 +162,12 @@ class AsyncScraperTrending:
             url = f'https://github.com/trending?since={since}'
 
         # 检查 robots.txt 权限
-        if not check_robots_permission(url):
+        if not await check_robots_permission_async(url):
             logger.error(f"Robots.txt disallows crawling: {url}")
             return []
 
         # 获取建议的爬取延迟
-        recommended_delay = get_recommended_delay(url)
+        recommended_delay = await get_recommended_delay_async(url)
         if recommended_delay:
             logger.info(f"Applying robots.txt recommended delay: {recommended_delay}s")
             await asyncio.sleep(recommended_delay)
@@ -25,6 +25,16 @@ TASK_TTL_SECONDS = 3600
 # 最大并发后台任务数量
 MAX_BACKGROUND_TASKS = 10
 
+# 任务历史异步写入：单批最大记录数与攒批等待时间（秒）
+TASK_HISTORY_BATCH_SIZE = 100
+TASK_HISTORY_FLUSH_INTERVAL = 0.5
+# 写入失败的批次保留重试的最大连续失败次数，超过后丢弃并记录错误
+TASK_HISTORY_MAX_RETRIES = 3
+
+# 定时任务失败后的最大尝试次数与重试间隔（秒）
+JOB_MAX_RETRIES = 3
+JOB_RETRY_DELAY = 60
+
 
 # ============================================================================
 # Email Configuration
@@ -33,6 +43,35 @@ MAX_BACKGROUND_TASKS = 10
 # 单封邮件最大推送项目数量
 MAX_EMAIL_PROJECTS = 25
 
+# AI 摘要 Markdown 渲染结果的进程内缓存条目数
+MARKDOWN_CACHE_SIZE = 2048
+
+# AI 摘要 Markdown 渲染结果磁盘缓存的最大文件数，每写入若干次检查一次是否超限
+MARKDOWN_DISK_CACHE_MAX_FILES = 10_000
+MARKDOWN_DISK_CACHE_PRUNE_INTERVAL = 200
+
+
+# ============================================================================
+# Database
+# ============================================================================
+
+# 仓库统计计数缓存时间（秒）- 计数粒度较粗，短时缓存即可
+REPOSITORY_STATS_CACHE_SECONDS = 30
+
+# 统计接口结果缓存时间（秒）- 数据每个抓取周期才变化一次
+STATS_CACHE_TTL_SECONDS = 3600
+
+# 历史统计缓存在当天结束后额外保留的宽限时间（秒）
+STATS_CACHE_GRACE_SECONDS = 300
+
+
+# ============================================================================
+# Filters
+# ============================================================================
+
+# 项目数超过该阈值时 Star 过滤改用 NumPy 向量化计算（需安装 numpy）
+STAR_FILTER_VECTORIZE_THRESHOLD = 500
+
 
 # ============================================================================
 # Display & UI
@@ -4,105 +4,170 @@
 数据仓库层 - 封装数据库操作
 """
 
+import time
 from loguru import logger
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from sqlalchemy import and_, func
+from sqlalchemy import bindparam, func, select
 from sqlalchemy.orm import Query
 from .database import DatabaseManager
-from ..constants import SUMMARY_PREVIEW_LENGTH
-from typing import List, Optional, Dict, Tuple, Any
+from ..constants import SUMMARY_PREVIEW_LENGTH, REPOSITORY_STATS_CACHE_SECONDS
+from typing import Iterator, Iterable, List, Optional, Dict, Set, Tuple, Any
 from .models import Repository, TrendingRecord, AISummary
 
 
 class DataRepository:
     """数据仓库 - 提供高层数据访问接口"""
 
+    # 分块流式读取的批大小；仅用于只读、不经过 identity map 的大结果集，写路径依赖分批提交
+    _STREAM_BATCH_SIZE = 500
+
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
+        self._stats_cache: Optional[Tuple[float, Dict]] = None
+
+        # 热点查询预先构建好语句对象，经 session.execute 执行：跳过 ORM 实体构建，
+        # 编译结果由 SQLAlchemy 语句缓存复用，且参数风格与类型转换交由当前方言处理
+        self._stmt_seen_projects = (
+            select(Repository.name).distinct()
+            .join(TrendingRecord, Repository.id == TrendingRecord.repository_id)
+            .where(TrendingRecord.time_range == bindparam('time_range'))
+        )
+        self._stmt_latest_summary = (
+            select(AISummary.summary_text)
+            .join(Repository, Repository.id == AISummary.repository_id)
+            .where(Repository.name == bindparam('repo_name'))
+            .order_by(AISummary.created_at.desc()).limit(1)
+        )
+        self._stmt_summary_with_metadata = (
+            select(AISummary.summary_text, AISummary.model_name, AISummary.created_at,
+                   Repository.description, Repository.last_updated_at)
+            .join(Repository, Repository.id == AISummary.repository_id)
+            .where(Repository.name == bindparam('repo_name'))
+            .order_by(AISummary.created_at.desc()).limit(1)
+        )
+        self._stmt_latest_stars = (
+            select(TrendingRecord.stars)
+            .join(Repository, Repository.id == TrendingRecord.repository_id)
+            .where(Repository.name == bindparam('repo_name'))
+            .order_by(TrendingRecord.record_date.desc()).limit(1)
+        )
 
     def save_trending_data(self, repos: List[Dict], time_range: str, record_date: Optional[datetime] = None, batch_size: int = 10) -> int:
         """保存趋势数据（分批处理避免长事务）"""
         if record_date is None:
             record_date = datetime.now()
+        now = datetime.now()
+
+        batches = [repos[i:i + batch_size] for i in range(0, len(repos), batch_size)]
+        total_batches = len(batches)
+
+        # SQLite 写入本身串行，并发只会加剧锁竞争；其他数据库按连接池大小并发提交各批次
+        if self.db.engine.dialect.name != 'sqlite' and total_batches > 1:
+            max_workers = min(self.db.engine.pool.size(), total_batches)
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                futures = [executor.submit(self._save_batch, batch, time_range, record_date, now) for batch in batches]
+                saved_count = sum(future.result() for future in futures)
+        else:
+            saved_count = 0
+            for batch_idx, batch in enumerate(batches):
+                saved_count += self._save_batch(batch, time_range, record_date, now)
+                logger.debug(f"Batch {batch_idx + 1}/{total_batches} saved")
+
+        self._stats_cache = None
+        logger.info(f"Saved {saved_count} new trending records for {time_range}")
+        return saved_count
 
+    def _save_batch(self, batch_repos: List[Dict], time_range: str, record_date: datetime, now: datetime) -> int:
+        """在独立会话中保存单个批次，返回新增记录数"""
         saved_count = 0
-        total_batches = (len(repos) + batch_size - 1) // batch_size
-
-        for batch_idx in range(total_batches):
-            start_idx = batch_idx * batch_size
-            end_idx = min((batch_idx + 1) * batch_size, len(repos))
-            batch_repos = repos[start_idx:end_idx]
-
-            with self.db.get_session() as session:
-                # 1. 批量查询 Repositories
-                repo_names = [r['name'] for r in batch_repos]
-                existing_repos = session.query(Repository).filter(Repository.name.in_(repo_names)).all()
-                repo_map = {r.name: r for r in existing_repos}
-
-                # 2. 更新或创建 Repositories
-                current_batch_repos = []  # 保存当前批次的 repo 对象，用于后续查询记录
-                for repo_data in batch_repos:
-                    name = repo_data['name']
-                    repo = repo_map.get(name)
-
-                    if not repo:
-                        repo = Repository(
-                            name=name,
-                            url=repo_data['url'],
-                            description=repo_data.get('description', ''),
-                            language=repo_data.get('language', '')
-                        )
-                        session.add(repo)
-                        # 注意：此时 repo.id 为 None，需要 flush
-                        repo_map[name] = repo
-                    else:
-                        repo.description = repo_data.get('description', repo.description)
-                        repo.language = repo_data.get('language', repo.language)
-                        repo.last_updated_at = datetime.now()
-
-                    current_batch_repos.append(repo)
-
-                # 提交以获取新创建的 repo.id
-                session.flush()
-
-                # 3. 批量查询 TrendingRecords
-                repo_ids = [r.id for r in current_batch_repos]
-                existing_records = session.query(TrendingRecord).filter(
-                    TrendingRecord.repository_id.in_(repo_ids),
-                    TrendingRecord.time_range == time_range,
-                    func.date(TrendingRecord.record_date) == record_date.date()
-                ).all()
-
-                record_map = {r.repository_id: r for r in existing_records}
-
-                # 4. 创建不存在的 TrendingRecords
-                for repo_data in batch_repos:
-                    repo = repo_map.get(repo_data['name'])
-                    if not repo:
-                        continue # Should not happen
-
-                    if repo.id not in record_map:
-                        trending_record = TrendingRecord(
-                            repository_id=repo.id,
-                            time_range=time_range,
-                            record_date=record_date,
-                            stars=repo_data.get('stars', 0),
-                            forks=repo_data.get('forks', 0),
-                            stars_increment=repo_data.get('stars_daily', 0)
-                        )
-                        session.add(trending_record)
-                        saved_count += 1
-
-            logger.debug(f"Batch {batch_idx + 1}/{total_batches} saved")
+        with self.db.get_session() as session:
+            # 1. 批量查询 Repositories
+            repo_names = [r['name'] for r in batch_repos]
+            existing_repos = session.query(Repository).filter(Repository.name.in_(repo_names)).all()
+            repo_map = {r.name: r for r in existing_repos}
+
+            # 2. 更新或创建 Repositories
+            current_batch_repos = []  # 保存当前批次的 repo 对象，用于后续查询记录
+            for repo_data in batch_repos:
+                name = repo_data['name']
+                repo = repo_map.get(name)
+
+                if not repo:
+                    repo = Repository(
+                        name=name,
+                        url=repo_data['url'],
+                        description=repo_data.get('description', ''),
+                        language=repo_data.get('language', '')
+                    )
+                    session.add(repo)
+                    # 注意：此时 repo.id 为 None，需要 flush
+                    repo_map[name] = repo
+                else:
+                    repo.description = repo_data.get('description', repo.description)
+                    repo.language = repo_data.get('language', repo.language)
+                    repo.last_updated_at = now
+
+                current_batch_repos.append(repo)
+
+            # 提交以获取新创建的 repo.id
+            session.flush()
+
+            # 3. 批量查询 TrendingRecords
+            repo_ids = [r.id for r in current_batch_repos]
+            existing_records = session.query(TrendingRecord).filter(
+                TrendingRecord.repository_id.in_(repo_ids),
+                TrendingRecord.time_range == time_range,
+                func.date(TrendingRecord.record_date) == record_date.date()
+            ).all()
+
+            record_map = {r.repository_id: r for r in existing_records}
+
+            # 4. 创建不存在的 TrendingRecords
+            for repo_data in batch_repos:
+                repo = repo_map.get(repo_data['name'])
+                if not repo:
+                    continue # Should not happen
+
+                if repo.id not in record_map:
+                    trending_record = TrendingRecord(
+                        repository_id=repo.id,
+                        time_range=time_range,
+                        record_date=record_date,
+                        stars=repo_data.get('stars', 0),
+                        forks=repo_data.get('forks', 0),
+                        stars_increment=repo_data.get('stars_daily', 0)
+                    )
+                    session.add(trending_record)
+                    saved_count += 1
 
-        logger.info(f"Saved {saved_count} new trending records for {time_range}")
         return saved_count
 
-    def get_seen_projects(self, time_range: str) -> set:
+    def get_seen_projects(self, time_range: str) -> Set[str]:
         """获取指定时间范围内已见过的项目名称"""
-        with self.db.get_session() as session:
-            records = session.query(Repository.name).join(TrendingRecord).filter(TrendingRecord.time_range == time_range).distinct().all()
-            return {record[0] for record in records}
+        return set(self.iter_seen_project_names(time_range))
+
+    def iter_seen_project_names(self, time_range: str) -> Iterator[str]:
+        """分块流式遍历指定时间范围内已见过的项目名称"""
+        with self.db.get_read_session() as session:
+            result = session.execute(
+                self._stmt_seen_projects, {'time_range': time_range},
+                execution_options={'yield_per': self._STREAM_BATCH_SIZE}
+            )
+            for name in result.scalars():
+                yield name
+
+    def filter_seen_projects(self, time_range: str, names: Iterable[str]) -> Set[str]:
+        """返回 names 中在指定时间范围内已见过的项目名称（单条 IN 查询）"""
+        names = list(names)
+        if not names:
+            return set()
+        with self.db.get_read_session() as session:
+            rows = session.query(Repository.name).join(TrendingRecord).filter(
+                TrendingRecord.time_range == time_range,
+                Repository.name.in_(names)
+            ).distinct().all()
+            return {name for name, in rows}
 
     def _get_latest_date(self, session, time_range: str, start_date: Optional[datetime], end_date: Optional[datetime]) -> Optional[datetime]:
         """获取指定时间范围内的最新记录日期"""
@@ -114,8 +179,13 @@ class DataRepository:
         return latest_date_query.scalar()
 
     def _build_filter_query(self, session, time_range: str, target_date: datetime, language: Optional[str], min_stars: Optional[int]):
-        """构建过滤查询"""
-        query = session.query(TrendingRecord, Repository).join(Repository)
+        """构建过滤查询（仅选取所需列，不构建 ORM 实体）"""
+        query = session.query(
+            TrendingRecord.stars, TrendingRecord.forks, TrendingRecord.stars_increment,
+            TrendingRecord.time_range, TrendingRecord.record_date,
+            Repository.id.label('rid'), Repository.name, Repository.url,
+            Repository.description, Repository.language, AISummary.summary_text
+        ).select_from(TrendingRecord).join(Repository).outerjoin(AISummary, AISummary.id == Repository.latest_summary_id)
         query = query.filter(TrendingRecord.time_range == time_range, TrendingRecord.record_date == target_date)
         if language:
             query = query.filter(func.lower(Repository.language) == language.lower())
@@ -131,33 +201,28 @@ class DataRepository:
         query = query.order_by(TrendingRecord.record_date.desc(), TrendingRecord.stars_increment.desc())
         if limit > 0:
             query = query.limit(limit).offset(offset)
-        results_with_count = query.yield_per(50).all()
-        total = results_with_count[0][2] if results_with_count else 0
-        records_and_repos = [(row[0], row[1]) for row in results_with_count]
-        return records_and_repos, total
-
-    def _fetch_ai_summaries(self, session, repo_ids: List[int]) -> Dict[int, str]:
-        """批量获取最新的AI摘要"""
-        from sqlalchemy import func as sqla_func
-        latest_summary_subq = session.query(AISummary.repository_id, sqla_func.max(AISummary.created_at).label('max_created')).filter(AISummary.repository_id.in_(repo_ids)).group_by(AISummary.repository_id).subquery()
-        summaries = session.query(AISummary).join(latest_summary_subq, and_(AISummary.repository_id == latest_summary_subq.c.repository_id, AISummary.created_at == latest_summary_subq.c.max_created)).all()
-        return {s.repository_id: s.summary_text for s in summaries}
-
-    def _format_to_dicts(self, records_and_repos: List[Tuple], summary_map: Dict[int, str]) -> List[Dict]:
+        if 0 < limit <= 100:
+            # 小分页直接取回，避免流式游标的额外开销
+            rows = query.all()
+        else:
+            rows = query.yield_per(self._STREAM_BATCH_SIZE).all()
+        total = rows[0].total_count if rows else 0
+        return rows, total
+
+    def _format_to_dicts(self, rows: List[Tuple]) -> List[Dict]:
         """格式化记录为字典列表"""
         results = []
-        for record, repo in records_and_repos:
-            ai_summary = summary_map.get(repo.id)
+        for stars, forks, stars_increment, time_range, record_date, rid, name, url, description, language, ai_summary, _ in rows:
             results.append({
-                'name': repo.name,
-                'url': repo.url,
-                'description': repo.description,
-                'language': repo.language,
-                'stars': record.stars,
-                'forks': record.forks,
-                'stars_increment': record.stars_increment,
-                'time_range': record.time_range,
-                'record_date': record.record_date.strftime('%Y-%m-%d'),
+                'name': name,
+                'url': url,
+                'description': description,
+                'language': language,
+                'stars': stars,
+                'forks': forks,
+                'stars_increment': stars_increment,
+                'time_range': time_range,
+                'record_date': record_date.date().isoformat(),
                 'ai_summary': ai_summary,
                 'has_ai_analysis': ai_summary is not None,
             })
@@ -171,20 +236,18 @@ class DataRepository:
                              limit: int = 20,
                              offset: int = 0) -> Tuple[List[Dict], int]:
         """查询趋势记录（包含AI摘要，支持分页和过滤）"""
-        with self.db.get_session() as session:
+        with self.db.get_read_session() as session:
             target_date = self._get_latest_date(session, time_range, start_date, end_date)
             if not target_date:
                 return [], 0
 
             query = self._build_filter_query(session, time_range, target_date, language, min_stars)
-            records_and_repos, total = self._fetch_records_with_count(query, limit, offset)
+            rows, total = self._fetch_records_with_count(query, limit, offset)
 
-            if not records_and_repos:
+            if not rows:
                 return [], total
 
-            repo_ids = [repo.id for _, repo in records_and_repos]
-            summary_map = self._fetch_ai_summaries(session, repo_ids)
-            results = self._format_to_dicts(records_and_repos, summary_map)
+            results = self._format_to_dicts(rows)
 
             return results, total
 
@@ -204,47 +267,79 @@ class DataRepository:
             )
             session.add(summary)
 
+        self._stats_cache = None
         logger.info(f"AI summary saved for {repo_name}")
         return True
 
+    def save_ai_summaries_bulk(self, rows: List[Tuple[str, str, Optional[str]]]) -> int:
+        """批量保存AI摘要，rows 为 (repo_name, summary_text, model_name)，单事务提交，返回保存条数"""
+        if not rows:
+            return 0
+
+        with self.db.get_session() as session:
+            names = {name for name, _, _ in rows}
+            repo_ids = dict(session.query(Repository.name, Repository.id).filter(Repository.name.in_(names)).all())
+
+            summaries = []
+            for name, summary_text, model_name in rows:
+                repo_id = repo_ids.get(name)
+                if repo_id is None:
+                    logger.warning(f"Repository {name} not found, cannot save summary")
+                    continue
+                summaries.append(AISummary(repository_id=repo_id, summary_text=summary_text, model_name=model_name))
+
+            # 走 ORM 单位工作提交（而非 bulk_insert_mappings），保证 after_insert 同步 latest_summary_id
+            session.add_all(summaries)
+
+        self._stats_cache = None
+        logger.info(f"AI summaries saved: {len(summaries)}/{len(rows)}")
+        return len(summaries)
+
     def get_latest_summary(self, repo_name: str) -> Optional[str]:
         """获取最新的AI摘要"""
-        with self.db.get_session() as session:
-            result = session.query(AISummary.summary_text).join(Repository).filter(Repository.name == repo_name).order_by(AISummary.created_at.desc()).first()
-            return result[0] if result else None
+        with self.db.get_read_session() as session:
+            return session.execute(self._stmt_latest_summary, {'repo_name': repo_name}).scalar()
 
     def get_summary_with_metadata(self, repo_name: str) -> Optional[Dict]:
         """获取最新的AI摘要及元数据"""
-        with self.db.get_session() as session:
-            result = session.query(AISummary, Repository).join(Repository).filter(Repository.name == repo_name).order_by(AISummary.created_at.desc()).first()
+        with self.db.get_read_session() as session:
+            result = session.execute(self._stmt_summary_with_metadata, {'repo_name': repo_name}).first()
 
             if not result:
                 return None
 
-            summary, repo = result
+            summary_text, model_name, created_at, description, last_updated_at = result
             return {
-                'summary_text': summary.summary_text,
-                'model_name': summary.model_name,
-                'created_at': summary.created_at,
-                'description': repo.description,
-                'last_updated_at': repo.last_updated_at
+                'summary_text': summary_text,
+                'model_name': model_name,
+                'created_at': created_at,
+                'description': description,
+                'last_updated_at': last_updated_at
             }
 
     def get_latest_stars(self, repo_name: str) -> Optional[int]:
         """获取项目最新的Stars数"""
-        with self.db.get_session() as session:
-            result = session.query(TrendingRecord.stars).join(Repository).filter(Repository.name == repo_name).order_by(TrendingRecord.record_date.desc()).first()
-            return result[0] if result else None
-
-    def get_repository_stats(self) -> Dict:
-        """获取仓库统计信息"""
-        with self.db.get_session() as session:
-            total_repos = session.query(func.count(Repository.id)).scalar()
-            total_records = session.query(func.count(TrendingRecord.id)).scalar()
-            total_summaries = session.query(func.count(AISummary.id)).scalar()
-
-            return {
-                'total_repositories': total_repos,
-                'total_trending_records': total_records,
-                'total_ai_summaries': total_summaries
-            }
+        with self.db.get_read_session() as session:
+            return session.execute(self._stmt_latest_stars, {'repo_name': repo_name}).scalar()
+
+    def get_repository_stats(self, use_cache: bool = True) -> Dict:
+        """获取仓库统计信息（单条查询获取三项计数，结果短时缓存）"""
+        if use_cache and self._stats_cache is not None:
+            cached_at, cached_stats = self._stats_cache
+            if time.monotonic() - cached_at < REPOSITORY_STATS_CACHE_SECONDS:
+                return dict(cached_stats)
+
+        with self.db.get_read_session() as session:
+            total_repos, total_records, total_summaries = session.execute(select(
+                select(func.count(Repository.id)).scalar_subquery(),
+                select(func.count(TrendingRecord.id)).scalar_subquery(),
+                select(func.count(AISummary.id)).scalar_subquery()
+            )).one()
+
+        stats = {
+            'total_repositories': total_repos,
+            'total_trending_records': total_records,
+            'total_ai_summaries': total_summaries
+        }
+        self._stats_cache = (time.monotonic(), stats)
+        return dict(stats)
@@ -9,7 +9,7 @@ from .models import Base, set_encryption_functions
 from loguru import logger
 from contextlib import contextmanager
 from sqlalchemy.pool import QueuePool
-from sqlalchemy import create_engine, event
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker, scoped_session
 
 
@@ -33,7 +33,8 @@ class DatabaseManager:
             poolclass=QueuePool,
             pool_size=5,
             max_overflow=10,
-            pool_pre_ping=True
+            pool_pre_ping=True,
+            query_cache_size=500
         )
 
         # 启用 SQLite 外键约束
@@ -44,22 +45,48 @@ class DatabaseManager:
             cursor.close()
 
         self.SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=self.engine))
+        # 只读会话使用独立的线程本地注册表，AUTOCOMMIT 模式下不发起 BEGIN/COMMIT
+        read_engine = self.engine.execution_options(isolation_level="AUTOCOMMIT")
+        self.ReadSessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=read_engine))
 
         logger.info(f"Database initialized at {self.db_path}")
 
     def _init_encryption(self):
         """Initialize encryption functions (lazy import to avoid circular dependency)"""
         try:
-            from ..infrastructure.security import encrypt_sensitive, decrypt_sensitive
-            set_encryption_functions(encrypt_sensitive, decrypt_sensitive)
+            from ..infrastructure.security import (
+                encrypt_sensitive_bytes, decrypt_sensitive_bytes, encrypt_sensitive_many, decrypt_sensitive_many
+            )
+            set_encryption_functions(encrypt_sensitive_bytes, decrypt_sensitive_bytes, encrypt_sensitive_many, decrypt_sensitive_many)
         except ImportError:
             logger.warning("Security module not available, encryption disabled")
 
     def init_db(self):
         """初始化数据库表"""
         Base.metadata.create_all(bind=self.engine)
+        self._migrate_columns()
+        # create_all 不会为已存在的表补建索引，这里逐个补齐
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=self.engine, checkfirst=True)
         logger.info("Database tables created successfully")
 
+    def _migrate_columns(self):
+        """为已存在的表补齐新增列（create_all 不会修改已有表结构）"""
+        columns = {c['name'] for c in inspect(self.engine).get_columns('repositories')}
+        if 'latest_summary_id' not in columns:
+            with self.engine.begin() as conn:
+                conn.execute(text(
+                    "ALTER TABLE repositories ADD COLUMN latest_summary_id INTEGER "
+                    "REFERENCES ai_summaries(id) ON DELETE SET NULL"
+                ))
+                conn.execute(text(
+                    "UPDATE repositories SET latest_summary_id = ("
+                    "SELECT s.id FROM ai_summaries s WHERE s.repository_id = repositories.id "
+                    "ORDER BY s.created_at DESC, s.id DESC LIMIT 1)"
+                ))
+            logger.info("Added repositories.latest_summary_id column")
+
     def drop_all(self):
         """删除所有表（谨慎使用）"""
         Base.metadata.drop_all(bind=self.engine)
@@ -79,8 +106,23 @@ class DatabaseManager:
         finally:
             session.close()
 
+    @contextmanager
+    def get_read_session(self):
+        """获取只读数据库会话（上下文管理器，退出时不提交事务）"""
+        session = self.ReadSessionLocal()
+        session.info['readonly'] = True
+        try:
+            yield session
+        except Exception as e:
+            session.rollback()
+            logger.error(f"Database read session error: {e}")
+            raise
+        finally:
+            session.close()
+
     def close(self):
         """关闭数据库连接"""
         self.SessionLocal.remove()
+        self.ReadSessionLocal.remove()
         self.engine.dispose()
         logger.info("Database connections closed")
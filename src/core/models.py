@@ -5,9 +5,9 @@
 """
 
 from datetime import datetime, timezone
-from typing import Callable, Optional
+from typing import Callable, List, Optional
 from sqlalchemy.orm import relationship, declarative_base
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint, Boolean
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, UniqueConstraint, Boolean, LargeBinary, event, update
 from sqlalchemy.types import TypeDecorator
 
 
@@ -16,18 +16,44 @@ def utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 # 加密函数通过依赖注入方式设置，避免 core 层依赖 infrastructure
-_encrypt_func: Optional[Callable[[str], str]] = None
-_decrypt_func: Optional[Callable[[str], str]] = None
-
-def set_encryption_functions(encrypt_fn: Callable[[str], str], decrypt_fn: Callable[[str], str]):
-    """设置加密/解密函数（由 infrastructure 层调用）"""
-    global _encrypt_func, _decrypt_func
+# 密文以原始字节存储（BLOB），不做 base64 文本编码
+_encrypt_func: Optional[Callable[[str], bytes]] = None
+_decrypt_func: Optional[Callable[[bytes], str]] = None
+_encrypt_many_func: Optional[Callable[[List[Optional[str]]], List[Optional[bytes]]]] = None
+_decrypt_many_func: Optional[Callable[[List[Optional[bytes]]], List[Optional[str]]]] = None
+
+def set_encryption_functions(encrypt_fn: Callable[[str], bytes], decrypt_fn: Callable[[bytes], str],
+                             encrypt_many: Optional[Callable[[List[Optional[str]]], List[Optional[bytes]]]] = None,
+                             decrypt_many: Optional[Callable[[List[Optional[bytes]]], List[Optional[str]]]] = None):
+    """设置加密/解密函数（由 infrastructure 层调用），批量函数可选"""
+    global _encrypt_func, _decrypt_func, _encrypt_many_func, _decrypt_many_func
     _encrypt_func = encrypt_fn
     _decrypt_func = decrypt_fn
+    _encrypt_many_func = encrypt_many
+    _decrypt_many_func = decrypt_many
+
+def encrypt_values(values: List[Optional[str]]) -> List[Optional[bytes]]:
+    """批量加密一列值（整列只初始化一次密钥），未注入批量函数时逐个加密"""
+    if _encrypt_many_func is not None:
+        return _encrypt_many_func(values)
+    if _encrypt_func is None:
+        return list(values)
+    return [_encrypt_func(v) if v is not None else v for v in values]
+
+def decrypt_values(values: List[Optional[bytes]]) -> List[Optional[str]]:
+    """批量解密一列原始密文（配合绕过 EncryptedString 的原始列查询使用）"""
+    if _decrypt_many_func is not None:
+        return _decrypt_many_func(values)
+    if _decrypt_func is None:
+        return list(values)
+    return [_decrypt_func(v) if v is not None else v for v in values]
 
 class EncryptedString(TypeDecorator):
-    """Encrypted string type"""
-    impl = String
+    """Encrypted string type
+
+    单值读写逐行加解密；批量查询应以 type_coerce(column, LargeBinary) 读取原始密文，再用 decrypt_values 整列解密
+    """
+    impl = LargeBinary
     cache_ok = True
 
     def process_bind_param(self, value, dialect):
@@ -52,11 +78,18 @@ class Repository(Base):
     url = Column(String(512), nullable=False)
     description = Column(Text, nullable=True)
     language = Column(String(50), nullable=True, index=True)
-    first_seen_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
-    last_updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc), nullable=False)
+    first_seen_at = Column(DateTime, default=utc_now, nullable=False)
+    last_updated_at = Column(DateTime, default=utc_now, onupdate=utc_now, nullable=False)
+    # 反范式字段：最新 AI 摘要 ID，分页查询直接 LEFT JOIN，无需分组取最新
+    latest_summary_id = Column(Integer, ForeignKey('ai_summaries.id', ondelete='SET NULL', use_alter=True, name='fk_repo_latest_summary'), nullable=True, index=True)
 
     trending_records = relationship("TrendingRecord", back_populates="repository", cascade="all, delete-orphan")
-    ai_summaries = relationship("AISummary", back_populates="repository", cascade="all, delete-orphan")
+    ai_summaries = relationship("AISummary", back_populates="repository", cascade="all, delete-orphan", foreign_keys="AISummary.repository_id")
+
+    __table_args__ = (
+        # 语言过滤 JOIN 时可仅扫描索引
+        Index('idx_lang_id', 'language', 'id'),
+    )
 
     def __repr__(self):
         return f"<Repository(name='{self.name}', language='{self.language}')>"
@@ -81,6 +114,12 @@ class TrendingRecord(Base):
         UniqueConstraint('repository_id', 'time_range', 'record_date', name='uq_repo_range_date'),
         Index('idx_time_range_date', 'time_range', 'record_date'),
         Index('idx_repo_time_date', 'repository_id', 'time_range', 'record_date'),
+        # 分页查询的过滤与排序均由该索引覆盖，省去排序步骤
+        Index('idx_tr_rd_si_desc', 'time_range', record_date.desc(), stars_increment.desc()),
+        # 按仓库取最新记录（不区分时间范围）
+        Index('idx_repo_date_desc', 'repository_id', record_date.desc()),
+        # 统计查询（按日期范围聚合 stars）可仅扫描索引，无需回表
+        Index('idx_tr_range_date_stars', 'time_range', 'record_date', 'stars'),
     )
 
     def __repr__(self):
@@ -98,7 +137,7 @@ class AISummary(Base):
     created_at = Column(DateTime, default=utc_now, nullable=False)
     updated_at = Column(DateTime, default=utc_now, onupdate=utc_now, nullable=False)
 
-    repository = relationship("Repository", back_populates="ai_summaries")
+    repository = relationship("Repository", back_populates="ai_summaries", foreign_keys=[repository_id])
 
     __table_args__ = (
         Index('idx_repo_created', 'repository_id', 'created_at'),
@@ -108,6 +147,16 @@ class AISummary(Base):
         return f"<AISummary(repo='{self.repository.name if self.repository else None}', model='{self.model_name}')>"
 
 
+@event.listens_for(AISummary, "after_insert")
+def _update_latest_summary_id(mapper, connection, target):
+    """新摘要写入后同步 Repository.latest_summary_id"""
+    connection.execute(
+        update(Repository.__table__)
+        .where(Repository.__table__.c.id == target.repository_id)
+        .values(latest_summary_id=target.id)
+    )
+
+
 class TaskHistory(Base):
     """任务执行历史模型"""
     __tablename__ = 'task_history'
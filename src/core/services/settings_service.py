@@ -1,4 +1,3 @@
-import json
 from datetime import datetime
 from typing import Any, Optional
 from loguru import logger
@@ -10,6 +9,18 @@ from ...web.schemas import (
 )
 from ...infrastructure.config_manager import ConfigManager
 
+try:
+    import orjson
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+    _json_loads = orjson.loads
+except ImportError:
+    import json
+    _json_dumps = json.dumps
+    _json_loads = json.loads
+
 
 class SettingsService:
     def __init__(self, db_manager: DatabaseManager):
@@ -45,7 +56,7 @@ class SettingsService:
             settings = self._get_or_create_settings(session)
 
             # Email - 数据库优先，回退到 config.yaml
-            db_recipients = json.loads(settings.email_recipients) if settings.email_recipients else None
+            db_recipients = _json_loads(settings.email_recipients) if settings.email_recipients else None
             yaml_recipients = self._get_yaml_config('email', 'recipients', default=[])
             email = EmailSettings(
                 recipients=db_recipients if db_recipients is not None else yaml_recipients
@@ -73,8 +84,8 @@ class SettingsService:
 
             # Subscription - 数据库优先，回退到空列表（config.yaml 中无此配置）
             subscription = SubscriptionSettings(
-                keywords=json.loads(settings.subscription_keywords) if settings.subscription_keywords else [],
-                languages=json.loads(settings.subscription_languages) if settings.subscription_languages else []
+                keywords=_json_loads(settings.subscription_keywords) if settings.subscription_keywords else [],
+                languages=_json_loads(settings.subscription_languages) if settings.subscription_languages else []
             )
 
             history = session.query(TaskHistory).order_by(TaskHistory.started_at.desc()).limit(10).all()
@@ -105,7 +116,7 @@ class SettingsService:
             settings = self._get_or_create_settings(session)
 
             if update.email:
-                settings.email_recipients = json.dumps(update.email.recipients)
+                settings.email_recipients = _json_dumps(update.email.recipients)
 
             if update.scheduler:
                 settings.scheduler_timezone = update.scheduler.timezone
@@ -124,8 +135,8 @@ class SettingsService:
                 settings.filters_min_stars_monthly = update.filters.min_stars_monthly
 
             if update.subscription:
-                settings.subscription_keywords = json.dumps(update.subscription.keywords)
-                settings.subscription_languages = json.dumps(update.subscription.languages)
+                settings.subscription_keywords = _json_dumps(update.subscription.keywords)
+                settings.subscription_languages = _json_dumps(update.subscription.languages)
 
             settings.updated_at = datetime.now()
 
@@ -1,108 +1,183 @@
 from datetime import datetime, timedelta
 from typing import List, Dict
-from sqlalchemy import func
+from sqlalchemy import func, case, cast, text, bindparam, Date, DateTime
 from loguru import logger
 from ..database import DatabaseManager
 from ..data_repository import DataRepository
 from ..models import Repository, TrendingRecord
 from ...web.schemas import LanguageStats, DailyStats, WeekStats
+from ...infrastructure.cache import get_cache
+from ...constants import STATS_CACHE_TTL_SECONDS, STATS_CACHE_GRACE_SECONDS
+
+# SQLite：用递归 CTE 生成连续日期并 LEFT JOIN 聚合结果，缺失日期直接在 SQL 中补零
+_HISTORY_STATS_SQL = text("""
+    WITH RECURSIVE dates(d) AS (
+        SELECT date(:first_day)
+        UNION ALL
+        SELECT date(d, '+1 day') FROM dates WHERE d < date(:last_day)
+    )
+    SELECT dates.d AS date,
+           COALESCE(t.project_count, 0) AS project_count,
+           COALESCE(t.total_stars, 0) AS total_stars
+    FROM dates
+    LEFT JOIN (
+        SELECT date(record_date) AS dt, COUNT(id) AS project_count, SUM(stars) AS total_stars
+        FROM trending_records
+        WHERE time_range = 'daily' AND record_date >= :start_date
+        GROUP BY dt
+    ) t ON t.dt = dates.d
+    ORDER BY dates.d
+""").bindparams(bindparam('start_date', type_=DateTime))
+
 
 class StatsService:
     def __init__(self, db_manager: DatabaseManager, data_repo: DataRepository):
         self.db_manager = db_manager
         self.data_repo = data_repo
+        self.cache = get_cache()
+
+    @staticmethod
+    def _seconds_until_end_of_day() -> int:
+        """距离当天结束的秒数（加宽限时间）"""
+        now = datetime.now()
+        tomorrow = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        return int((tomorrow - now).total_seconds()) + STATS_CACHE_GRACE_SECONDS
 
     def get_overview(self) -> dict:
         """获取统计概览"""
-        return self.data_repo.get_repository_stats()
+        cached = self.cache.get('stats:overview')
+        if cached is not None:
+            return cached
+
+        overview = self.data_repo.get_repository_stats()
+        self.cache.set('stats:overview', overview, STATS_CACHE_TTL_SECONDS)
+        return overview
 
     def get_language_stats(self) -> List[LanguageStats]:
         """获取语言分布统计"""
+        cached = self.cache.get('stats:languages')
+        if cached is not None:
+            return [LanguageStats(**item) for item in cached]
+
+        result = self._query_language_stats()
+        self.cache.set('stats:languages', [item.model_dump() for item in result], STATS_CACHE_TTL_SECONDS)
+        return result
+
+    def _query_language_stats(self) -> List[LanguageStats]:
+        """查询语言分布统计"""
         with self.db_manager.get_session() as session:
+            # 空库（冷启动）时用一次索引探测直接返回，跳过分组聚合
+            if session.query(Repository.id).filter(Repository.language.isnot(None)).limit(1).scalar() is None:
+                return []
+
+            repo_count = func.count(Repository.id)
+            # 总数与占比由窗口函数在同一查询中算出，无需 Python 端二次汇总
             language_stats = session.query(
                 Repository.language,
-                func.count(Repository.id).label('count')
+                repo_count.label('count'),
+                (repo_count * 1.0 / func.sum(repo_count).over() * 100).label('percentage')
             ).filter(
                 Repository.language.isnot(None)
             ).group_by(
                 Repository.language
             ).order_by(
-                func.count(Repository.id).desc()
+                repo_count.desc()
             ).all()
 
-            total_repos = sum(count for _, count in language_stats)
             return [
                 LanguageStats(
                     language=lang,
                     count=count,
-                    percentage=round((count / total_repos * 100), 2) if total_repos > 0 else 0
-                ) for lang, count in language_stats
+                    percentage=round(percentage or 0, 2)
+                ) for lang, count, percentage in language_stats
             ]
 
     def get_history_stats(self, days: int) -> List[DailyStats]:
         """获取历史统计数据"""
+        if days <= 0:
+            return []
+
+        cache_key = f'stats:history:{days}'
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return [DailyStats(**item) for item in cached]
+
+        result = self._query_history_stats(days)
+        self.cache.set(cache_key, [item.model_dump() for item in result], self._seconds_until_end_of_day())
+        return result
+
+    def _query_history_stats(self, days: int) -> List[DailyStats]:
+        """查询历史统计数据"""
         with self.db_manager.get_session() as session:
             end_date = datetime.now()
             start_date = end_date - timedelta(days=days)
 
-            daily_stats = session.query(
-                func.date(TrendingRecord.record_date).label('date'),
+            if self.db_manager.engine.dialect.name == 'sqlite':
+                rows = session.execute(_HISTORY_STATS_SQL, {
+                    'first_day': (start_date.date() + timedelta(days=1)).isoformat(),
+                    'last_day': end_date.date().isoformat(),
+                    'start_date': start_date
+                }).all()
+
+                return [
+                    DailyStats(date=row.date, project_count=row.project_count, total_stars=row.total_stars)
+                    for row in rows
+                ]
+
+            # 其他数据库：CAST(... AS DATE) 按天聚合，连续日期在 Python 中补零
+            day = cast(TrendingRecord.record_date, Date)
+            rows = session.query(
+                day.label('date'),
                 func.count(TrendingRecord.id).label('project_count'),
                 func.sum(TrendingRecord.stars).label('total_stars')
             ).filter(
-                TrendingRecord.record_date >= start_date,
-                TrendingRecord.time_range == 'daily'
-            ).group_by(
-                func.date(TrendingRecord.record_date)
-            ).order_by(
-                func.date(TrendingRecord.record_date)
-            ).all()
-
-            data = [
-                DailyStats(
-                    date=str(row.date),
-                    project_count=row.project_count or 0,
-                    total_stars=row.total_stars or 0
-                ) for row in daily_stats
-            ]
+                TrendingRecord.time_range == 'daily',
+                TrendingRecord.record_date >= start_date
+            ).group_by(day).all()
+            by_date = {str(row.date): row for row in rows}
 
-            # Fill missing dates with zeros
             result = []
-            for i in range(days):
-                date = (start_date + timedelta(days=i + 1)).strftime('%Y-%m-%d')
-                existing = next((d for d in data if d.date == date), None)
-                if existing:
-                    result.append(existing)
-                else:
-                    result.append(DailyStats(date=date, project_count=0, total_stars=0))
-
+            for i in range(1, (end_date.date() - start_date.date()).days + 1):
+                d = (start_date.date() + timedelta(days=i)).isoformat()
+                row = by_date.get(d)
+                result.append(DailyStats(
+                    date=d,
+                    project_count=row.project_count if row else 0,
+                    total_stars=(row.total_stars or 0) if row else 0
+                ))
             return result
 
     def get_week_comparison(self) -> dict:
         """获取周对比数据"""
         with self.db_manager.get_session() as session:
-            today = datetime.now().date()
+            today = datetime.combine(datetime.now().date(), datetime.min.time())
             this_week_start = today - timedelta(days=today.weekday())
             last_week_start = this_week_start - timedelta(days=7)
-            last_week_end = this_week_start - timedelta(days=1)
-
-            def get_week_stats(start, end) -> WeekStats:
-                result = session.query(
-                    func.count(TrendingRecord.id).label('projects'),
-                    func.sum(TrendingRecord.stars).label('stars')
-                ).filter(
-                    func.date(TrendingRecord.record_date) >= start,
-                    func.date(TrendingRecord.record_date) <= end,
-                    TrendingRecord.time_range == 'daily'
-                ).first()
-
-                projects = result.projects or 0
-                stars = result.stars or 0
+
+            # 直接比较 record_date 范围（不套 date()），可走 (time_range, record_date, stars) 覆盖索引
+            bucket = case(
+                (TrendingRecord.record_date >= this_week_start, 'current'),
+                else_='last'
+            ).label('bucket')
+            rows = session.query(
+                bucket,
+                func.count(TrendingRecord.id).label('projects'),
+                func.coalesce(func.sum(TrendingRecord.stars), 0).label('stars')
+            ).filter(
+                TrendingRecord.time_range == 'daily',
+                TrendingRecord.record_date >= last_week_start,
+                TrendingRecord.record_date < today + timedelta(days=1)
+            ).group_by('bucket').all()
+            totals = {row.bucket: row for row in rows}
+
+            def to_week_stats(row) -> WeekStats:
+                projects = row.projects if row else 0
+                stars = row.stars if row else 0
                 avg_stars = int(stars / projects) if projects > 0 else 0
                 return WeekStats(projects=projects, stars=stars, avg_stars=avg_stars)
 
-            current = get_week_stats(this_week_start, today)
-            last = get_week_stats(last_week_start, last_week_end)
+            current = to_week_stats(totals.get('current'))
+            last = to_week_stats(totals.get('last'))
 
             def calc_growth(curr: int, prev: int) -> float:
                 if prev == 0:
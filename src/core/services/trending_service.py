@@ -1,6 +1,7 @@
 from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 from loguru import logger
+from sqlalchemy import and_, func
 from ..database import DatabaseManager
 from ..data_repository import DataRepository
 from ..models import Repository, TrendingRecord
@@ -46,20 +47,33 @@ class TrendingService:
         """获取仓库详情"""
         full_name = f"{owner}/{repo}"
 
-        with self.db_manager.get_session() as session:
-            repo_record = session.query(Repository).filter_by(name=full_name).first()
-            if not repo_record:
-                return None
+        with self.db_manager.get_read_session() as session:
+            latest = session.query(
+                TrendingRecord.repository_id,
+                func.max(TrendingRecord.record_date).label('max_date')
+            ).join(Repository).filter(
+                Repository.name == full_name
+            ).group_by(TrendingRecord.repository_id).subquery()
+
+            row = session.query(
+                Repository.name, Repository.url, Repository.description, Repository.language,
+                func.coalesce(TrendingRecord.stars, 0).label('stars'),
+                func.coalesce(TrendingRecord.forks, 0).label('forks')
+            ).outerjoin(
+                latest, Repository.id == latest.c.repository_id
+            ).outerjoin(
+                TrendingRecord,
+                and_(TrendingRecord.repository_id == Repository.id, TrendingRecord.record_date == latest.c.max_date)
+            ).filter(Repository.name == full_name).first()
 
-            latest_trending = session.query(TrendingRecord).filter_by(
-                repository_id=repo_record.id
-            ).order_by(TrendingRecord.record_date.desc()).first()
+            if not row:
+                return None
 
             return {
-                'name': repo_record.name,
-                'url': repo_record.url,
-                'description': repo_record.description,
-                'language': repo_record.language,
-                'stars': latest_trending.stars if latest_trending else 0,
-                'forks': latest_trending.forks if latest_trending else 0
+                'name': row.name,
+                'url': row.url,
+                'description': row.description,
+                'language': row.language,
+                'stars': row.stars,
+                'forks': row.forks
             }
@@ -4,9 +4,10 @@
 GitHub Trending Push 核心业务类
 """
 
-import json
+import os
 import asyncio
 import datetime
+import threading
 from pathlib import Path
 from loguru import logger
 from typing import Optional, List, Dict, Any
@@ -18,8 +19,21 @@ from ..infrastructure.filters import ProjectFilter
 from ..analyzers.keyword_matcher import KeywordMatcher
 from ..collectors.async_scraper import AsyncScraperTrending
 from ..infrastructure.config_manager import ConfigManager
+from ..infrastructure.cache import get_cache
+from ..infrastructure.http_client import close_session
 from ..analyzers.async_ai_summarizer import AsyncAISummarizer
 
+try:
+    import orjson
+
+    def _dump_backup(data: Dict) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    import json
+
+    def _dump_backup(data: Dict) -> bytes:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
 
 @dataclass
 class TaskResult:
@@ -51,40 +65,46 @@ class TrendingPush:
         self.db_manager.init_db()
         self.data_repo = DataRepository(self.db_manager)
 
+        # 已有事件循环运行时，同步入口复用的后台事件循环（延迟创建）
+        self._bg_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._bg_thread: Optional[threading.Thread] = None
+        self._bg_lock = threading.Lock()
+
         logger.info("TrendingPush initialization complete")
 
+    def _get_bg_loop(self) -> asyncio.AbstractEventLoop:
+        """获取后台事件循环，首次调用时在守护线程中启动"""
+        if self._bg_loop is None:
+            with self._bg_lock:
+                if self._bg_loop is None:
+                    loop = asyncio.new_event_loop()
+                    thread = threading.Thread(target=loop.run_forever, name="trending-push-loop", daemon=True)
+                    thread.start()
+                    self._bg_thread = thread
+                    self._bg_loop = loop
+        return self._bg_loop
+
     def _save_data(self, repos: List[Dict[str, Any]], time_range: str) -> None:
         """保存数据到数据库"""
         try:
             self.data_repo.save_trending_data(repos, time_range)
+            get_cache().invalidate('stats:')
             logger.info(f"Data saved to database for {time_range}")
         except Exception as e:
             logger.error(f"Failed to save data to database: {e}")
             self._save_data_to_json_backup(repos, time_range)
 
     def _save_data_to_json_backup(self, repos: list, time_range: str):
-        """备份数据到 JSON 文件（向后兼容）"""
-        file_path = Path("data/trending.json")
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-
-        all_data = {}
-        if file_path.exists():
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    all_data = json.load(f)
-            except Exception as e:
-                logger.warning(f"Failed to read existing data file: {e}, creating new one")
-
+        """备份数据到 JSON 文件（按 时间范围/日期 分文件，每次只写当天文件）"""
         current_date = datetime.datetime.now().strftime("%Y-%m-%d")
+        file_path = Path("data/trending") / time_range / f"{current_date}.json"
         repos_dict = {repo['name']: repo for repo in repos}
 
-        if time_range not in all_data:
-            all_data[time_range] = {}
-        all_data[time_range][current_date] = repos_dict
-
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(all_data, f, ensure_ascii=False, indent=2)
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = file_path.with_name(file_path.name + ".tmp")
+            tmp_path.write_bytes(_dump_backup(repos_dict))
+            os.replace(tmp_path, file_path)
             logger.info(f"Backup data saved to {file_path}")
         except Exception as e:
             logger.error(f"Failed to save backup data: {e}")
@@ -92,13 +112,18 @@ class TrendingPush:
     def _filter_duplicates(self, repos: list, time_range: str) -> list:
         """根据历史记录过滤重复项目"""
         try:
-            seen_projects = self.data_repo.get_seen_projects(time_range)
+            # 每次都以数据库为准：只对本次抓取到的项目做一条 IN 查询，
+            # 其他进程（API、CLI 等）写入的推送记录也能立即生效
+            seen_projects = self.data_repo.filter_seen_projects(time_range, (repo['name'] for repo in repos))
             new_repos = [repo for repo in repos if repo['name'] not in seen_projects]
             filtered_count = len(repos) - len(new_repos)
 
-            for repo in repos:
-                if repo['name'] in seen_projects:
-                    logger.debug(f"Skipping duplicate project: {repo['name']}")
+            if filtered_count:
+                # lazy: 仅在 DEBUG 级别生效时才计算被跳过的项目名
+                logger.opt(lazy=True).debug(
+                    "Skipping duplicate projects: {}",
+                    lambda: sorted({repo['name'] for repo in repos} & seen_projects)
+                )
 
             logger.info(f"Filtered {filtered_count} duplicates. Remaining: {len(new_repos)}")
             return new_repos
@@ -115,11 +140,41 @@ class TrendingPush:
         if hasattr(self.scraper, 'close'):
             await self.scraper.close()
 
+        # 断开复用的 SMTP 连接（QUIT 为阻塞调用，放到线程中执行）
+        await asyncio.to_thread(self.mailer.close)
+
         if hasattr(self, 'db_manager') and self.db_manager:
             self.db_manager.close()
 
+        if self._bg_loop is not None:
+            loop, thread = self._bg_loop, self._bg_thread
+            self._bg_loop = None
+            self._bg_thread = None
+            # 在后台循环中完成清理（关闭该循环上的共享 ClientSession、取消未完成任务）后再停止循环
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown_bg_loop(), loop).result(timeout=5)
+            except Exception as e:
+                logger.warning(f"Failed to clean up background event loop: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+            if thread.is_alive():
+                # 线程仍在运行时关闭循环会抛出 "Cannot close a running event loop"，交由守护线程随进程退出
+                logger.warning("Background event loop did not stop within 5s, leaving it to exit with the process")
+            else:
+                loop.close()
+
         logger.info("TrendingPush resources released")
 
+    @staticmethod
+    async def _shutdown_bg_loop() -> None:
+        """在后台事件循环内执行：关闭共享 ClientSession 并取消其余未完成的任务"""
+        await close_session()
+        current = asyncio.current_task()
+        pending = [task for task in asyncio.all_tasks() if task is not current]
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
     def run_task(self, time_range: str, is_startup: bool = False) -> TaskResult:
         """执行单次推送任务（同步版本，用于调度器）"""
         try:
@@ -128,12 +183,17 @@ class TrendingPush:
             loop = None
 
         if loop and loop.is_running():
-            import concurrent.futures
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                future = executor.submit(asyncio.run, self.run_task_async(time_range, is_startup))
-                return future.result()
+            future = asyncio.run_coroutine_threadsafe(self.run_task_async(time_range, is_startup), self._get_bg_loop())
+            return future.result()
         else:
-            return asyncio.run(self.run_task_async(time_range, is_startup))
+            return asyncio.run(self._run_task_and_close_session(time_range, is_startup))
+
+    async def _run_task_and_close_session(self, time_range: str, is_startup: bool) -> TaskResult:
+        """在临时事件循环中执行任务，结束前关闭该循环上创建的共享 ClientSession"""
+        try:
+            return await self.run_task_async(time_range, is_startup)
+        finally:
+            await close_session()
 
     async def run_task_async(self, time_range: str, is_startup: bool = False) -> TaskResult:
         """执行单次推送任务（异步版本），返回结构化结果"""
@@ -188,11 +248,13 @@ class TrendingPush:
                 repos_with_summary = await self.summarizer.batch_summarize(repos)
 
                 # Save summaries to database
-                for repo in repos_with_summary:
-                    if repo.get('ai_summary'):
-                        # Determine model name (simple logic, or could be passed back from summarizer)
-                        model_name = self.config.get('ai_models', {}).get('enabled', ['unknown'])[0]
-                        self.data_repo.save_ai_summary(repo['name'], repo['ai_summary'], model_name)
+                # Determine model name (simple logic, or could be passed back from summarizer)
+                model_name = (self.config.get('ai_models', {}).get('enabled') or ['unknown'])[0]
+                self.data_repo.save_ai_summaries_bulk([
+                    (repo['name'], repo['ai_summary'], model_name)
+                    for repo in repos_with_summary if repo.get('ai_summary')
+                ])
+                get_cache().invalidate('stats:')
 
             except Exception as e:
                 logger.error(f"AI Summary generation failed: {e}")
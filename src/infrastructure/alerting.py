@@ -4,15 +4,20 @@
 告警通知模块
 """
 
+import re
 import smtplib
 import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from string import Template
+from types import MappingProxyType
 from datetime import datetime
 from typing import Dict, Optional
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
+from email.message import EmailMessage
 
 import requests
 from loguru import logger
+from urllib3.util.retry import Retry
+from requests.adapters import HTTPAdapter
 
 from .config_manager import ConfigManager
 
@@ -25,6 +30,62 @@ class AlertLevel:
     CRITICAL = "critical"
 
 
+LEVEL_EMOJI = MappingProxyType({
+    AlertLevel.INFO: "ℹ️",
+    AlertLevel.WARNING: "⚠️",
+    AlertLevel.ERROR: "❌",
+    AlertLevel.CRITICAL: "🚨"
+})
+
+LEVEL_COLORS = MappingProxyType({
+    AlertLevel.INFO: '#17a2b8',
+    AlertLevel.WARNING: '#ffc107',
+    AlertLevel.ERROR: '#dc3545',
+    AlertLevel.CRITICAL: '#6f42c1'
+})
+
+_PASSWORD_RE = re.compile(r'password[=:\s]+\S+', re.IGNORECASE)
+_AUTH_RE = re.compile(r'auth[=:\s]+\S+', re.IGNORECASE)
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+_NL_TO_BR = str.maketrans({'\n': '<br>'})
+
+_TEXT_TEMPLATE = Template("""
+GitHub Trending Push - 系统告警
+
+告警级别: $level
+告警时间: $timestamp
+
+$body
+
+---
+此邮件由 GitHub Trending Push 系统自动发送
+""")
+
+_HTML_TEMPLATE = Template("""
+<html>
+<head>
+    <style>
+        body { font-family: Arial, sans-serif; }
+        .alert-box { background-color: #f8f9fa; border-left: 4px solid #dc3545; padding: 15px; margin: 20px 0; }
+        .alert-$level_class { border-left-color: $color; }
+        .timestamp { color: #6c757d; font-size: 0.9em; }
+    </style>
+</head>
+<body>
+    <h2>$emoji GitHub Trending Push - 系统告警</h2>
+    <div class="alert-box alert-$level_class">
+        <p><strong>告警级别:</strong> $level</p>
+        <p class="timestamp"><strong>告警时间:</strong> $timestamp</p>
+        <hr>
+        <div>$body_html</div>
+    </div>
+    <p style="color: #6c757d; font-size: 0.85em;">此邮件由 GitHub Trending Push 系统自动发送</p>
+</body>
+</html>
+""")
+
+
 class Alerting:
     """告警通知管理器"""
 
@@ -37,6 +98,23 @@ class Alerting:
         self._smtp_server = None
         self._lock = threading.Lock()
 
+        # Webhook 告警复用连接池，避免每次告警重新 TCP+TLS 握手
+        self._http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8, max_retries=Retry(total=2, backoff_factor=0.3))
+        self._http.mount("http://", adapter)
+        self._http.mount("https://", adapter)
+
+        # 多渠道告警互不依赖，并发发送使总耗时取决于最慢的渠道；线程池按需创建，close() 后可重建
+        self._alert_pool: Optional[ThreadPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    def _get_alert_pool(self) -> ThreadPoolExecutor:
+        """获取告警发送线程池（延迟创建）"""
+        with self._pool_lock:
+            if self._alert_pool is None:
+                self._alert_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix='alert')
+            return self._alert_pool
+
     def send_email_alert(self, subject: str, body: str, level: str = AlertLevel.ERROR) -> bool:
         """发送邮件告警"""
         try:
@@ -51,66 +129,30 @@ class Alerting:
                 logger.error("Email configuration incomplete, cannot send alert")
                 return False
 
-            level_emoji = {
-                AlertLevel.INFO: "ℹ️",
-                AlertLevel.WARNING: "⚠️",
-                AlertLevel.ERROR: "❌",
-                AlertLevel.CRITICAL: "🚨"
-            }
+            emoji = LEVEL_EMOJI.get(level, '📧')
+            level_upper = level.upper()
+            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
 
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = f"{level_emoji.get(level, '📧')} [{level.upper()}] {subject}"
+            msg = EmailMessage()
+            msg['Subject'] = f"{emoji} [{level_upper}] {subject}"
             msg['From'] = sender
             msg['To'] = ', '.join(recipients)
 
-            text_body = f"""
-GitHub Trending Push - 系统告警
-
-告警级别: {level.upper()}
-告警时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-{body}
-
----
-此邮件由 GitHub Trending Push 系统自动发送
-"""
+            text_body = _TEXT_TEMPLATE.substitute(level=level_upper, timestamp=timestamp, body=body)
+            html_body = _HTML_TEMPLATE.substitute(
+                emoji=emoji,
+                level=level_upper,
+                level_class=level,
+                color=LEVEL_COLORS.get(level, '#6c757d'),
+                timestamp=timestamp,
+                body_html=body.translate(_NL_TO_BR)
+            )
 
-            level_colors = {
-                'info': '#17a2b8',
-                'warning': '#ffc107',
-                'error': '#dc3545',
-                'critical': '#6f42c1'
-            }
-            alert_color = level_colors.get(level, '#6c757d')
-
-            html_body = f"""
-<html>
-<head>
-    <style>
-        body {{ font-family: Arial, sans-serif; }}
-        .alert-box {{ background-color: #f8f9fa; border-left: 4px solid #dc3545; padding: 15px; margin: 20px 0; }}
-        .alert-{level} {{ border-left-color: {alert_color}; }}
-        .timestamp {{ color: #6c757d; font-size: 0.9em; }}
-    </style>
-</head>
-<body>
-    <h2>{level_emoji.get(level, '📧')} GitHub Trending Push - 系统告警</h2>
-    <div class="alert-box alert-{level}">
-        <p><strong>告警级别:</strong> {level.upper()}</p>
-        <p class="timestamp"><strong>告警时间:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-        <hr>
-        <div>{body.replace(chr(10), '<br>')}</div>
-    </div>
-    <p style="color: #6c757d; font-size: 0.85em;">此邮件由 GitHub Trending Push 系统自动发送</p>
-</body>
-</html>
-"""
-
-            msg.attach(MIMEText(text_body, 'plain', 'utf-8'))
-            msg.attach(MIMEText(html_body, 'html', 'utf-8'))
+            msg.set_content(text_body, cte='base64')
+            msg.add_alternative(html_body, subtype='html', cte='base64')
 
             server = self._get_smtp_connection()
-            server.sendmail(sender, recipients, msg.as_string())
+            server.send_message(msg, sender, recipients)
 
             logger.info(f"Alert email sent successfully: {subject}")
             return True
@@ -122,11 +164,9 @@ GitHub Trending Push - 系统告警
 
     def _sanitize_error_message(self, message: str) -> str:
         """Remove sensitive information from error messages"""
-        import re
-        message = re.sub(r'password[=:\s]+\S+', 'password=***', message, flags=re.IGNORECASE)
-        message = re.sub(r'auth[=:\s]+\S+', 'auth=***', message, flags=re.IGNORECASE)
-        message = re.sub(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', '***@***.***', message)
-        return message
+        message = _PASSWORD_RE.sub('password=***', message)
+        message = _AUTH_RE.sub('auth=***', message)
+        return _EMAIL_RE.sub('***@***.***', message)
 
     def send_wechat_alert(self, message: str, webhook_url: Optional[str] = None) -> bool:
         """发送企业微信告警"""
@@ -144,7 +184,7 @@ GitHub Trending Push - 系统告警
                 }
             }
 
-            response = requests.post(webhook_url, json=data, timeout=10)
+            response = self._http.post(webhook_url, json=data, timeout=10)
 
             if response.status_code == 200:
                 logger.info("WeChat alert sent successfully")
@@ -174,7 +214,7 @@ GitHub Trending Push - 系统告警
                 "parse_mode": "Markdown"
             }
 
-            response = requests.post(url, json=data, timeout=10)
+            response = self._http.post(url, json=data, timeout=10)
 
             if response.status_code == 200:
                 logger.info("Telegram alert sent successfully")
@@ -216,10 +256,21 @@ GitHub Trending Push - 系统告警
 
         level = AlertLevel.CRITICAL if health_result.get('status') == 'unhealthy' else AlertLevel.WARNING
 
-        success = self.send_email_alert(subject, body, level)
-
         wechat_message = f"{subject}\n\n{body}"
-        self.send_wechat_alert(wechat_message)
+        alert_pool = self._get_alert_pool()
+        email_future = alert_pool.submit(self.send_email_alert, subject, body, level)
+        wechat_future = alert_pool.submit(self.send_wechat_alert, wechat_message)
+
+        try:
+            success = email_future.result(timeout=30)
+        except FutureTimeoutError:
+            logger.error("Email alert timed out")
+            success = False
+
+        try:
+            wechat_future.result(timeout=15)
+        except FutureTimeoutError:
+            logger.error("WeChat alert timed out")
 
         return success
 
@@ -257,7 +308,12 @@ GitHub Trending Push - 系统告警
             return self._smtp_server
 
     def close(self):
-        """关闭SMTP连接"""
+        """关闭告警线程池、HTTP 连接池与SMTP连接（之后再次告警会按需重建）"""
+        with self._pool_lock:
+            alert_pool, self._alert_pool = self._alert_pool, None
+        if alert_pool is not None:
+            alert_pool.shutdown(wait=True)
+        self._http.close()
         with self._lock:
             if self._smtp_server:
                 try:
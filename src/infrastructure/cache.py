@@ -0,0 +1,111 @@
+"""
+结果缓存 - 优先使用 Redis，不可用时回退到进程内 TTL 缓存
+"""
+import os
+import time
+import threading
+from typing import Any, Dict, Optional, Tuple
+from loguru import logger
+
+try:
+    import orjson as _json
+
+    def _dumps(value: Any) -> bytes:
+        return _json.dumps(value)
+except ImportError:
+    import json as _json
+
+    def _dumps(value: Any) -> bytes:
+        return _json.dumps(value, ensure_ascii=False).encode()
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+
+class ResultCache:
+    """键值结果缓存，值以 JSON 序列化存储"""
+
+    def __init__(self, redis_url: Optional[str] = None, prefix: str = "gtp:"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._local: Dict[str, Tuple[float, bytes]] = {}
+        self._redis = None
+
+        if redis_url:
+            if redis is None:
+                logger.warning("redis package not installed, using in-process cache")
+            else:
+                try:
+                    client = redis.Redis.from_url(redis_url, socket_timeout=1)
+                    client.ping()
+                    self._redis = client
+                    logger.info("Result cache backed by Redis")
+                except Exception as e:
+                    logger.warning(f"Redis unavailable ({e}), using in-process cache")
+
+    def get(self, key: str) -> Optional[Any]:
+        """读取缓存，未命中或已过期返回 None"""
+        key = self.prefix + key
+        if self._redis is not None:
+            try:
+                payload = self._redis.get(key)
+                return _json.loads(payload) if payload is not None else None
+            except Exception as e:
+                logger.warning(f"Redis get failed: {e}")
+                return None
+
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            expires_at, payload = entry
+            if time.monotonic() >= expires_at:
+                del self._local[key]
+                return None
+        return _json.loads(payload)
+
+    def set(self, key: str, value: Any, ttl: int) -> None:
+        """写入缓存，ttl 单位为秒"""
+        key = self.prefix + key
+        payload = _dumps(value)
+        if self._redis is not None:
+            try:
+                self._redis.set(key, payload, ex=max(int(ttl), 1))
+            except Exception as e:
+                logger.warning(f"Redis set failed: {e}")
+            return
+
+        with self._lock:
+            self._local[key] = (time.monotonic() + ttl, payload)
+
+    def invalidate(self, key_prefix: str = "") -> None:
+        """删除指定前缀的所有缓存键"""
+        pattern = self.prefix + key_prefix
+        if self._redis is not None:
+            try:
+                keys = list(self._redis.scan_iter(match=pattern + "*"))
+                if keys:
+                    self._redis.delete(*keys)
+            except Exception as e:
+                logger.warning(f"Redis invalidate failed: {e}")
+            return
+
+        with self._lock:
+            for key in [k for k in self._local if k.startswith(pattern)]:
+                del self._local[key]
+
+
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ResultCache:
+    """获取进程级共享缓存实例（REDIS_URL 环境变量启用 Redis）"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResultCache(os.getenv("REDIS_URL"))
+    return _cache
@@ -5,12 +5,100 @@
 优先级：数据库设置 > config.yaml
 """
 
-import json
+import os
+import hashlib
+import threading
 import yaml
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, Tuple
 from loguru import logger
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
+# 数据库设置的扁平键 -> (Settings 列名, 是否为 JSON 文本)
+_DB_SETTINGS_COLUMNS: Tuple[Tuple[str, str, bool], ...] = (
+    ('email.recipients', 'email_recipients', True),
+    ('scheduler.timezone', 'scheduler_timezone', False),
+    ('scheduler.daily.enabled', 'scheduler_daily_enabled', False),
+    ('scheduler.daily.time', 'scheduler_daily_time', False),
+    ('scheduler.weekly.enabled', 'scheduler_weekly_enabled', False),
+    ('scheduler.weekly.day', 'scheduler_weekly_day', False),
+    ('scheduler.weekly.time', 'scheduler_weekly_time', False),
+    ('scheduler.monthly.enabled', 'scheduler_monthly_enabled', False),
+    ('scheduler.monthly.time', 'scheduler_monthly_time', False),
+    ('filters.min_stars', 'filters_min_stars', False),
+    ('filters.min_stars_increment.daily', 'filters_min_stars_daily', False),
+    ('filters.min_stars_increment.weekly', 'filters_min_stars_weekly', False),
+    ('filters.min_stars_increment.monthly', 'filters_min_stars_monthly', False),
+    ('subscription.keywords', 'subscription_keywords', True),
+    ('subscription.languages', 'subscription_languages', True),
+)
+
+# 已解析的 yaml 文件缓存：绝对路径 -> ((mtime_ns, size), 内容摘要, 配置字典)
+_yaml_cache: Dict[str, Tuple[Tuple[int, int], bytes, Dict[str, Any]]] = {}
+_yaml_cache_lock = threading.Lock()
+
+
+def _fast_clone(obj: Any) -> Any:
+    """复制配置树中的 dict/list 容器，标量共享引用（比 copy.deepcopy 快一个数量级）"""
+    if isinstance(obj, dict):
+        return {k: _fast_clone(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_fast_clone(v) for v in obj]
+    return obj
+
+
+def _parse_yaml_cached(path, verify: bool = False) -> Tuple[bytes, Dict[str, Any]]:
+    """解析 yaml 文件，返回 (内容摘要, 共享的配置字典)
+
+    mtime/大小未变时直接复用缓存；否则（或 verify=True 时）读取原始字节计算 blake2b 摘要，
+    内容未变则跳过重新解析
+    """
+    resolved = str(Path(path).resolve())
+    stat = os.stat(resolved)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    with _yaml_cache_lock:
+        entry = _yaml_cache.get(resolved)
+
+    if entry is not None and not verify and entry[0] == signature:
+        return entry[1], entry[2]
+
+    with open(resolved, 'rb') as f:
+        raw = f.read()
+    digest = hashlib.blake2b(raw, digest_size=16).digest()
+
+    if entry is not None and entry[1] == digest:
+        data = entry[2]
+    else:
+        data = yaml.load(raw, Loader=_YamlLoader) or {}
+
+    with _yaml_cache_lock:
+        _yaml_cache[resolved] = (signature, digest, data)
+    return digest, data
+
+
+def load_yaml_cached(path, verify: bool = False) -> Dict[str, Any]:
+    """读取 yaml 配置文件（文件未变化时复用上次解析结果），返回副本"""
+    return _fast_clone(_parse_yaml_cached(path, verify)[1])
+
+
+def invalidate_yaml_cache(path=None) -> None:
+    """清除 yaml 解析缓存（不传路径时清空全部）"""
+    with _yaml_cache_lock:
+        if path is None:
+            _yaml_cache.clear()
+        else:
+            _yaml_cache.pop(str(Path(path).resolve()), None)
+
 
 class ConfigManager:
     """配置管理器单例（支持数据库优先）"""
@@ -20,47 +108,72 @@ class ConfigManager:
     _config_path: Optional[str] = None
     _db_manager = None
     _db_settings_cache: Optional[Dict[str, Any]] = None
+    _flat_yaml: Optional[Dict[str, Any]] = None
+    _flat_yaml_source: Optional[Dict[str, Any]] = None
+    # 分段配置缓存：名称 -> (代数, 构建时的 _config, 配置)；数据库设置或 yaml 变化时代数递增
+    _section_cache: Dict[str, Tuple[int, Optional[Dict[str, Any]], Dict[str, Any]]] = {}
+    _generation: int = 0
+    _config_hash: Optional[bytes] = None
     _initialized: bool = False
+    # 保护实例创建与共享状态写入（可重入：__init__ 持锁调用 _load_config）；读取不加锁
+    _lock = threading.RLock()
 
     def __new__(cls, config_path: str = "config/config.yaml"):
         if cls._instance is None:
-            cls._instance = super().__new__(cls)
+            with cls._lock:
+                if cls._instance is None:
+                    cls._instance = super().__new__(cls)
         return cls._instance
 
     def __init__(self, config_path: str = "config/config.yaml"):
         if not self._initialized or self._config_path != config_path:
-            self._config_path = config_path
-            self._load_config()
-            ConfigManager._initialized = True
+            with self._lock:
+                if not self._initialized or self._config_path != config_path:
+                    self._config_path = config_path
+                    self._load_config()
+                    ConfigManager._initialized = True
 
     def set_db_manager(self, db_manager) -> None:
         """设置数据库管理器（启用数据库优先模式）"""
-        self._db_manager = db_manager
-        self._db_settings_cache = None  # 清除缓存
+        with self._lock:
+            self._db_manager = db_manager
+            self._db_settings_cache = None  # 清除缓存
+            self._generation += 1
         logger.info("ConfigManager: Database-first mode enabled")
 
     def invalidate_cache(self) -> None:
         """清除数据库设置缓存（设置更新后调用）"""
-        self._db_settings_cache = None
-
-    def _load_config(self):
-        """加载配置文件"""
+        with self._lock:
+            self._db_settings_cache = None
+            self._generation += 1
+
+    def _load_config(self, verify: bool = False):
+        """加载配置文件（内容摘要未变化时保留当前配置与各级缓存）"""
+        config: Dict[str, Any] = {}
+        digest: Optional[bytes] = None
         try:
             config_file = Path(self._config_path)
 
             if not config_file.exists():
                 logger.warning(f"Config file not found: {self._config_path}, using defaults")
-                self._config = {}
-                return
-
-            with open(config_file, 'r', encoding='utf-8') as f:
-                self._config = yaml.safe_load(f) or {}
-
-            logger.info(f"Configuration loaded from {self._config_path}")
+            else:
+                digest, data = _parse_yaml_cached(config_file, verify)
+                if digest == self._config_hash and self._config is not None:
+                    logger.debug(f"Configuration unchanged: {self._config_path}")
+                    return
+                config = _fast_clone(data)
+                logger.info(f"Configuration loaded from {self._config_path}")
 
         except Exception as e:
             logger.error(f"Failed to load config: {e}")
-            self._config = {}
+            config = {}
+            digest = None
+
+        with self._lock:
+            self._config = config
+            self._config_hash = digest
+            self._flat_yaml = None
+            self._generation += 1
 
     def _get_db_settings(self) -> Optional[Dict[str, Any]]:
         """从数据库获取设置（带缓存，返回扁平化的字典）"""
@@ -70,31 +183,26 @@ class ConfigManager:
         if self._db_settings_cache is not None:
             return self._db_settings_cache
 
+        generation = self._generation
         try:
             from ..core.models import Settings
-            with self._db_manager.get_session() as session:
-                settings = session.query(Settings).first()
-                if not settings:
+            with self._db_manager.get_read_session() as session:
+                # 只取所需列（元组），不构建 ORM 实体
+                row = session.query(Settings).with_entities(
+                    *(getattr(Settings, column) for _, column, _ in _DB_SETTINGS_COLUMNS)
+                ).first()
+                if not row:
                     return None
 
-                self._db_settings_cache = {
-                    'email.recipients': json.loads(settings.email_recipients) if settings.email_recipients else None,
-                    'scheduler.timezone': settings.scheduler_timezone,
-                    'scheduler.daily.enabled': settings.scheduler_daily_enabled,
-                    'scheduler.daily.time': settings.scheduler_daily_time,
-                    'scheduler.weekly.enabled': settings.scheduler_weekly_enabled,
-                    'scheduler.weekly.day': settings.scheduler_weekly_day,
-                    'scheduler.weekly.time': settings.scheduler_weekly_time,
-                    'scheduler.monthly.enabled': settings.scheduler_monthly_enabled,
-                    'scheduler.monthly.time': settings.scheduler_monthly_time,
-                    'filters.min_stars': settings.filters_min_stars,
-                    'filters.min_stars_increment.daily': settings.filters_min_stars_daily,
-                    'filters.min_stars_increment.weekly': settings.filters_min_stars_weekly,
-                    'filters.min_stars_increment.monthly': settings.filters_min_stars_monthly,
-                    'subscription.keywords': json.loads(settings.subscription_keywords) if settings.subscription_keywords else None,
-                    'subscription.languages': json.loads(settings.subscription_languages) if settings.subscription_languages else None,
+                db_settings = {
+                    flat_key: (_json_loads(value) if value else None) if is_json else value
+                    for (flat_key, _, is_json), value in zip(_DB_SETTINGS_COLUMNS, row)
                 }
-                return self._db_settings_cache
+                with self._lock:
+                    # 查询期间缓存被失效时不写回，避免覆盖为旧数据
+                    if self._generation == generation:
+                        self._db_settings_cache = db_settings
+                return db_settings
         except Exception as e:
             logger.debug(f"Failed to load settings from database: {e}")
             return None
@@ -102,7 +210,7 @@ class ConfigManager:
     def reload(self):
         """重新加载配置"""
         logger.info("Reloading configuration...")
-        self._load_config()
+        self._load_config(verify=True)
 
     def get(self, key: str, default: Any = None) -> Any:
         """获取配置项（数据库优先，config.yaml 回退）"""
@@ -116,18 +224,28 @@ class ConfigManager:
 
     def _get_from_yaml(self, key: str, default: Any = None) -> Any:
         """仅从 config.yaml 获取配置项（不查询数据库）"""
-        keys = key.split('.')
-        value = self._config
-
-        for k in keys:
-            if isinstance(value, dict):
-                value = value.get(k)
-                if value is None:
-                    return default
-            else:
-                return default
+        return self._get_flat_yaml().get(key, default)
+
+    def _get_flat_yaml(self) -> Dict[str, Any]:
+        """获取扁平化的 yaml 配置（点分键 -> 值），_config 变化时重建"""
+        config = self._config
+        if self._flat_yaml is None or self._flat_yaml_source is not config:
+            flat: Dict[str, Any] = {}
+            self._flatten(config or {}, '', flat)
+            self._flat_yaml = flat
+            self._flat_yaml_source = config
+        return self._flat_yaml
 
-        return value
+    @classmethod
+    def _flatten(cls, data: Dict[str, Any], prefix: str, out: Dict[str, Any]) -> None:
+        """递归展开嵌套字典，中间节点同样保留（与逐级 split 查找的结果一致，None 值不收录）"""
+        for k, v in data.items():
+            if not isinstance(k, str) or '.' in k or v is None:
+                continue
+            flat_key = prefix + k
+            out[flat_key] = v
+            if isinstance(v, dict):
+                cls._flatten(v, flat_key + '.', out)
 
     def get_yaml_only(self, *keys: str, default: Any = None) -> Any:
         """仅从 config.yaml 获取嵌套配置值（不查询数据库）"""
@@ -141,8 +259,7 @@ class ConfigManager:
 
     def get_all(self) -> Dict[str, Any]:
         """获取全部配置（合并数据库和 yaml，数据库优先）"""
-        import copy
-        merged = copy.deepcopy(self._config)
+        merged = _fast_clone(self._config)
 
         db_settings = self._get_db_settings()
         if db_settings:
@@ -164,10 +281,26 @@ class ConfigManager:
                 target = target[k]
             target[keys[-1]] = value
 
+    def _get_section(self, name: str, builder: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """返回缓存的分段配置副本，代数或 yaml 变化时重新构建"""
+        cached = self._section_cache.get(name)
+        if cached is not None and cached[0] == self._generation and cached[1] is self._config:
+            return _fast_clone(cached[2])
+
+        generation, config = self._generation, self._config
+        section = builder()
+        # 启用了数据库但设置未成功加载（无记录或查询失败）时不缓存，下次重试
+        if self._db_manager is None or self._db_settings_cache is not None:
+            self._section_cache[name] = (generation, config, section)
+        return _fast_clone(section)
+
     def get_email_config(self) -> Dict[str, Any]:
         """获取邮件配置（数据库优先）"""
-        import copy
-        yaml_config = copy.deepcopy(self._config.get('email', {})) if self._config else {}
+        return self._get_section('email', self._build_email_config)
+
+    def _build_email_config(self) -> Dict[str, Any]:
+        """构建邮件配置"""
+        yaml_config = _fast_clone(self._config.get('email', {})) if self._config else {}
 
         db_settings = self._get_db_settings()
         if db_settings and db_settings.get('email.recipients') is not None:
@@ -181,8 +314,11 @@ class ConfigManager:
 
     def get_scheduler_config(self) -> Dict[str, Any]:
         """获取调度器配置（数据库优先）"""
-        import copy
-        yaml_config = copy.deepcopy(self._config.get('scheduler', {})) if self._config else {}
+        return self._get_section('scheduler', self._build_scheduler_config)
+
+    def _build_scheduler_config(self) -> Dict[str, Any]:
+        """构建调度器配置"""
+        yaml_config = _fast_clone(self._config.get('scheduler', {})) if self._config else {}
 
         db_settings = self._get_db_settings()
         if not db_settings:
@@ -210,8 +346,11 @@ class ConfigManager:
 
     def get_filters_config(self) -> Dict[str, Any]:
         """获取过滤器配置（数据库优先）"""
-        import copy
-        yaml_config = copy.deepcopy(self._config.get('filters', {})) if self._config else {}
+        return self._get_section('filters', self._build_filters_config)
+
+    def _build_filters_config(self) -> Dict[str, Any]:
+        """构建过滤器配置"""
+        yaml_config = _fast_clone(self._config.get('filters', {})) if self._config else {}
 
         db_settings = self._get_db_settings()
         if not db_settings:
@@ -242,3 +381,22 @@ class ConfigManager:
     def get_instance(cls, config_path: str = "config/config.yaml") -> 'ConfigManager':
         """获取单例实例"""
         return cls(config_path)
+
+    @classmethod
+    def get_loaded_config(cls, config_path) -> Optional[Dict[str, Any]]:
+        """返回单例已成功读取的 config_path 配置副本（仅 yaml，不合并数据库设置）
+
+        单例尚未创建、加载的是其他文件或读取失败时返回 None；不会创建单例或触发读取
+        """
+        with cls._lock:
+            manager = cls._instance
+            # _config_hash 为空表示未成功读取配置文件
+            if manager is None or manager._config is None or manager._config_hash is None:
+                return None
+            loaded_path, config = manager._config_path, manager._config
+        try:
+            if Path(loaded_path).resolve() != Path(config_path).resolve():
+                return None
+        except OSError:
+            return None
+        return _fast_clone(config)
@@ -2,33 +2,66 @@
 配置验证模块 - 纯YAML配置，使用loguru日志
 """
 
+import re
 import sys
+from types import MappingProxyType
 import yaml
 from pathlib import Path
 from loguru import logger
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
+
+from .config_manager import ConfigManager, load_yaml_cached
+
+# 缺失配置段的共享只读空映射，避免每次 .get(section, {}) 都分配新字典
+_EMPTY = MappingProxyType({})
+
+# 示例配置中的占位值
+_GITHUB_TOKEN_PLACEHOLDERS = frozenset({'ghp_xxxxxxxxxxxxxxxxxxxx', 'YOUR_GITHUB_TOKEN'})
+_AI_KEY_PLACEHOLDERS = frozenset({
+    'sk-xxxxxxxxxxxxxxxx',
+    'nvapi-xxxxxxxxxxxxxxxx',
+    'xxxxxxxxxxxxxxxx.xxxxxxxxxxxxxxxx',
+    'YOUR_API_KEY',
+    'YOUR_DEEPSEEK_API_KEY'
+})
+_EMAIL_SENDER_PLACEHOLDER_PREFIXES = ('your_',)
+
+# HH:MM（24 小时制）
+_TIME_RE = re.compile(r'^([01]?\d|2[0-3]):([0-5]\d)$')
 
 
 class ConfigValidator:
     """配置验证器"""
 
-    def __init__(self, config_path: str = "config/config.yaml"):
-        """初始化验证器"""
+    def __init__(self, config_path: str = "config/config.yaml", config: Optional[Dict[str, Any]] = None):
+        """初始化验证器（可传入已解析的配置，跳过读取文件）"""
         self.config_path = Path(config_path)
         self.config: Dict[str, Any] = {}
         self.errors: List[str] = []
         self.warnings: List[str] = []
+        self._preloaded = config
+
+    def _get_preloaded_config(self) -> Optional[Dict[str, Any]]:
+        """获取已解析的配置：优先使用构造参数，其次复用同一文件已加载的 ConfigManager"""
+        if self._preloaded is not None:
+            return self._preloaded
+
+        return ConfigManager.get_loaded_config(self.config_path)
 
     def load_config(self) -> Dict[str, Any]:
         """加载配置文件"""
+        preloaded = self._get_preloaded_config()
+        if preloaded is not None:
+            self.config = preloaded
+            return self.config
+
         if not self.config_path.exists():
             self.errors.append(f"Config file not found: {self.config_path}")
             return {}
 
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                self.config = yaml.safe_load(f) or {}
-                return self.config
+            self.config = load_yaml_cached(self.config_path)
+            return self.config
         except yaml.YAMLError as e:
             self.errors.append(f"Config file format error: {e}")
             return {}
@@ -63,18 +96,18 @@ class ConfigValidator:
 
     def _validate_github(self):
         """验证GitHub配置"""
-        github = self.config.get('github', {})
+        github = self.config.get('github') or _EMPTY
         token = github.get('token', '')
 
         if not token:
             self.warnings.append("GitHub token not configured - API rate limit will be 60 requests/hour (5000/hour with token)")
-        elif token == 'ghp_xxxxxxxxxxxxxxxxxxxx' or token == 'YOUR_GITHUB_TOKEN':
+        elif token in _GITHUB_TOKEN_PLACEHOLDERS:
             self.errors.append("GitHub token not properly configured (still using example value)")
 
     def _validate_ai_models(self):
         """验证AI模型配置"""
-        ai_config = self.config.get('ai_models', {})
-        enabled = ai_config.get('enabled', [])
+        ai_config = self.config.get('ai_models') or _EMPTY
+        enabled = ai_config.get('enabled') or ()
 
         if not enabled:
             self.errors.append("No AI models enabled in configuration")
@@ -82,19 +115,10 @@ class ConfigValidator:
 
         configured_models = []
         for model_name in enabled:
-            model_config = ai_config.get(model_name, {})
+            model_config = ai_config.get(model_name) or _EMPTY
             api_key = model_config.get('api_key', '')
 
-            # Check if key is one of the known placeholders
-            placeholders = [
-                'sk-xxxxxxxxxxxxxxxx',
-                'nvapi-xxxxxxxxxxxxxxxx',
-                'xxxxxxxxxxxxxxxx.xxxxxxxxxxxxxxxx',
-                'YOUR_API_KEY',
-                'YOUR_DEEPSEEK_API_KEY'
-            ]
-
-            if api_key and api_key not in placeholders:
+            if api_key and api_key not in _AI_KEY_PLACEHOLDERS:
                 configured_models.append(model_name)
 
         if not configured_models:
@@ -105,13 +129,13 @@ class ConfigValidator:
 
     def _validate_email(self):
         """验证邮件配置"""
-        email = self.config.get('email', {})
+        email = self.config.get('email') or _EMPTY
 
         sender = email.get('sender', '')
         password = email.get('password', '')
-        recipients = email.get('recipients', [])
+        recipients = email.get('recipients') or ()
 
-        if not sender or sender == 'your_email@example.com' or sender.startswith('your_'):
+        if not sender or sender.startswith(_EMAIL_SENDER_PLACEHOLDER_PREFIXES):
             self.errors.append("Email sender not configured")
 
         if not password or password == 'your_smtp_authorization_code':
@@ -123,7 +147,7 @@ class ConfigValidator:
 
     def _validate_scheduler(self):
         """验证调度器配置"""
-        scheduler = self.config.get('scheduler', {})
+        scheduler = self.config.get('scheduler') or _EMPTY
 
         if not scheduler:
             self.warnings.append("Scheduler configuration not found, using defaults")
@@ -135,25 +159,21 @@ class ConfigValidator:
 
         # 验证时间格式
         for period in ['daily', 'weekly', 'monthly']:
-            period_config = scheduler.get(period, {})
+            period_config = scheduler.get(period) or _EMPTY
             time_str = period_config.get('time', '')
-            if time_str and ':' in time_str:
-                try:
-                    hour, minute = time_str.split(':')
-                    int(hour), int(minute)
-                except ValueError:
-                    self.errors.append(f"Invalid time format for {period}: {time_str}")
+            if time_str and not _TIME_RE.match(str(time_str)):
+                self.errors.append(f"Invalid time format for {period}: {time_str}")
 
     def _validate_logging(self):
         """验证日志配置"""
-        logging_config = self.config.get('logging', {})
+        logging_config = self.config.get('logging') or _EMPTY
 
         if not logging_config:
             self.warnings.append("Logging configuration not found, using defaults")
 
     def _validate_filters(self):
         """验证过滤器配置"""
-        filters = self.config.get('filters', {})
+        filters = self.config.get('filters') or _EMPTY
 
         if not filters:
             self.warnings.append("Filters configuration not found, no star filtering will be applied")
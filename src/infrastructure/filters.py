@@ -4,10 +4,21 @@
 项目过滤器模块
 """
 
-from loguru import logger
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
 from .config_manager import ConfigManager
+from .logging_config import trusted_logger
+from ..constants import STAR_FILTER_VECTORIZE_THRESHOLD
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 过滤日志只含项目名与计数，标记为 trusted 以跳过文件日志脱敏
+_log = trusted_logger
+# lazy: DEBUG 未启用时不格式化逐项日志
+_debug = _log.opt(lazy=True).debug
 
 
 class ProjectFilter:
@@ -19,8 +30,66 @@ class ProjectFilter:
 
         self.min_total_stars = self.filter_config.get('min_total_stars', 0)
         self.min_stars_increment = self.filter_config.get('min_stars_increment', {})
-        self.language_whitelist = self.filter_config.get('language_whitelist', [])
-        self.language_blacklist = self.filter_config.get('language_blacklist', [])
+        # 转为 frozenset，逐项判断为 O(1) 哈希查找
+        self.language_whitelist = frozenset(self.filter_config.get('language_whitelist') or ())
+        self.language_blacklist = frozenset(self.filter_config.get('language_blacklist') or ())
+        # 各时间范围预先解析 (最小增量, 增量字段名)
+        self._range_cfg = {
+            r: (self.min_stars_increment.get(r, 0), f'stars_{r}') for r in ('daily', 'weekly', 'monthly')
+        }
+
+    def _get_range_cfg(self, time_range: str) -> Tuple[int, str]:
+        """获取时间范围对应的 (最小增量, 增量字段名)"""
+        cfg = self._range_cfg.get(time_range)
+        if cfg is None:
+            cfg = (self.min_stars_increment.get(time_range, 0), f'stars_{time_range}')
+        return cfg
+
+    def _check_stars(self, repo: Dict, stars_key: str, min_increment: int, dropped: Dict[str, int]) -> bool:
+        """Star 规则判断，未通过时累加 dropped 计数"""
+        # 增量字段并非总是存在（异步爬虫只写 stars_daily），不能用 itemgetter 直接索引
+        get = repo.get
+        total_stars = get('stars', 0)
+        if total_stars < self.min_total_stars:
+            dropped['total_stars'] += 1
+            _debug("Filtered out {}: total stars {} < {}",
+                   lambda: repo['name'], lambda: total_stars, lambda: self.min_total_stars)
+            return False
+
+        # 特殊处理：如果是 weekly 或 monthly，爬虫可能无法直接获取增量
+        # 此时如果 increment 为 0，且 total_stars 足够大，我们应该保留它
+        # 或者如果 min_increment 配置为 0，也直接通过
+        if min_increment > 0:
+            stars_increment = get(stars_key, 0)
+            # 只有当明确获取到了增量数据（>0），才进行比较
+            # 否则，如果爬虫没拿到增量数据（=0），我们选择信任 min_total_stars 的过滤结果
+            if stars_increment > 0 and stars_increment < min_increment:
+                dropped[stars_key] += 1
+                _debug("Filtered out {}: {} {} < {}",
+                       lambda: repo['name'], lambda: stars_key, lambda: stars_increment, lambda: min_increment)
+                return False
+            elif stars_increment == 0:
+                # 增量为 0，可能是没爬取到。记录日志但默认保留（依赖 total_stars 过滤）
+                _debug("Repo {} has 0 {}, skipping increment filter (trusting total stars)",
+                       lambda: repo['name'], lambda: stars_key)
+
+        return True
+
+    def _check_language(self, repo: Dict, dropped: Dict[str, int]) -> bool:
+        """语言规则判断，未通过时累加 dropped 计数"""
+        language = repo.get('language', '').strip()
+
+        if self.language_whitelist and language not in self.language_whitelist:
+            dropped['whitelist'] += 1
+            _debug("Filtered out {}: language '{}' not in whitelist", lambda: repo['name'], lambda: language)
+            return False
+
+        if self.language_blacklist and language in self.language_blacklist:
+            dropped['blacklist'] += 1
+            _debug("Filtered out {}: language '{}' in blacklist", lambda: repo['name'], lambda: language)
+            return False
+
+        return True
 
     def filter_by_stars(self, repos: List[Dict], time_range: str = 'daily', ignore_thresholds: bool = False) -> List[Dict]:
         """根据 Star 数过滤项目"""
@@ -28,72 +97,69 @@ class ProjectFilter:
             return []
 
         if ignore_thresholds:
-            logger.info(f"Ignoring star thresholds for {time_range} (Startup Mode)")
+            _log.info(f"Ignoring star thresholds for {time_range} (Startup Mode)")
             return repos
 
-        filtered = []
-        min_increment = self.min_stars_increment.get(time_range, 0)
-        stars_key = f'stars_{time_range}'
-
-        for repo in repos:
-            total_stars = repo.get('stars', 0)
-            stars_increment = repo.get(stars_key, 0)
-
-            if total_stars < self.min_total_stars:
-                logger.debug(f"Filtered out {repo['name']}: total stars {total_stars} < {self.min_total_stars}")
-                continue
-
-            # 特殊处理：如果是 weekly 或 monthly，爬虫可能无法直接获取增量
-            # 此时如果 increment 为 0，且 total_stars 足够大，我们应该保留它
-            # 或者如果 min_increment 配置为 0，也直接通过
-            if min_increment > 0:
-                # 只有当明确获取到了增量数据（>0），才进行比较
-                # 否则，如果爬虫没拿到增量数据（=0），我们选择信任 min_total_stars 的过滤结果
-                if stars_increment > 0 and stars_increment < min_increment:
-                    logger.debug(f"Filtered out {repo['name']}: {stars_key} {stars_increment} < {min_increment}")
-                    continue
-                elif stars_increment == 0:
-                    # 增量为 0，可能是没爬取到。记录日志但默认保留（依赖 total_stars 过滤）
-                    logger.debug(f"Repo {repo['name']} has 0 {stars_key}, skipping increment filter (trusting total stars)")
-
-            filtered.append(repo)
-
-        logger.info(f"Star filter: {len(repos)} -> {len(filtered)} (removed {len(repos) - len(filtered)})")
+        min_increment, stars_key = self._get_range_cfg(time_range)
+
+        if np is not None and len(repos) > STAR_FILTER_VECTORIZE_THRESHOLD:
+            filtered = self._filter_by_stars_np(repos, stars_key, min_increment)
+        else:
+            dropped = {'total_stars': 0, stars_key: 0}
+            check_stars = self._check_stars
+            filtered = [repo for repo in repos if check_stars(repo, stars_key, min_increment, dropped)]
+            _debug("Star filter dropped by reason: {}", lambda: dropped)
+
+        _log.info(f"Star filter: {len(repos)} -> {len(filtered)} (removed {len(repos) - len(filtered)})")
         return filtered
 
+    def _filter_by_stars_np(self, repos: List[Dict], stars_key: str, min_increment: int) -> List[Dict]:
+        """Star 过滤的 NumPy 向量化实现（规则与逐项循环一致，不输出逐项日志）"""
+        count = len(repos)
+        stars = np.fromiter((r.get('stars', 0) for r in repos), dtype=np.int64, count=count)
+        increments = np.fromiter((r.get(stars_key, 0) for r in repos), dtype=np.int64, count=count)
+
+        mask = stars >= self.min_total_stars
+        if min_increment > 0:
+            # 增量为 0 视为未爬取到，仅依赖 total_stars 过滤
+            mask &= ~((increments > 0) & (increments < min_increment))
+
+        return [repos[i] for i in np.flatnonzero(mask)]
+
     def filter_by_language(self, repos: List[Dict]) -> List[Dict]:
         """根据编程语言过滤项目"""
         if not repos:
             return []
 
-        filtered = []
+        dropped = {'whitelist': 0, 'blacklist': 0}
+        check_language = self._check_language
+        filtered = [repo for repo in repos if check_language(repo, dropped)]
+        _debug("Language filter dropped by reason: {}", lambda: dropped)
 
-        for repo in repos:
-            language = repo.get('language', '').strip()
-
-            if self.language_whitelist and language not in self.language_whitelist:
-                logger.debug(f"Filtered out {repo['name']}: language '{language}' not in whitelist")
-                continue
-
-            if self.language_blacklist and language in self.language_blacklist:
-                logger.debug(f"Filtered out {repo['name']}: language '{language}' in blacklist")
-                continue
-
-            filtered.append(repo)
-
-        logger.info(f"Language filter: {len(repos)} -> {len(filtered)} (removed {len(repos) - len(filtered)})")
+        _log.info(f"Language filter: {len(repos)} -> {len(filtered)} (removed {len(repos) - len(filtered)})")
         return filtered
 
     def filter_all(self, repos: List[Dict], time_range: str = 'daily', ignore_thresholds: bool = False) -> List[Dict]:
-        """应用所有过滤规则"""
+        """应用所有过滤规则（Star 与语言规则在同一次遍历中判断）"""
         if not repos:
             return []
 
         original_count = len(repos)
-        logger.info(f"Starting filtering: {original_count} repositories")
-
-        filtered = self.filter_by_stars(repos, time_range, ignore_thresholds)
-        filtered = self.filter_by_language(filtered)
-
-        logger.info(f"Filtering complete: {original_count} -> {len(filtered)} (filtered out {original_count - len(filtered)})")
+        _log.info(f"Starting filtering: {original_count} repositories")
+
+        if ignore_thresholds or (np is not None and original_count > STAR_FILTER_VECTORIZE_THRESHOLD):
+            # 跳过 Star 阈值或走向量化路径时，仍按两步执行
+            filtered = self.filter_by_stars(repos, time_range, ignore_thresholds)
+            filtered = self.filter_by_language(filtered)
+        else:
+            min_increment, stars_key = self._get_range_cfg(time_range)
+            dropped = {'total_stars': 0, stars_key: 0, 'whitelist': 0, 'blacklist': 0}
+            check_stars, check_language = self._check_stars, self._check_language
+            filtered = [
+                repo for repo in repos
+                if check_stars(repo, stars_key, min_increment, dropped) and check_language(repo, dropped)
+            ]
+            _debug("Filters dropped by reason: {}", lambda: dropped)
+
+        _log.info(f"Filtering complete: {original_count} -> {len(filtered)} (filtered out {original_count - len(filtered)})")
         return filtered
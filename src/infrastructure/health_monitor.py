@@ -4,16 +4,18 @@
 系统健康监控模块
 """
 
+import time
+import json
 import asyncio
-import concurrent.futures
+import hashlib
 import psutil
-import aiohttp
 from loguru import logger
 from datetime import datetime
 from openai import AsyncOpenAI
-from typing import Dict, Optional, TYPE_CHECKING
+from typing import Any, Dict, Optional, Tuple, TYPE_CHECKING
 
 from .config_manager import ConfigManager
+from .http_client import get_session
 
 if TYPE_CHECKING:
     from ..core.database import DatabaseManager
@@ -29,12 +31,25 @@ class HealthStatus:
 
 class HealthCheckResult:
     """健康检查结果"""
+
+    # 按秒缓存的 ISO 时间戳: (秒, 格式化字符串)
+    _CACHED_TS: Tuple[int, str] = (0, "")
+
     def __init__(self, name: str, status: str, message: str = "", details: Optional[Dict] = None):
         self.name = name
         self.status = status
         self.message = message
         self.details = details or {}
-        self.timestamp = datetime.now().isoformat()
+        self.timestamp = HealthCheckResult.now_iso()
+
+    @staticmethod
+    def now_iso() -> str:
+        """当前时间的 ISO 字符串（秒级精度，同一秒内复用）"""
+        sec = int(time.time())
+        cached = HealthCheckResult._CACHED_TS
+        if cached[0] != sec:
+            cached = HealthCheckResult._CACHED_TS = (sec, datetime.fromtimestamp(sec).isoformat())
+        return cached[1]
 
     def to_dict(self) -> Dict:
         return {
@@ -53,6 +68,22 @@ class HealthMonitor:
     """系统健康监控器"""
 
     MIN_CHECK_INTERVAL = 30  # Minimum seconds between health checks
+    SMTP_CHECK_TTL = 300  # 成功的 SMTP 登录探测结果复用时长（秒）
+    SMTP_SOCKET_TIMEOUT = 3.0  # SMTP 探测单次套接字操作超时（秒），须明显小于 email_service 预算
+    DISK_TTL = 60  # 磁盘占用缓存时长（秒）
+
+    # 进程内共享的磁盘占用缓存: (时间戳, psutil.disk_usage 结果)
+    _disk_cache: Optional[Tuple[float, Any]] = None
+
+    # 各子检查的超时预算（秒），单项卡住时不拖慢整体健康检查；
+    # 子检查内部的超时都小于对应预算，由内层先超时并给出具体原因
+    CHECK_TIMEOUTS = {
+        "database": 2.0,
+        "scraper": 5.0,
+        "ai_models": 5.0,
+        "email_service": 10.0,
+        "system_resources": 1.0
+    }
 
     def __init__(self, config_path: str = "config/config.yaml", db_manager: Optional['DatabaseManager'] = None, data_repo: Optional['DataRepository'] = None):
         self.config_path = config_path
@@ -61,6 +92,16 @@ class HealthMonitor:
         self._owns_db_manager = False
         self._last_check_time = 0
         self._cached_result = None
+        self._cached_etag = ""
+        # 按 (api_key, base_url) 复用 AsyncOpenAI 客户端，保持连接池常驻
+        self._openai_clients: Dict[Tuple[str, str], AsyncOpenAI] = {}
+        # 最近一次成功的 SMTP 探测: (时间戳, (服务器, 端口, 发件人), 结果)
+        self._smtp_cache: Optional[Tuple[float, Tuple, HealthCheckResult]] = None
+        # check_all 单飞：进行中的检查任务
+        self._inflight: Optional[asyncio.Task] = None
+        self._inflight_lock = asyncio.Lock()
+        # 预热 CPU 采样基准，避免首次 cpu_percent(interval=0) 返回 0
+        psutil.cpu_percent(interval=None)
 
     async def check_database(self) -> HealthCheckResult:
         """检查数据库连接"""
@@ -80,7 +121,8 @@ class HealthMonitor:
                 self._owns_db_manager = True
                 logger.warning("HealthMonitor created its own DatabaseManager - consider injecting dependencies")
 
-            stats = self.data_repo.get_repository_stats()
+            # 放到线程中执行，超时取消时不阻塞事件循环
+            stats = await asyncio.to_thread(self.data_repo.get_repository_stats, use_cache=False)
 
             if stats['total_repositories'] >= 0:
                 return HealthCheckResult(
@@ -108,24 +150,29 @@ class HealthMonitor:
         """检查爬虫服务（测试 GitHub 可达性）"""
         try:
             url = "https://github.com/trending"
-            timeout = aiohttp.ClientTimeout(total=10)
-
-            async with aiohttp.ClientSession(timeout=timeout) as session:
-                async with session.get(url) as response:
-                    if response.status == 200:
-                        return HealthCheckResult(
-                            name="scraper",
-                            status=HealthStatus.HEALTHY,
-                            message="GitHub trending page accessible",
-                            details={"url": url, "status_code": response.status}
-                        )
-                    else:
-                        return HealthCheckResult(
-                            name="scraper",
-                            status=HealthStatus.DEGRADED,
-                            message=f"GitHub returned status {response.status}",
-                            details={"url": url, "status_code": response.status}
-                        )
+
+            session = await get_session()
+            # HEAD 只传输响应头；被拒绝（405）时退回 1 字节的 Range GET
+            async with session.head(url, allow_redirects=True) as response:
+                status_code = response.status
+            if status_code == 405:
+                async with session.get(url, headers={"Range": "bytes=0-0"}) as response:
+                    status_code = response.status
+
+            if status_code in (200, 206):
+                return HealthCheckResult(
+                    name="scraper",
+                    status=HealthStatus.HEALTHY,
+                    message="GitHub trending page accessible",
+                    details={"url": url, "status_code": status_code}
+                )
+            else:
+                return HealthCheckResult(
+                    name="scraper",
+                    status=HealthStatus.DEGRADED,
+                    message=f"GitHub returned status {status_code}",
+                    details={"url": url, "status_code": status_code}
+                )
 
         except asyncio.TimeoutError:
             return HealthCheckResult(
@@ -141,6 +188,29 @@ class HealthMonitor:
                 message=f"Scraper check failed: {str(e)}"
             )
 
+    async def _probe_one_model(self, model_name: str, model_config: Dict) -> Tuple[str, str]:
+        """探测单个 AI 模型，返回 (模型名, 状态)"""
+        api_key = model_config.get('api_key', '')
+        base_url = model_config.get('base_url', '')
+
+        if not (api_key and base_url):
+            return model_name, "missing_config"
+
+        client = self._openai_clients.get((api_key, base_url))
+        if client is None:
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=10.0)
+            self._openai_clients[(api_key, base_url)] = client
+
+        try:
+            models = await asyncio.wait_for(client.models.list(), self.CHECK_TIMEOUTS["ai_models"] - 1.0)
+            return model_name, "healthy" if models.data else "no_models_available"
+        except asyncio.TimeoutError:
+            logger.warning(f"AI model {model_name} check timed out")
+            return model_name, "unhealthy: timeout"
+        except Exception as e:
+            logger.warning(f"AI model {model_name} check failed: {e}")
+            return model_name, f"unhealthy: {str(e)[:50]}"
+
     async def check_ai_models(self) -> HealthCheckResult:
         """检查 AI 模型可用性"""
         try:
@@ -150,33 +220,22 @@ class HealthMonitor:
             ai_config = config.get('ai_models', {})
             enabled_models = ai_config.get('enabled', [])
 
+            tasks = [
+                self._probe_one_model(model_name, ai_config.get(model_name, {}))
+                for model_name in enabled_models if model_name in ['deepseek', 'nvidia']
+            ]
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+
             model_status = {}
-            all_healthy = True
-
-            for model_name in enabled_models:
-                if model_name in ['deepseek', 'nvidia']:
-                    model_config = ai_config.get(model_name, {})
-                    api_key = model_config.get('api_key', '')
-                    base_url = model_config.get('base_url', '')
-
-                    if api_key and base_url:
-                        client = AsyncOpenAI(api_key=api_key, base_url=base_url, timeout=10.0)
-                        try:
-                            models = await client.models.list()
-                            if models.data:
-                                model_status[model_name] = "healthy"
-                            else:
-                                model_status[model_name] = "no_models_available"
-                                all_healthy = False
-                        except Exception as e:
-                            logger.warning(f"AI model {model_name} check failed: {e}")
-                            model_status[model_name] = f"unhealthy: {str(e)[:50]}"
-                            all_healthy = False
-                        finally:
-                            await client.close()
-                    else:
-                        model_status[model_name] = "missing_config"
-                        all_healthy = False
+            for result in results:
+                if isinstance(result, BaseException):
+                    logger.warning(f"AI model probe raised: {result}")
+                    continue
+                model_name, status = result
+                model_status[model_name] = status
+            all_healthy = len(model_status) == len(tasks) and all(
+                status == "healthy" for status in model_status.values()
+            )
 
             if all_healthy:
                 return HealthCheckResult(
@@ -227,28 +286,37 @@ class HealthMonitor:
                     message="Email configuration incomplete"
                 )
 
+            smtp_key = (smtp_server, smtp_port, sender)
+            cached = self._smtp_cache
+            if cached and cached[1] == smtp_key and time.time() - cached[0] < self.SMTP_CHECK_TTL:
+                return cached[2]
+
             def sync_smtp_check():
                 import smtplib
+                timeout = self.SMTP_SOCKET_TIMEOUT
                 if use_ssl:
-                    server = smtplib.SMTP_SSL(smtp_server, smtp_port, timeout=10)
+                    server = smtplib.SMTP_SSL(smtp_server, smtp_port, timeout=timeout)
                 else:
-                    server = smtplib.SMTP(smtp_server, smtp_port, timeout=10)
+                    server = smtplib.SMTP(smtp_server, smtp_port, timeout=timeout)
                 server.login(sender, password)
                 server.quit()
                 return True
 
-            loop = asyncio.get_event_loop()
-            with concurrent.futures.ThreadPoolExecutor() as executor:
-                await loop.run_in_executor(executor, sync_smtp_check)
+            # 工作线程无法被取消，只能靠套接字超时结束：不再套一层 wait_for，
+            # 由 check_all 的 email_service 预算兜底，卡住的连接会在预算内由套接字超时自行退出
+            await asyncio.to_thread(sync_smtp_check)
 
-            return HealthCheckResult(
+            result = HealthCheckResult(
                 name="email_service",
                 status=HealthStatus.HEALTHY,
                 message="Email service accessible",
                 details={"smtp_server": smtp_server, "smtp_port": smtp_port}
             )
+            self._smtp_cache = (time.time(), smtp_key, result)
+            return result
 
         except Exception as e:
+            self._smtp_cache = None
             logger.error(f"Email service health check failed: {e}")
             return HealthCheckResult(
                 name="email_service",
@@ -256,12 +324,21 @@ class HealthMonitor:
                 message=f"Email service check failed: {str(e)}"
             )
 
+    def _cached_disk_usage(self):
+        """获取根分区占用，DISK_TTL 内复用上次结果"""
+        cached = HealthMonitor._disk_cache
+        now = time.time()
+        if cached is None or now - cached[0] >= self.DISK_TTL:
+            cached = (now, psutil.disk_usage('/'))
+            HealthMonitor._disk_cache = cached
+        return cached[1]
+
     async def check_system_resources(self) -> HealthCheckResult:
         """检查系统资源占用"""
         try:
             cpu_percent = psutil.cpu_percent(interval=0)
             memory = psutil.virtual_memory()
-            disk = psutil.disk_usage('/')
+            disk = self._cached_disk_usage()
 
             details = {
                 "cpu_percent": cpu_percent,
@@ -298,21 +375,39 @@ class HealthMonitor:
 
     async def check_all(self, force: bool = False) -> Dict:
         """执行所有健康检查（带速率限制缓存）"""
-        import time
-        current_time = time.time()
+        async with self._inflight_lock:
+            current_time = time.time()
+
+            if not force and self._cached_result and (current_time - self._last_check_time) < self.MIN_CHECK_INTERVAL:
+                logger.debug(f"Returning cached health check result (age: {current_time - self._last_check_time:.1f}s)")
+                return self._cached_result
 
-        if not force and self._cached_result and (current_time - self._last_check_time) < self.MIN_CHECK_INTERVAL:
-            logger.debug(f"Returning cached health check result (age: {current_time - self._last_check_time:.1f}s)")
-            return self._cached_result
+            # 并发调用方共享同一次进行中的检查，避免重复扇出
+            if self._inflight is None:
+                self._inflight = asyncio.create_task(self._do_check_all(current_time))
+            inflight = self._inflight
 
+        return await asyncio.shield(inflight)
+
+    async def _do_check_all(self, current_time: float) -> Dict:
+        """执行所有子检查并汇总结果（由 check_all 单飞调度）"""
+        try:
+            return await self._run_checks(current_time)
+        finally:
+            self._inflight = None
+
+    async def _run_checks(self, current_time: float) -> Dict:
+        """并发执行各子检查"""
         logger.info("Starting comprehensive health check...")
 
+        timeouts = self.CHECK_TIMEOUTS
+        names = ("database", "scraper", "ai_models", "email_service", "system_resources")
         checks = await asyncio.gather(
-            self.check_database(),
-            self.check_scraper(),
-            self.check_ai_models(),
-            self.check_email_service(),
-            self.check_system_resources(),
+            asyncio.wait_for(self.check_database(), timeouts["database"]),
+            asyncio.wait_for(self.check_scraper(), timeouts["scraper"]),
+            asyncio.wait_for(self.check_ai_models(), timeouts["ai_models"]),
+            asyncio.wait_for(self.check_email_service(), timeouts["email_service"]),
+            asyncio.wait_for(self.check_system_resources(), timeouts["system_resources"]),
             return_exceptions=True
         )
 
@@ -320,11 +415,19 @@ class HealthMonitor:
         unhealthy_count = 0
         degraded_count = 0
 
-        for check in checks:
-            if isinstance(check, Exception):
-                logger.error(f"Health check failed with exception: {check}")
+        for name, check in zip(names, checks):
+            if isinstance(check, asyncio.TimeoutError):
+                logger.warning(f"Health check {name} timed out after {timeouts[name]}s")
+                results.append(HealthCheckResult(
+                    name=name,
+                    status=HealthStatus.UNHEALTHY,
+                    message=f"timed out after {timeouts[name]}s"
+                ).to_dict())
+                unhealthy_count += 1
+            elif isinstance(check, Exception):
+                logger.error(f"Health check {name} failed with exception: {check}")
                 results.append(HealthCheckResult(
-                    name="unknown",
+                    name=name,
                     status=HealthStatus.UNHEALTHY,
                     message=str(check)
                 ).to_dict())
@@ -345,7 +448,7 @@ class HealthMonitor:
 
         result = {
             "status": overall_status,
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": HealthCheckResult.now_iso(),
             "checks": results,
             "summary": {
                 "total": len(results),
@@ -356,10 +459,35 @@ class HealthMonitor:
         }
 
         self._cached_result = result
+        self._cached_etag = self._compute_etag(result)
         self._last_check_time = current_time
 
         return result
 
+    @staticmethod
+    def _compute_etag(result: Dict) -> str:
+        """计算健康检查结果的 ETag（内容摘要）"""
+        payload = json.dumps(result, sort_keys=True, default=str).encode()
+        return hashlib.blake2s(payload).hexdigest()[:16]
+
+    async def check_all_with_etag(self, force: bool = False) -> Tuple[Dict, str]:
+        """执行健康检查并返回 (结果, ETag)，供 HTTP 层做条件请求"""
+        result = await self.check_all(force=force)
+        if result is self._cached_result and self._cached_etag:
+            return result, self._cached_etag
+        return result, self._compute_etag(result)
+
+    async def aclose(self):
+        """关闭缓存的 AI 客户端并清理其余资源"""
+        clients = list(self._openai_clients.values())
+        self._openai_clients.clear()
+        for client in clients:
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close AI client: {e}")
+        self.cleanup()
+
     def cleanup(self):
         """清理资源（仅清理自己创建的连接）"""
         if self._owns_db_manager and self.db_manager:
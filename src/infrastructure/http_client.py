@@ -0,0 +1,38 @@
+"""
+共享 HTTP 客户端 - 进程内复用 aiohttp.ClientSession（连接池、DNS 缓存、TLS 会话）
+"""
+import asyncio
+from typing import Dict, Optional
+from loguru import logger
+
+import aiohttp
+
+# ClientSession 绑定创建时的事件循环：调度器经 asyncio.run / 后台循环执行任务，
+# 因此按事件循环各保留一个会话。会话与连接器都强引用其事件循环，条目不会随循环回收而释放，
+# 凡是调用过 get_session() 的事件循环，退出前都必须在该循环上 await close_session()
+_sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+
+async def get_session() -> aiohttp.ClientSession:
+    """获取当前事件循环的共享 ClientSession，不存在或已关闭时延迟创建"""
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=100,
+            limit_per_host=10,
+            enable_cleanup_closed=True,
+            ttl_dns_cache=300
+        )
+        session = aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=10))
+        _sessions[loop] = session
+        logger.debug("Created shared aiohttp ClientSession")
+    return session
+
+
+async def close_session() -> None:
+    """关闭当前事件循环的共享 ClientSession 并移除其条目（事件循环退出前必须调用）"""
+    session: Optional[aiohttp.ClientSession] = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+        logger.debug("Closed shared aiohttp ClientSession")
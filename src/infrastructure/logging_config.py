@@ -4,13 +4,34 @@
 """
 
 import os
+import re
 import sys
+import multiprocessing
 from pathlib import Path
 from loguru import logger
 from typing import Dict, Any
 
 from .security import Sanitizer
 
+# Python logging 格式 -> Loguru 格式映射，合并为单个正则一次替换
+_PY_FORMAT_REPLACEMENTS = {
+    '%(asctime)s': '{time:YYYY-MM-DD HH:mm:ss}',
+    '%(levelname)s': '{level}',
+    '%(level)s': '{level}',
+    '%(message)s': '{message}',
+    '%(name)s': '{name}',
+    '%(module)s': '{module}',
+    '%(funcName)s': '{function}',
+    '%(lineno)d': '{line}',
+    '%(lineno)s': '{line}',
+    '%(threadName)s': '{thread}',
+    '%(process)d': '{process}'
+}
+_PY_FORMAT_RE = re.compile('|'.join(map(re.escape, _PY_FORMAT_REPLACEMENTS)))
+
+# 内部模块专用：消息中不含用户数据或凭据时使用，文件日志不再做脱敏扫描
+trusted_logger = logger.bind(trusted=True)
+
 
 def setup_logging(config: Dict[str, Any]):
     """
@@ -30,8 +51,11 @@ def setup_logging(config: Dict[str, Any]):
         retention = "7 days"
     log_format = _get_log_format(logging_config.get('format', ''))
     logger.remove()
+    # 日志队列使用 spawn 上下文，不依赖 fork 后的锁状态
+    queue_context = multiprocessing.get_context('spawn')
     # # 1. 添加控制台输出 (stderr)
-    logger.add(sys.stderr, level=level, format=log_format, colorize=True)
+    # enqueue: 格式化与写 stderr 交给后台写线程，调度/任务线程只负责入队
+    logger.add(sys.stderr, level=level, format=log_format, colorize=True, enqueue=True, context=queue_context)
 
     # 2. 添加文件输出
     log_path = Path(log_file)
@@ -41,11 +65,18 @@ def setup_logging(config: Dict[str, Any]):
         is_production = os.getenv("ENVIRONMENT", "").lower() == "production"
 
         def sanitize_filter(record):
+            # 已标记 trusted 的内部日志不含敏感信息，跳过正则脱敏
+            if record["extra"].get("trusted"):
+                return True
             record["message"] = Sanitizer.sanitize(record["message"])
             return True
 
+        # enqueue: 写文件由独立写线程完成，调用方不阻塞在磁盘 I/O 上
+        # 保持行缓冲：loguru 文件 sink 不会主动 flush，块缓冲会让少量日志（含 ERROR）长时间滞留内存
         logger.add(log_file, level=level, rotation=rotation, retention=retention, encoding='utf-8', format=log_format,
-                   enqueue=True, backtrace=not is_production, diagnose=not is_production, filter=sanitize_filter)
+                   enqueue=True, context=queue_context, serialize=False, catch=True,
+                   buffering=1,
+                   backtrace=not is_production, diagnose=not is_production, filter=sanitize_filter)
     except Exception as e:
         # 如果文件日志设置失败，至少还有控制台日志
         logger.error(f"Failed to setup file logging: {e}")
@@ -62,21 +93,6 @@ def _get_log_format(fmt: str) -> str:
 
     # 如果包含 %，尝试进行简单的 logging format -> loguru format 映射
     if '%' in fmt:
-        replacements = {
-            '%(asctime)s': '{time:YYYY-MM-DD HH:mm:ss}',
-            '%(levelname)s': '{level}',
-            '%(level)s': '{level}',
-            '%(message)s': '{message}',
-            '%(name)s': '{name}',
-            '%(module)s': '{module}',
-            '%(funcName)s': '{function}',
-            '%(lineno)d': '{line}',
-            '%(lineno)s': '{line}',
-            '%(threadName)s': '{thread}',
-            '%(process)d': '{process}'
-        }
-
-        for py_fmt, loguru_fmt in replacements.items():
-            fmt = fmt.replace(py_fmt, loguru_fmt)
+        fmt = _PY_FORMAT_RE.sub(lambda m: _PY_FORMAT_REPLACEMENTS[m.group(0)], fmt)
 
     return fmt
@@ -4,6 +4,7 @@
 import time
 import asyncio
 import threading
+import weakref
 from typing import Dict, Optional, Any
 from loguru import logger
 from collections import deque
@@ -20,49 +21,69 @@ class AdaptiveRateLimiter:
         :param max_interval: 最大请求间隔（秒）
         """
         self._sync_lock = threading.Lock()
-        self._async_lock = None  # 延迟初始化，避免事件循环问题
-        self._async_lock_init_lock = threading.Lock()  # 保护异步锁初始化
+        # 按事件循环延迟创建异步锁：爬虫任务可能运行在不同的 asyncio.run 循环中
+        self._async_locks: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = weakref.WeakKeyDictionary()
         self.current_interval = 1.0 / initial_rate
         self.min_interval = min_interval
         self.max_interval = max_interval
         self.last_request_time = 0.0
+        self._next_available = 0.0  # 下一个可用发送时刻（time.monotonic()），同步与异步路径共用
         self.success_count = 0
         self.error_count = 0
         self.request_history = deque(maxlen=100)
-
-    def _get_async_lock(self):
-        """延迟初始化异步锁，避免事件循环问题（线程安全）"""
-        if self._async_lock is None:
-            with self._async_lock_init_lock:
-                if self._async_lock is None:
-                    self._async_lock = asyncio.Lock()
-        return self._async_lock
+        # 窗口内各状态计数，随 request_history 的追加/淘汰同步维护
+        self._window_counts = {'success': 0, 'error': 0}
+
+    def _get_async_lock(self) -> asyncio.Lock:
+        """获取当前事件循环的异步锁，首次进入时创建"""
+        loop = asyncio.get_running_loop()
+        lock = self._async_locks.get(loop)
+        if lock is None:
+            lock = self._async_locks[loop] = asyncio.Lock()
+        return lock
+
+    def _append(self, status: str):
+        """追加请求记录并同步更新窗口计数（调用方需持有锁）"""
+        history = self.request_history
+        if len(history) == history.maxlen:
+            self._window_counts[history[0][0]] -= 1
+        self._window_counts[status] += 1
+        history.append((status, time.time()))
+
+    def _reserve_slot(self) -> float:
+        """分配下一个互不重叠的发送时刻，返回需要等待的秒数
+
+        同步与异步调用方都从同一个单调时钟上的 _next_available 预约，彼此互相限速；
+        临界区不含等待，因此异步路径持有线程锁也不会阻塞事件循环
+        """
+        with self._sync_lock:
+            now = time.monotonic()
+            slot = max(now, self._next_available)
+            self._next_available = slot + self.current_interval
+        return slot - now
 
     def wait(self):
         """同步等待直到可以发送下一个请求（线程安全）"""
-        with self._sync_lock:
-            elapsed = time.time() - self.last_request_time
-            if elapsed < self.current_interval:
-                sleep_time = self.current_interval - elapsed
-                logger.debug(f"Rate limiting: waiting {sleep_time:.2f}s")
-                time.sleep(sleep_time)
-            self.last_request_time = time.time()
+        # 锁内只预约发送时刻，各调用方在锁外并行等待
+        sleep_time = self._reserve_slot()
+        if sleep_time > 0:
+            logger.debug(f"Rate limiting: waiting {sleep_time:.2f}s")
+            time.sleep(sleep_time)
+        self.last_request_time = time.time()
 
     async def wait_async(self):
         """异步等待直到可以发送下一个请求（异步安全）"""
-        async with self._get_async_lock():
-            elapsed = time.time() - self.last_request_time
-            if elapsed < self.current_interval:
-                sleep_time = self.current_interval - elapsed
-                logger.debug(f"Rate limiting: waiting {sleep_time:.2f}s")
-                await asyncio.sleep(sleep_time)
-            self.last_request_time = time.time()
+        sleep_time = self._reserve_slot()
+        if sleep_time > 0:
+            logger.debug(f"Rate limiting: waiting {sleep_time:.2f}s")
+            await asyncio.sleep(sleep_time)
+        self.last_request_time = time.time()
 
     def record_success(self):
         """记录成功请求，逐步提高速率（同步版本）"""
         with self._sync_lock:
             self.success_count += 1
-            self.request_history.append(('success', time.time()))
+            self._append('success')
 
             if self.success_count >= 10:
                 self.current_interval = max(self.min_interval, self.current_interval * 0.9)
@@ -73,7 +94,7 @@ class AdaptiveRateLimiter:
         """记录成功请求，逐步提高速率（异步版本）"""
         async with self._get_async_lock():
             self.success_count += 1
-            self.request_history.append(('success', time.time()))
+            self._append('success')
 
             if self.success_count >= 10:
                 self.current_interval = max(self.min_interval, self.current_interval * 0.9)
@@ -84,7 +105,7 @@ class AdaptiveRateLimiter:
         """记录错误请求，降低速率（同步版本）"""
         with self._sync_lock:
             self.error_count += 1
-            self.request_history.append(('error', time.time()))
+            self._append('error')
 
             if is_rate_limit:
                 self.current_interval = min(self.max_interval, self.current_interval * 2.0)
@@ -99,7 +120,7 @@ class AdaptiveRateLimiter:
         """记录错误请求，降低速率（异步版本）"""
         async with self._get_async_lock():
             self.error_count += 1
-            self.request_history.append(('error', time.time()))
+            self._append('error')
 
             if is_rate_limit:
                 self.current_interval = min(self.max_interval, self.current_interval * 2.0)
@@ -112,8 +133,8 @@ class AdaptiveRateLimiter:
 
     def get_stats(self) -> Dict[str, Any]:
         """获取速率限制器统计信息"""
-        recent_success = sum(1 for status, _ in self.request_history if status == 'success')
-        recent_errors = sum(1 for status, _ in self.request_history if status == 'error')
+        recent_success = self._window_counts['success']
+        recent_errors = self._window_counts['error']
         total = len(self.request_history)
 
         return {
@@ -130,13 +151,21 @@ class RateLimiterManager:
 
     def __init__(self):
         self.limiters: Dict[str, AdaptiveRateLimiter] = {}
+        self._lock = threading.Lock()
 
     def get_limiter(self, endpoint: str, **kwargs) -> AdaptiveRateLimiter:
         """获取或创建指定端点的速率限制器"""
-        if endpoint not in self.limiters:
-            self.limiters[endpoint] = AdaptiveRateLimiter(**kwargs)
-            logger.info(f"Created rate limiter for endpoint: {endpoint}")
-        return self.limiters[endpoint]
+        limiter = self.limiters.get(endpoint)
+        if limiter is not None:
+            return limiter
+
+        with self._lock:
+            limiter = self.limiters.get(endpoint)
+            if limiter is None:
+                limiter = AdaptiveRateLimiter(**kwargs)
+                self.limiters[endpoint] = limiter
+                logger.info(f"Created rate limiter for endpoint: {endpoint}")
+        return limiter
 
     def get_all_stats(self) -> Dict[str, Dict]:
         """获取所有端点的统计信息"""
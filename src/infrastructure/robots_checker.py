@@ -1,49 +1,198 @@
 """
 Robots.txt 检查器 - 确保爬虫遵守网站爬取规则
 """
+import os
+import json
+import time
+import asyncio
 import threading
-import requests
-from functools import lru_cache
+from pathlib import Path
+from collections import OrderedDict
 from urllib.parse import urlparse, urljoin
 from urllib.robotparser import RobotFileParser
 from loguru import logger
-from typing import Dict, Optional
+from typing import Any, Dict, Optional, Tuple
+
+from .http_client import get_session
+
+
+class _RecordingRobotFileParser(RobotFileParser):
+    """记录原始 robots.txt 内容的解析器，用于写入磁盘缓存"""
+
+    body: Optional[str] = None
+
+    def parse(self, lines):
+        lines = list(lines)
+        self.body = "\n".join(lines)
+        super().parse(lines)
 
 
 class RobotsChecker:
     """Robots.txt 检查器，缓存并验证爬取权限"""
 
-    def __init__(self, user_agent: str = "Mozilla/5.0"):
+    CACHE_MAXSIZE = 128  # 解析器缓存的最大 host 数（LRU 淘汰）
+    CACHE_TTL = 86400  # robots.txt 缓存有效期（秒），跨进程重启复用
+
+    def __init__(self, user_agent: str = "Mozilla/5.0", cache_path: str = "data/robots_cache.json"):
         self.user_agent = user_agent
+        self.cache_path = Path(cache_path)
+        # base_url -> (抓取时间, 解析器)；解析器为 None 表示加载失败，按允许处理，按 LRU 淘汰
+        self._parser_cache: "OrderedDict[str, Tuple[float, Optional[RobotFileParser]]]" = OrderedDict()
+        # 每个 base_url 一把锁，避免并发重复抓取同一 robots.txt
+        self._fetch_locks: Dict[str, asyncio.Lock] = {}
+        # 磁盘缓存内容: {base_url: {"fetched_at": ts, "body": "...", "allow_all": bool, "disallow_all": bool}}
+        self._disk_entries: Dict[str, Dict[str, Any]] = {}
+        self._disk_lock = threading.Lock()
+        self._load_disk_cache()
 
     def _get_robots_url(self, url: str) -> str:
         """从URL提取robots.txt地址"""
         parsed = urlparse(url)
         return f"{parsed.scheme}://{parsed.netloc}/robots.txt"
 
-    @lru_cache(maxsize=128)
+    def _load_disk_cache(self) -> None:
+        """启动时从磁盘加载未过期的 robots.txt 缓存"""
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except FileNotFoundError:
+            return
+        except Exception as e:
+            logger.warning(f"Failed to load robots cache from {self.cache_path}: {e}")
+            return
+
+        now = time.time()
+        for base_url, entry in entries.items():
+            fetched_at = entry.get('fetched_at', 0)
+            if now - fetched_at >= self.CACHE_TTL:
+                continue
+            self._disk_entries[base_url] = entry
+            self._store_cached(base_url, self._parser_from_entry(base_url, entry), fetched_at)
+
+        if self._disk_entries:
+            logger.debug(f"Loaded {len(self._disk_entries)} robots.txt entries from {self.cache_path}")
+
+    def _parser_from_entry(self, base_url: str, entry: Dict[str, Any]) -> RobotFileParser:
+        """由磁盘缓存条目重建解析器"""
+        parser = _RecordingRobotFileParser(self._get_robots_url(base_url))
+        parser.allow_all = entry.get('allow_all', False)
+        parser.disallow_all = entry.get('disallow_all', False)
+        parser.parse((entry.get('body') or '').splitlines())
+        return parser
+
+    def _persist(self, base_url: str, parser: Optional[RobotFileParser], fetched_at: float) -> None:
+        """将成功抓取的 robots.txt 原子写入磁盘缓存（加载失败的结果不落盘）"""
+        if parser is None or not (parser.mtime() or parser.allow_all or parser.disallow_all):
+            return
+
+        with self._disk_lock:
+            self._disk_entries[base_url] = {
+                "fetched_at": fetched_at,
+                "body": getattr(parser, 'body', None) or '',
+                "allow_all": parser.allow_all,
+                "disallow_all": parser.disallow_all
+            }
+            now = time.time()
+            self._disk_entries = {
+                url: entry for url, entry in self._disk_entries.items()
+                if now - entry.get('fetched_at', 0) < self.CACHE_TTL
+            }
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(self._disk_entries, f, ensure_ascii=False)
+                os.replace(tmp_path, self.cache_path)
+            except Exception as e:
+                logger.warning(f"Failed to save robots cache to {self.cache_path}: {e}")
+
+    def _lookup_cached(self, base_url: str) -> Tuple[bool, Optional[RobotFileParser]]:
+        """读取未过期的缓存解析器并标记为最近使用，返回 (是否命中, 解析器)"""
+        cached = self._parser_cache.get(base_url)
+        if cached is None:
+            return False, None
+        if time.time() - cached[0] >= self.CACHE_TTL:
+            self._parser_cache.pop(base_url, None)
+            return False, None
+        self._parser_cache.move_to_end(base_url)
+        return True, cached[1]
+
+    def _store_cached(self, base_url: str, parser: Optional[RobotFileParser], fetched_at: float) -> None:
+        """写入解析器缓存，超出容量时淘汰最久未使用的 host"""
+        self._parser_cache[base_url] = (fetched_at, parser)
+        self._parser_cache.move_to_end(base_url)
+        while len(self._parser_cache) > self.CACHE_MAXSIZE:
+            self._parser_cache.popitem(last=False)
+
     def _get_parser(self, base_url: str) -> Optional[RobotFileParser]:
-        """获取或创建robots.txt解析器"""
+        """获取或创建robots.txt解析器（同步抓取，供同步爬虫使用）"""
+        hit, parser = self._lookup_cached(base_url)
+        if hit:
+            return parser
+
         robots_url = self._get_robots_url(base_url)
-        parser = RobotFileParser()
+        parser = _RecordingRobotFileParser()
         parser.set_url(robots_url)
 
         try:
             parser.read()
             logger.info(f"Loaded robots.txt from {robots_url}")
-            return parser
         except Exception as e:
             logger.warning(f"Failed to load robots.txt from {robots_url}: {e}")
             logger.info(f"Assuming crawling is allowed for {base_url}")
-            return None
+            parser = None
 
-    def can_fetch(self, url: str) -> bool:
-        """检查是否允许爬取指定URL"""
-        parsed = urlparse(url)
-        base_url = f"{parsed.scheme}://{parsed.netloc}"
+        fetched_at = time.time()
+        self._store_cached(base_url, parser, fetched_at)
+        self._persist(base_url, parser, fetched_at)
+        return parser
+
+    async def _get_parser_async(self, base_url: str) -> Optional[RobotFileParser]:
+        """获取或创建robots.txt解析器（通过共享 aiohttp 会话异步抓取）"""
+        hit, parser = self._lookup_cached(base_url)
+        if hit:
+            return parser
+
+        lock = self._fetch_locks.setdefault(base_url, asyncio.Lock())
+        async with lock:
+            hit, parser = self._lookup_cached(base_url)
+            if hit:
+                return parser
+
+            robots_url = self._get_robots_url(base_url)
+            parser = _RecordingRobotFileParser()
+            parser.set_url(robots_url)
+
+            try:
+                session = await get_session()
+                async with session.get(robots_url) as response:
+                    # 状态码处理与 RobotFileParser.read() 保持一致
+                    if response.status in (401, 403):
+                        parser.disallow_all = True
+                    elif 400 <= response.status < 500:
+                        parser.allow_all = True
+                    else:
+                        response.raise_for_status()
+                        parser.parse((await response.text()).splitlines())
+                logger.info(f"Loaded robots.txt from {robots_url}")
+            except Exception as e:
+                logger.warning(f"Failed to load robots.txt from {robots_url}: {e}")
+                logger.info(f"Assuming crawling is allowed for {base_url}")
+                parser = None
+
+            fetched_at = time.time()
+            self._store_cached(base_url, parser, fetched_at)
+            self._fetch_locks.pop(base_url, None)
+            self._persist(base_url, parser, fetched_at)
+            return parser
 
-        parser = self._get_parser(base_url)
+    def _get_base_url(self, url: str) -> str:
+        """从URL提取 scheme://netloc"""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
 
+    def _check_parser(self, parser: Optional[RobotFileParser], url: str) -> bool:
+        """根据解析器判断URL是否允许爬取"""
         if parser is None:
             return True
 
@@ -56,13 +205,8 @@ class RobotsChecker:
 
         return allowed
 
-    def get_crawl_delay(self, url: str) -> Optional[float]:
-        """获取建议的爬取延迟（秒）"""
-        parsed = urlparse(url)
-        base_url = f"{parsed.scheme}://{parsed.netloc}"
-
-        parser = self._get_parser(base_url)
-
+    def _parser_delay(self, parser: Optional[RobotFileParser], base_url: str) -> Optional[float]:
+        """从解析器读取建议的爬取延迟"""
         if parser is None:
             return None
 
@@ -72,6 +216,24 @@ class RobotsChecker:
 
         return delay
 
+    def can_fetch(self, url: str) -> bool:
+        """检查是否允许爬取指定URL"""
+        return self._check_parser(self._get_parser(self._get_base_url(url)), url)
+
+    async def can_fetch_async(self, url: str) -> bool:
+        """检查是否允许爬取指定URL（异步）"""
+        return self._check_parser(await self._get_parser_async(self._get_base_url(url)), url)
+
+    def get_crawl_delay(self, url: str) -> Optional[float]:
+        """获取建议的爬取延迟（秒）"""
+        base_url = self._get_base_url(url)
+        return self._parser_delay(self._get_parser(base_url), base_url)
+
+    async def get_crawl_delay_async(self, url: str) -> Optional[float]:
+        """获取建议的爬取延迟（秒，异步）"""
+        base_url = self._get_base_url(url)
+        return self._parser_delay(await self._get_parser_async(base_url), base_url)
+
 
 # 全局实例和锁
 _robots_checker: Optional[RobotsChecker] = None
@@ -96,3 +258,13 @@ def check_robots_permission(url: str) -> bool:
 def get_recommended_delay(url: str) -> Optional[float]:
     """全局函数：获取建议延迟"""
     return get_robots_checker().get_crawl_delay(url)
+
+
+async def check_robots_permission_async(url: str) -> bool:
+    """全局函数：检查robots.txt权限（异步）"""
+    return await get_robots_checker().can_fetch_async(url)
+
+
+async def get_recommended_delay_async(url: str) -> Optional[float]:
+    """全局函数：获取建议延迟（异步）"""
+    return await get_robots_checker().get_crawl_delay_async(url)
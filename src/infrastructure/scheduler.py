@@ -1,15 +1,35 @@
 """
 任务调度模块 - 支持每日、每周、每月定时任务
 """
-import calendar
+import time
+import queue
+import atexit
+import itertools
+import threading
+from types import MappingProxyType
 from loguru import logger
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from typing import Dict, Any, Callable, Optional, List, Tuple
-from concurrent.futures import ThreadPoolExecutor
 
+from apscheduler.events import EVENT_JOB_ERROR, EVENT_JOB_EXECUTED
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.schedulers.background import BackgroundScheduler
 
+from ..core.models import TaskHistory
+from ..constants import TASK_HISTORY_BATCH_SIZE, TASK_HISTORY_FLUSH_INTERVAL, TASK_HISTORY_MAX_RETRIES, JOB_MAX_RETRIES, JOB_RETRY_DELAY
+
+_JOB_ID_TO_TYPE = {'daily_trending': 'daily', 'weekly_trending': 'weekly', 'monthly_trending': 'monthly'}
+_TYPE_TO_JOB_ID = MappingProxyType({v: k for k, v in _JOB_ID_TO_TYPE.items()})
+_RETRY_JOB_SUFFIX = '_retry'
+_JOB_NAMES = MappingProxyType({'daily': 'Daily Trending Push', 'weekly': 'Weekly Trending Push', 'monthly': 'Monthly Trending Push'})
+
+# 星期全称 -> cron day_of_week 缩写
+_DAY_MAP = MappingProxyType({
+    'monday': 'mon', 'tuesday': 'tue', 'wednesday': 'wed', 'thursday': 'thu',
+    'friday': 'fri', 'saturday': 'sat', 'sunday': 'sun'
+})
+_DAY_KEYS_JOINED = ", ".join(_DAY_MAP)
+
 
 class TrendingScheduler:
     """Trending推送调度器"""
@@ -23,7 +43,29 @@ class TrendingScheduler:
 
         self.scheduler = BackgroundScheduler(timezone=self.timezone)
         self._is_running = False
-        self._shared_executor = None
+        # stop() 时置位，停止调度后不再注册重试
+        self._shutdown_event = threading.Event()
+
+        # 失败重试由任务事件监听器统一处理：任务类型 -> 当前失败次数
+        self._retry_attempts: Dict[str, int] = {}
+        self._retry_lock = threading.Lock()
+        self.scheduler.add_listener(self._on_job_event, EVENT_JOB_EXECUTED | EVENT_JOB_ERROR)
+
+        # 任务历史写后队列：record_task_* 只入队，由写线程批量落库
+        self._history_queue: queue.Queue = queue.Queue()
+        self._history_writer: Optional[threading.Thread] = None
+        self._history_writer_lock = threading.Lock()
+        self._history_keys = itertools.count(1)
+        self._history_ids: Dict[int, int] = {}  # 记录句柄 -> TaskHistory.id
+        # 写入失败、待下一轮重试的条目（仅写线程访问）及连续失败次数
+        self._history_pending: List[Tuple[str, int, Dict[str, Any]]] = []
+        self._history_failures = 0
+        if self.db_manager:
+            # 写线程为守护线程，未调用 stop() 直接退出时也要把队列中的历史落库
+            atexit.register(self._stop_history_writer)
+
+        # job.id -> (next_run_time, 其 isoformat 字符串)，next_run_time 变化时才重新格式化
+        self._next_run_cache: Dict[str, Tuple[datetime, str]] = {}
 
         # 任务回调函数
         self._daily_callback: Callable = None
@@ -34,49 +76,57 @@ class TrendingScheduler:
         """返回调度器是否正在运行"""
         return self._is_running and self.scheduler.running
 
+    def _format_next_run(self, job) -> Optional[str]:
+        """格式化任务的下次执行时间（结果按 next_run_time 缓存）"""
+        next_run = job.next_run_time
+        if next_run is None:
+            return None
+        cached = self._next_run_cache.get(job.id)
+        if cached is not None and cached[0] == next_run:
+            return cached[1]
+        formatted = next_run.isoformat()
+        self._next_run_cache[job.id] = (next_run, formatted)
+        return formatted
+
     def get_status(self) -> Dict[str, Any]:
         """获取调度器状态"""
+        format_next_run = self._format_next_run
         return {
             "running": self.is_running(),
             "timezone": self.timezone,
-            "jobs": [{"id": job.id, "name": job.name, "next_run": job.next_run_time.isoformat() if job.next_run_time else None} for job in self.scheduler.get_jobs()]
+            "jobs": [{"id": job.id, "name": job.name, "next_run": format_next_run(job)} for job in self.scheduler.get_jobs()]
         }
 
     def get_next_run_times(self) -> Dict[str, Optional[str]]:
         """获取各任务的下次执行时间"""
         result = {"daily": None, "weekly": None, "monthly": None}
         for job in self.scheduler.get_jobs():
-            if job.id == 'daily_trending' and job.next_run_time:
-                result["daily"] = job.next_run_time.isoformat()
-            elif job.id == 'weekly_trending' and job.next_run_time:
-                result["weekly"] = job.next_run_time.isoformat()
-            elif job.id == 'monthly_trending' and job.next_run_time:
-                result["monthly"] = job.next_run_time.isoformat()
+            key = _JOB_ID_TO_TYPE.get(job.id)
+            if key is not None:
+                result[key] = self._format_next_run(job)
         return result
 
     def _validate_time_format(self, time_str: str) -> tuple:
         """Validate and parse HH:MM time format"""
-        import re
-        if not re.match(r'^([01]?\d|2[0-3]):[0-5]\d$', time_str):
-            raise ValueError(f"Invalid time format: {time_str}. Expected HH:MM (e.g., 08:00)")
-        hour, minute = map(int, time_str.split(':'))
-        return hour, minute
+        h, sep, m = time_str.partition(':')
+        if sep and 1 <= len(h) <= 2 and len(m) == 2 and (h + m).isascii() and h.isdigit() and m.isdigit():
+            hour, minute = int(h), int(m)
+            if hour <= 23 and minute <= 59:
+                return hour, minute
+        raise ValueError(f"Invalid time format: {time_str}. Expected HH:MM (e.g., 08:00)")
 
     def _validate_day_of_week(self, day: str) -> str:
         """Validate and convert day of week to cron format"""
-        day_map = {'monday': 'mon', 'tuesday': 'tue', 'wednesday': 'wed', 'thursday': 'thu', 'friday': 'fri', 'saturday': 'sat', 'sunday': 'sun'}
-        day_lower = day.lower().strip()
-        if day_lower not in day_map:
-            raise ValueError(f"Invalid day of week: {day}. Expected one of: {', '.join(day_map.keys())}")
-        return day_map[day_lower]
+        day_of_week = _DAY_MAP.get(day.lower().strip())
+        if day_of_week is None:
+            raise ValueError(f"Invalid day of week: {day}. Expected one of: {_DAY_KEYS_JOINED}")
+        return day_of_week
 
     def _reschedule_job(self, task_type: str, enabled: bool, cron_expression: str) -> None:
         """重新注册单个任务（由 API 调用）"""
-        job_id_map = {'daily': 'daily_trending', 'weekly': 'weekly_trending', 'monthly': 'monthly_trending'}
-        job_name_map = {'daily': 'Daily Trending Push', 'weekly': 'Weekly Trending Push', 'monthly': 'Monthly Trending Push'}
-        callback_map = {'daily': self._daily_job, 'weekly': self._weekly_job, 'monthly': self._monthly_job}
+        callback_map = self._job_funcs()
 
-        job_id = job_id_map.get(task_type)
+        job_id = _TYPE_TO_JOB_ID.get(task_type)
         if not job_id:
             return
 
@@ -104,11 +154,11 @@ class TrendingScheduler:
                 trigger = CronTrigger(day_of_week=day_of_week, hour=hour, minute=minute, timezone=self.timezone)
             elif task_type == 'monthly':
                 hour, minute = self._validate_time_format(cron_expression)
-                trigger = CronTrigger(hour=hour, minute=minute, timezone=self.timezone)
+                trigger = CronTrigger(day='last', hour=hour, minute=minute, timezone=self.timezone)
             else:
                 return
 
-            self.scheduler.add_job(job_func, trigger, id=job_id, name=job_name_map[task_type], replace_existing=True)
+            self.scheduler.add_job(job_func, trigger, id=job_id, name=_JOB_NAMES[task_type], replace_existing=True)
             logger.info(f"Rescheduled {task_type} job with cron: {cron_expression}")
         except ValueError as e:
             logger.error(f"Invalid cron expression for {task_type} job: {e}")
@@ -116,29 +166,135 @@ class TrendingScheduler:
             logger.error(f"Failed to reschedule {task_type} job: {e}")
 
     def record_task_start(self, task_type: str, task_id: str = None) -> Optional[int]:
-        """记录任务开始"""
+        """记录任务开始（异步写入）
+
+        返回进程内递增的记录句柄，而非 TaskHistory.id：写入在后台批量完成，调用时数据库行尚未生成。
+        句柄只能原样传给同一调度器实例的 record_task_end，不能用于查询数据库
+        """
         if not self.db_manager:
             return None
 
-        from src.core.models import TaskHistory
-        with self.db_manager.get_session() as session:
-            record = TaskHistory(task_type=task_type, task_id=task_id, started_at=datetime.now(), status="running")
-            session.add(record)
-            session.flush()
-            return record.id
+        record_key = next(self._history_keys)
+        self._history_queue.put(('start', record_key, {
+            'task_type': task_type, 'task_id': task_id, 'started_at': datetime.now(), 'status': "running"
+        }))
+        self._ensure_history_writer()
+        return record_key
 
     def record_task_end(self, record_id: int, success: bool, error_message: str = None) -> None:
-        """记录任务结束"""
+        """记录任务结束（异步写入，record_id 为 record_task_start 返回的记录句柄）"""
         if not self.db_manager or not record_id:
             return
 
-        from src.core.models import TaskHistory
-        with self.db_manager.get_session() as session:
-            record = session.query(TaskHistory).filter_by(id=record_id).first()
-            if record:
-                record.finished_at = datetime.now()
-                record.status = "success" if success else "failed"
-                record.error_message = error_message
+        self._history_queue.put(('end', record_id, {
+            'finished_at': datetime.now(), 'status': "success" if success else "failed", 'error_message': error_message
+        }))
+        self._ensure_history_writer()
+
+    def _ensure_history_writer(self) -> None:
+        """按需启动任务历史写线程"""
+        if self._history_writer is not None and self._history_writer.is_alive():
+            return
+        with self._history_writer_lock:
+            if self._history_writer is None or not self._history_writer.is_alive():
+                self._history_writer = threading.Thread(target=self._history_writer_loop, name="task-history-writer", daemon=True)
+                self._history_writer.start()
+
+    def _history_writer_loop(self) -> None:
+        """写线程：攒批（最多 TASK_HISTORY_BATCH_SIZE 条或等待 TASK_HISTORY_FLUSH_INTERVAL 秒）后单事务写入"""
+        while True:
+            # 有待重试的批次时不能无限阻塞，超时后即使没有新条目也要重试
+            try:
+                item = self._history_queue.get(timeout=TASK_HISTORY_FLUSH_INTERVAL if self._history_pending else None)
+            except queue.Empty:
+                self._flush_history([])
+                continue
+            if item is None:
+                if self._history_pending:
+                    self._flush_history([])
+                return
+
+            batch = [item]
+            stop = False
+            deadline = time.monotonic() + TASK_HISTORY_FLUSH_INTERVAL
+            while len(batch) < TASK_HISTORY_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._history_queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+
+            self._flush_history(batch)
+            if stop:
+                if self._history_pending:
+                    self._flush_history([])
+                return
+
+    def _flush_history(self, batch: List[Tuple[str, int, Dict[str, Any]]]) -> None:
+        """在一个会话中写入一批任务历史（先插入开始记录，再批量更新结束状态）
+
+        上一轮写入失败的条目排在本批之前一并重试；事务失败时整批保留，
+        连续失败超过 TASK_HISTORY_MAX_RETRIES 次才丢弃。
+        """
+        batch = self._history_pending + batch
+        self._history_pending = []
+        if not batch:
+            return
+
+        starts = [(key, TaskHistory(**values)) for op, key, values in batch if op == 'start']
+        ends = [(key, values) for op, key, values in batch if op == 'end']
+
+        # 记录句柄映射在事务提交成功后才更新，失败时整批可原样重试
+        new_ids: Dict[int, int] = {}
+        resolved_keys = []
+        try:
+            with self.db_manager.get_session() as session:
+                if starts:
+                    session.add_all([record for _, record in starts])
+                    session.flush()
+                    new_ids = {key: record.id for key, record in starts}
+
+                updates = []
+                for key, values in ends:
+                    record_id = new_ids.get(key) or self._history_ids.get(key)
+                    if record_id is None:
+                        logger.warning(f"Task history record {key} not found, skipping end update")
+                        continue
+                    updates.append({'id': record_id, **values})
+                    resolved_keys.append(key)
+                if updates:
+                    session.bulk_update_mappings(TaskHistory, updates)
+        except Exception as e:
+            self._history_failures += 1
+            if self._history_failures > TASK_HISTORY_MAX_RETRIES:
+                logger.error(f"Failed to write task history batch ({len(batch)} items), dropping after {self._history_failures} attempts: {e}")
+                self._history_failures = 0
+            else:
+                logger.warning(f"Failed to write task history batch ({len(batch)} items), will retry: {e}")
+                self._history_pending = batch
+            return
+
+        self._history_failures = 0
+        self._history_ids.update(new_ids)
+        for key in resolved_keys:
+            self._history_ids.pop(key, None)
+
+    def _stop_history_writer(self, timeout: float = 5.0) -> None:
+        """写入队列中剩余的任务历史并停止写线程"""
+        writer = self._history_writer
+        if writer is not None and writer.is_alive():
+            self._history_queue.put(None)
+            writer.join(timeout=timeout)
+            if not writer.is_alive() and self._history_pending:
+                logger.error(f"Dropping {len(self._history_pending)} task history items that could not be written before shutdown")
+                self._history_pending = []
+        self._history_writer = None
 
     def set_daily_job(self, callback: Callable) -> None:
         """设置每日任务回调"""
@@ -152,85 +308,82 @@ class TrendingScheduler:
         """设置每月任务回调"""
         self._monthly_callback = callback
 
-    def _get_shared_executor(self) -> ThreadPoolExecutor:
-        """Get or create shared ThreadPoolExecutor"""
-        if self._shared_executor is None or self._shared_executor._shutdown:
-            self._shared_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="scheduler-retry")
-        return self._shared_executor
+    @staticmethod
+    def _job_task_type(job_id: str) -> Optional[str]:
+        """由 job.id 解析任务类型（定时任务与其重试任务共用同一类型）"""
+        if job_id.endswith(_RETRY_JOB_SUFFIX):
+            job_id = job_id[:-len(_RETRY_JOB_SUFFIX)]
+        return _JOB_ID_TO_TYPE.get(job_id)
+
+    def _on_job_event(self, event) -> None:
+        """任务执行事件监听：成功时清零失败计数，失败时注册一次性重试任务或在重试耗尽后告警"""
+        task_type = self._job_task_type(event.job_id)
+        if task_type is None:
+            return
+
+        if event.exception is None:
+            with self._retry_lock:
+                self._retry_attempts.pop(task_type, None)
+            return
 
-    def _safe_execute(self, callback: Callable) -> None:
-        """Decorator/Wrapper for safe task execution"""
-        try:
-            callback()
-        except Exception as e:
-            logger.error(f"Unhandled exception in scheduled task: {e}")
-            # Optionally send alert here if not already handled inside callback
+        with self._retry_lock:
+            attempt = self._retry_attempts.get(task_type, 0) + 1
+            self._retry_attempts[task_type] = attempt
+            if attempt >= JOB_MAX_RETRIES:
+                self._retry_attempts.pop(task_type, None)
+        logger.error(f"{task_type.capitalize()} job failed (attempt {attempt}/{JOB_MAX_RETRIES}): {event.exception}")
+
+        if attempt < JOB_MAX_RETRIES:
+            if self._shutdown_event.is_set():
+                logger.info(f"Scheduler stopping, abandoning {task_type} job retries")
+                return
+            logger.info(f"Retrying in {JOB_RETRY_DELAY} seconds...")
             try:
-                from .alerting import Alerting
-                alerting = Alerting()
-                alerting.alert_task_failure("Scheduled Task", str(e))
-            except Exception:
-                pass
-            raise e  # Re-raise to let retry logic handle it if needed
-
-    def _execute_with_retry(self, callback: Callable, job_name: str, max_retries: int = 3, retry_delay: int = 60) -> None:
-        """执行任务并支持重试（使用共享线程池避免阻塞调度线程）"""
-        import threading
-
-        def retry_task():
-            for attempt in range(1, max_retries + 1):
-                try:
-                    # Wrap with safe execution
-                    self._safe_execute(callback)
-                    logger.info(f"{job_name.capitalize()} job completed successfully")
-                    return
-                except Exception as e:
-                    logger.error(f"{job_name.capitalize()} job failed (attempt {attempt}/{max_retries}): {e}")
-
-                    if attempt < max_retries:
-                        logger.info(f"Retrying in {retry_delay} seconds...")
-                        event = threading.Event()
-                        event.wait(timeout=retry_delay)
-                    else:
-                        logger.error(f"{job_name.capitalize()} job failed after {max_retries} attempts")
-                        try:
-                            from .alerting import Alerting
-                            alerting = Alerting()
-                            alerting.alert_task_failure(f"{job_name} trending job", str(e))
-                        except Exception as alert_error:
-                            logger.error(f"Failed to send alert: {alert_error}")
-
-        executor = self._get_shared_executor()
-        executor.submit(retry_task)
+                self.scheduler.add_job(
+                    self._job_funcs()[task_type], 'date',
+                    run_date=datetime.now(timezone.utc) + timedelta(seconds=JOB_RETRY_DELAY),
+                    id=_TYPE_TO_JOB_ID[task_type] + _RETRY_JOB_SUFFIX,
+                    name=f"{_JOB_NAMES[task_type]} Retry #{attempt + 1}",
+                    replace_existing=True,
+                    misfire_grace_time=None
+                )
+            except Exception as schedule_error:
+                logger.error(f"Failed to schedule {task_type} job retry: {schedule_error}")
+            return
+
+        logger.error(f"{task_type.capitalize()} job failed after {JOB_MAX_RETRIES} attempts")
+        try:
+            from .alerting import Alerting
+            alerting = Alerting()
+            alerting.alert_task_failure(f"{task_type} trending job", str(event.exception))
+        except Exception as alert_error:
+            logger.error(f"Failed to send alert: {alert_error}")
+
+    def _job_funcs(self) -> Dict[str, Callable]:
+        """任务类型 -> 任务函数"""
+        return {'daily': self._daily_job, 'weekly': self._weekly_job, 'monthly': self._monthly_job}
 
     def _daily_job(self) -> None:
-        """执行每日任务（支持重试）"""
+        """执行每日任务（异常由任务事件监听器处理重试）"""
         logger.info("Executing daily trending job...")
         if self._daily_callback:
-            self._execute_with_retry(self._daily_callback, "daily")
+            self._daily_callback()
         else:
             logger.warning("No daily callback registered")
 
     def _weekly_job(self) -> None:
-        """执行每周任务（支持重试）"""
+        """执行每周任务（异常由任务事件监听器处理重试）"""
         logger.info("Executing weekly trending job...")
         if self._weekly_callback:
-            self._execute_with_retry(self._weekly_callback, "weekly")
+            self._weekly_callback()
         else:
             logger.warning("No weekly callback registered")
 
     def _monthly_job(self) -> None:
-        """执行每月任务（仅在月末执行，支持重试）"""
-        today = datetime.now()
-        last_day = calendar.monthrange(today.year, today.month)[1]
-
-        if today.day != last_day:
-            logger.debug(f"Not the last day of month (today: {today.day}, last: {last_day}), skipping")
-            return
-
+        """执行每月任务（由 day='last' 触发器保证仅在月末触发，异常由任务事件监听器处理重试）"""
         logger.info("Executing monthly trending job (last day of month)...")
         if self._monthly_callback:
-            self._execute_with_retry(self._monthly_callback, "monthly")
+            self._monthly_callback()
         else:
             logger.warning("No monthly callback registered")
 
@@ -252,8 +405,7 @@ class TrendingScheduler:
             day = weekly_config.get('day', 'sunday')
             hour, minute = map(int, time_str.split(':'))
 
-            day_map = {'monday': 'mon', 'tuesday': 'tue', 'wednesday': 'wed', 'thursday': 'thu', 'friday': 'fri', 'saturday': 'sat', 'sunday': 'sun'}
-            day_of_week = day_map.get(day.lower(), 'sun')
+            day_of_week = _DAY_MAP.get(day.lower(), 'sun')
 
             self.scheduler.add_job(self._weekly_job, CronTrigger(day_of_week=day_of_week, hour=hour, minute=minute, timezone=self.timezone), id='weekly_trending', name='Weekly Trending Push', replace_existing=True)
             logger.info(f"Registered weekly job at {day} {time_str} ({self.timezone})")
@@ -269,6 +421,9 @@ class TrendingScheduler:
 
     def start(self) -> None:
         """启动调度器"""
+        self._shutdown_event.clear()
+        if self.db_manager:
+            self._ensure_history_writer()
         self._register_jobs()
         self.scheduler.start()
         self._is_running = True
@@ -278,11 +433,10 @@ class TrendingScheduler:
 
     def stop(self) -> None:
         """停止调度器"""
+        self._shutdown_event.set()
         self.scheduler.shutdown()
         self._is_running = False
-        if self._shared_executor:
-            self._shared_executor.shutdown(wait=False)
-            self._shared_executor = None
+        self._stop_history_writer()
         logger.info("Scheduler stopped")
 
     def _print_next_run_times(self) -> None:
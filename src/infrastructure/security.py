@@ -1,12 +1,20 @@
 import os
+import re
 import base64
 import secrets
-from typing import Optional
+import threading
+import jwt
+from typing import List, Optional
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from loguru import logger
 
+try:
+    import re2
+except ImportError:
+    re2 = None
+
 # Get encryption key from environment or use a default (INSECURE for production)
 _APP_KEY = os.getenv("APP_SECRET_KEY")
 _SALT = os.getenv("APP_KEY_SALT")
@@ -19,7 +27,20 @@ _SALT = _SALT.encode()
 # Generate random key for development (different each startup for security)
 _DEV_SECRET_KEY = secrets.token_bytes(32)
 
+# Derived Fernet instance (key inputs are fixed after import, so derive once)
+_FERNET_CACHE: Optional[Fernet] = None
+_CACHE_LOCK = threading.Lock()
+
 def _get_fernet() -> Fernet:
+    """Get the cached Fernet instance, deriving it on first use"""
+    global _FERNET_CACHE
+    if _FERNET_CACHE is None:
+        with _CACHE_LOCK:
+            if _FERNET_CACHE is None:
+                _FERNET_CACHE = _derive_fernet()
+    return _FERNET_CACHE
+
+def _derive_fernet() -> Fernet:
     """Generate Fernet instance from APP_SECRET_KEY"""
     if not _APP_KEY:
         if os.getenv("ENVIRONMENT") == "production":
@@ -38,27 +59,62 @@ def _get_fernet() -> Fernet:
     key = base64.urlsafe_b64encode(kdf.derive(key_material))
     return Fernet(key)
 
-def encrypt_sensitive(data: str) -> str:
-    """Encrypt sensitive string"""
-    if not data:
-        return data
+def encrypt_bytes(data: bytes) -> bytes:
+    """Encrypt bytes to a Fernet token (bytes in, bytes out, no text encoding)"""
     try:
-        f = _get_fernet()
-        return f.encrypt(data.encode()).decode()
+        return _get_fernet().encrypt(data)
     except Exception as e:
         logger.error(f"Encryption failed: {e}")
         raise
 
+def decrypt_bytes(token: bytes) -> bytes:
+    """Decrypt a Fernet token produced by encrypt_bytes"""
+    try:
+        return _get_fernet().decrypt(token)
+    except Exception as e:
+        logger.error(f"Decryption failed: {e}")
+        raise
+
+def encrypt_sensitive(data: str) -> str:
+    """Encrypt sensitive string (str wrapper around encrypt_bytes)"""
+    if not data:
+        return data
+    return encrypt_bytes(data.encode()).decode()
+
 def decrypt_sensitive(encrypted_data: str) -> str:
-    """Decrypt sensitive string"""
+    """Decrypt sensitive string (str wrapper around decrypt_bytes)"""
     if not encrypted_data:
         return encrypted_data
+    return decrypt_bytes(encrypted_data.encode()).decode()
+
+def encrypt_sensitive_bytes(data: str) -> bytes:
+    """Encrypt sensitive string to raw token bytes (no base64 text encoding)"""
+    return base64.urlsafe_b64decode(encrypt_bytes(data.encode()))
+
+def decrypt_sensitive_bytes(encrypted_data: bytes) -> str:
+    """Decrypt raw token bytes produced by encrypt_sensitive_bytes"""
+    return decrypt_bytes(base64.urlsafe_b64encode(encrypted_data)).decode()
+
+def encrypt_sensitive_many(values: List[Optional[str]]) -> List[Optional[bytes]]:
+    """Encrypt a batch of sensitive strings to raw bytes with a single key derivation"""
+    if all(v is None for v in values):
+        return list(values)
     try:
         f = _get_fernet()
-        return f.decrypt(encrypted_data.encode()).decode()
+        return [base64.urlsafe_b64decode(f.encrypt(v.encode())) if v is not None else None for v in values]
     except Exception as e:
-        logger.error(f"Decryption failed: {e}")
-        # If decryption fails, raise exception
+        logger.error(f"Batch encryption failed: {e}")
+        raise
+
+def decrypt_sensitive_many(encrypted_values: List[Optional[bytes]]) -> List[Optional[str]]:
+    """Decrypt a batch of raw token bytes with a single key derivation"""
+    if all(v is None for v in encrypted_values):
+        return list(encrypted_values)
+    try:
+        f = _get_fernet()
+        return [f.decrypt(base64.urlsafe_b64encode(v)).decode() if v is not None else None for v in encrypted_values]
+    except Exception as e:
+        logger.error(f"Batch decryption failed: {e}")
         raise
 
 class Sanitizer:
@@ -71,32 +127,46 @@ class Sanitizer:
         r'(sk-[a-zA-Z0-9]+)',   # OpenAI/DeepSeek Key
     ]
 
+    # Compiled once at class load: (pattern, is key-value pattern).
+    # A malformed pattern fails loudly at import instead of being skipped at runtime.
+    # RE2 (linear-time, no backtracking) is used when google-re2 is installed.
+    _COMPILED_PATTERNS = tuple(
+        (re2.compile("(?i)" + pattern) if re2 is not None else re.compile(pattern, re.IGNORECASE),
+         re.compile(pattern).groups > 1)
+        for pattern in SENSITIVE_PATTERNS
+    )
+
+    # Every pattern needs one of these substrings (case-insensitively) to match.
+    # casefold() is used for the pre-scan because IGNORECASE also matches e.g. U+017F to 's'.
+    _TRIGGERS = ("password", "secret", "token", "key", "pwd", "auth", "@", "ghp_", "sk-")
+
+    @staticmethod
+    def _mask_value(match: "re.Match") -> str:
+        """Key-Value pair (group 1 is key, group 2 is value): keep key, mask value"""
+        return match.group(0).replace(match.group(2), "***")
+
+    @staticmethod
+    def _mask_all(match: "re.Match") -> str:
+        """Single match (e.g. email or token)"""
+        return "***"
+
     @staticmethod
     def sanitize(message: str) -> str:
         """Sanitize sensitive information in string"""
-        import re
         if not message:
             return message
 
+        # Fast path: most log lines contain no trigger at all, skip the regex passes
+        folded = message.casefold()
+        if not any(trigger in folded for trigger in Sanitizer._TRIGGERS):
+            return message
+
         sanitized = message
-        # Basic replacement for common patterns
-        for pattern in Sanitizer.SENSITIVE_PATTERNS:
-            try:
-                # Use a callback to preserve the key but mask the value
-                def replace_callback(match):
-                    full_match = match.group(0)
-                    if len(match.groups()) > 1:
-                        # Key-Value pair (group 1 is key, group 2 is value)
-                        key = match.group(1)
-                        # Keep key, mask value
-                        return full_match.replace(match.group(2), "***")
-                    else:
-                        # Single match (e.g. email or token)
-                        return "***"
-
-                sanitized = re.sub(pattern, replace_callback, sanitized, flags=re.IGNORECASE)
-            except Exception:
-                pass
+        mask_value, mask_all = Sanitizer._mask_value, Sanitizer._mask_all
+        # Apply patterns in order; the order decides how overlapping matches are masked,
+        # so they are not fused into a single alternation
+        for pattern, is_key_value in Sanitizer._COMPILED_PATTERNS:
+            sanitized = pattern.sub(mask_value if is_key_value else mask_all, sanitized)
 
         return sanitized
 
@@ -116,8 +186,6 @@ class Sanitizer:
         Raises:
             Exception: If token is invalid or expired
         """
-        import jwt
-
         # Explicitly require expiration claim and verify it
         options = {
             "verify_signature": True,
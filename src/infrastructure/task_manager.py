@@ -4,40 +4,45 @@
 后台任务管理器
 """
 
-import uuid
+import time
+import secrets
 import threading
-from datetime import datetime
-from typing import Optional, Dict
+from collections import deque
+from types import MappingProxyType
+from typing import Any, Optional, Dict, Deque, Mapping, Tuple
+
+
+def _new_task_id() -> str:
+    """生成 36 位带连字符的随机十六进制 ID（与 UUID 文本格式一致，省去构造 UUID 对象）"""
+    h = secrets.token_hex(16)
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
 
 
 class BackgroundTaskManager:
     """后台任务管理器（线程安全）"""
+
+    _TERMINAL_STATUSES = frozenset(("success", "failed"))
+
     def __init__(self):
         self.tasks: Dict[str, dict] = {}
         self.ttl_seconds = 3600
         self._lock = threading.Lock()
+        # 按结束先后排列的 (task_id, 结束时的 monotonic 时间)，清理时只需从队头弹出
+        self._finished: Deque[Tuple[str, float]] = deque()
 
     def cleanup_expired(self):
         """清理过期任务"""
-        now = datetime.now()
-        expired_keys = []
+        deadline = time.monotonic() - self.ttl_seconds
         with self._lock:
-            for task_id, task_info in self.tasks.items():
-                finished_at = task_info.get("finished_at")
-                if finished_at and task_info["status"] in ("success", "failed"):
-                    try:
-                        finish_time = datetime.fromisoformat(finished_at)
-                        if (now - finish_time).total_seconds() > self.ttl_seconds:
-                            expired_keys.append(task_id)
-                    except (ValueError, TypeError):
-                        pass
-            for key in expired_keys:
-                del self.tasks[key]
+            finished = self._finished
+            while finished and finished[0][1] < deadline:
+                task_id, _ = finished.popleft()
+                self.tasks.pop(task_id, None)
 
     def create_task(self, task_type: str) -> str:
         """创建新任务"""
         self.cleanup_expired()
-        task_id = str(uuid.uuid4())
+        task_id = _new_task_id()
         with self._lock:
             self.tasks[task_id] = {
                 "task_type": task_type,
@@ -52,13 +57,21 @@ class BackgroundTaskManager:
         return task_id
 
     def update_task(self, task_id: str, **kwargs):
-        """更新任务状态"""
-        with self._lock:
-            if task_id in self.tasks:
-                self.tasks[task_id].update(kwargs)
-
-    def get_task(self, task_id: str) -> Optional[dict]:
-        """获取任务信息"""
+        """更新任务状态（写时复制：整体替换任务字典，已发布的字典不再被修改）"""
         with self._lock:
             task = self.tasks.get(task_id)
-            return task.copy() if task else None
+            if task is not None:
+                updated = {**task, **kwargs}
+                self.tasks[task_id] = updated
+                if task["status"] not in self._TERMINAL_STATUSES and updated["status"] in self._TERMINAL_STATUSES:
+                    self._finished.append((task_id, time.monotonic()))
+
+    def get_task(self, task_id: str) -> Optional[Mapping[str, Any]]:
+        """获取任务信息的只读快照（无锁、不复制；单键读取在 GIL 下是原子的）"""
+        task = self.tasks.get(task_id)
+        return MappingProxyType(task) if task else None
+
+    def snapshot_task(self, task_id: str) -> Optional[dict]:
+        """获取任务信息的可修改副本"""
+        task = self.tasks.get(task_id)
+        return task.copy() if task else None
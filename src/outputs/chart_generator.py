@@ -3,6 +3,7 @@
 """
 
 import base64
+import threading
 from io import BytesIO
 from pathlib import Path
 from loguru import logger
@@ -12,9 +13,13 @@ try:
     import matplotlib
     matplotlib.use('Agg')
     import matplotlib.pyplot as plt
+    from matplotlib.figure import Figure
     from matplotlib import font_manager
     import matplotlib.patches as mpatches
     HAS_MATPLOTLIB = True
+    _DEFAULT_SUBPLOT_PARAMS = {
+        name: matplotlib.rcParams[f'figure.subplot.{name}'] for name in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')
+    }
 except ImportError:
     logger.warning("matplotlib not installed, chart generation disabled")
     HAS_MATPLOTLIB = False
@@ -24,6 +29,11 @@ class ChartGenerator:
     """图表生成器"""
 
     def __init__(self):
+        # 所有图表复用同一个 Figure（首次绘图时创建），每次绘图前清空并调整尺寸
+        self._fig: Optional["Figure"] = None
+        self._ax = None
+        # Agg 渲染非线程安全，且各图表共享同一个 Figure，绘图期间加锁
+        self._lock = threading.Lock()
         if HAS_MATPLOTLIB:
             plt.rcParams['figure.figsize'] = (10, 6)
             plt.rcParams['font.size'] = 10
@@ -33,6 +43,34 @@ class ChartGenerator:
             except (KeyError, RuntimeError) as e:
                 logger.warning(f"Chinese font not available, using default: {e}")
 
+    def _prepare_axes(self, width: float, height: float):
+        """清空复用的 Figure、调整尺寸并返回新的 Axes"""
+        if self._fig is None:
+            self._fig = Figure(figsize=(width, height))
+        else:
+            # 饼图的 aspect 等设置会残留在 Axes 上，tight_layout 会改写边距，因此整体清空并恢复默认边距
+            self._fig.clear()
+            self._fig.subplots_adjust(**_DEFAULT_SUBPLOT_PARAMS)
+            self._fig.set_size_inches(width, height)
+        self._ax = self._fig.add_subplot()
+        return self._ax
+
+    def _finish_chart(self, output_path: Optional[str]) -> str:
+        """保存当前图表到文件，或返回 base64 data URI"""
+        self._fig.tight_layout()
+        if output_path:
+            self._fig.savefig(output_path, dpi=100, bbox_inches='tight')
+            return output_path
+        return self._fig_to_base64()
+
+    def close(self) -> None:
+        """释放复用的 Figure"""
+        with self._lock:
+            if self._fig is not None:
+                self._fig.clear()
+                self._fig = None
+                self._ax = None
+
     def generate_growth_chart(self, projects: List[Dict], output_path: Optional[str] = None) -> Optional[str]:
         """生成Stars增长趋势图（柱状图）"""
         if not HAS_MATPLOTLIB:
@@ -45,8 +83,8 @@ class ChartGenerator:
         names = [p['name'].split('/')[-1][:20] for p in projects[:10]]
         growth = [p['total_growth'] for p in projects[:10]]
 
-        fig, ax = plt.subplots(figsize=(12, 6))
-        try:
+        with self._lock:
+            ax = self._prepare_axes(12, 6)
             bars = ax.barh(names, growth, color='#0366d6')
             ax.set_xlabel('Stars Growth')
             ax.set_title('Top 10 Fastest Growing Projects')
@@ -55,15 +93,7 @@ class ChartGenerator:
             for i, (bar, val) in enumerate(zip(bars, growth)):
                 ax.text(val, i, f' {val:,}', va='center', fontsize=9)
 
-            plt.tight_layout()
-
-            if output_path:
-                plt.savefig(output_path, dpi=100, bbox_inches='tight')
-                return output_path
-            else:
-                return self._fig_to_base64()
-        finally:
-            plt.close(fig)
+            return self._finish_chart(output_path)
 
     def generate_language_pie_chart(self, languages: List[Dict], output_path: Optional[str] = None) -> Optional[str]:
         """生成语言分布饼图"""
@@ -80,8 +110,8 @@ class ChartGenerator:
 
         colors = ['#0366d6', '#28a745', '#ffd33d', '#f66a0a', '#6f42c1', '#d73a49', '#24292e', '#586069']
 
-        fig, ax = plt.subplots(figsize=(10, 8))
-        try:
+        with self._lock:
+            ax = self._prepare_axes(10, 8)
             wedges, texts, autotexts = ax.pie(
                 sizes,
                 labels=labels,
@@ -98,15 +128,7 @@ class ChartGenerator:
                 autotext.set_weight('bold')
 
             ax.set_title('Language Distribution by Stars Growth', fontsize=14, pad=20)
-            plt.tight_layout()
-
-            if output_path:
-                plt.savefig(output_path, dpi=100, bbox_inches='tight')
-                return output_path
-            else:
-                return self._fig_to_base64()
-        finally:
-            plt.close(fig)
+            return self._finish_chart(output_path)
 
     def generate_keyword_bar_chart(self, keywords: List[Dict], output_path: Optional[str] = None) -> Optional[str]:
         """生成关键词柱状图"""
@@ -121,8 +143,8 @@ class ChartGenerator:
         words = [kw['keyword'] for kw in top_keywords]
         counts = [kw['count'] for kw in top_keywords]
 
-        fig, ax = plt.subplots(figsize=(12, 7))
-        try:
+        with self._lock:
+            ax = self._prepare_axes(12, 7)
             bars = ax.barh(words, counts, color='#28a745')
             ax.set_xlabel('Frequency')
             ax.set_title('Emerging Technology Keywords')
@@ -131,15 +153,7 @@ class ChartGenerator:
             for i, (bar, val) in enumerate(zip(bars, counts)):
                 ax.text(val, i, f' {val}', va='center', fontsize=9)
 
-            plt.tight_layout()
-
-            if output_path:
-                plt.savefig(output_path, dpi=100, bbox_inches='tight')
-                return output_path
-            else:
-                return self._fig_to_base64()
-        finally:
-            plt.close(fig)
+            return self._finish_chart(output_path)
 
     def generate_category_chart(self, categories: List[Dict], output_path: Optional[str] = None) -> Optional[str]:
         """生成分类占比图"""
@@ -156,8 +170,8 @@ class ChartGenerator:
 
         colors = ['#FF6B6B', '#4ECDC4', '#95E1D3', '#F38181', '#AA96DA', '#FCBAD3', '#FFFFD2', '#A8D8EA', '#FFAAA7', '#FFD3B4']
 
-        fig, ax = plt.subplots(figsize=(10, 8))
-        try:
+        with self._lock:
+            ax = self._prepare_axes(10, 8)
             wedges, texts, autotexts = ax.pie(
                 sizes,
                 labels=labels,
@@ -174,15 +188,7 @@ class ChartGenerator:
                 autotext.set_weight('bold')
 
             ax.set_title('Project Category Distribution', fontsize=14, pad=20)
-            plt.tight_layout()
-
-            if output_path:
-                plt.savefig(output_path, dpi=100, bbox_inches='tight')
-                return output_path
-            else:
-                return self._fig_to_base64()
-        finally:
-            plt.close(fig)
+            return self._finish_chart(output_path)
 
     def generate_all_charts(self, report_data: Dict, output_dir: Optional[str] = None) -> Dict[str, str]:
         """生成所有图表"""
@@ -207,12 +213,10 @@ class ChartGenerator:
         return charts
 
     def _fig_to_base64(self) -> str:
-        """将matplotlib图表转换为base64字符串"""
+        """将当前图表转换为base64字符串"""
         buffer = BytesIO()
-        plt.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.read()).decode('utf-8')
-        plt.close()
+        self._fig.savefig(buffer, format='png', dpi=100, bbox_inches='tight')
+        image_base64 = base64.b64encode(buffer.getbuffer()).decode('utf-8')
         return f"data:image/png;base64,{image_base64}"
 
 
@@ -3,19 +3,25 @@
 """
 
 import datetime
+import functools
+import hashlib
+import itertools
 import os
 import html
 import smtplib
+import threading
 import markdown
 import bleach
 from pathlib import Path
 from loguru import logger
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 
 import re
-from ..constants import MAX_EMAIL_PROJECTS
+from ..constants import (
+    MAX_EMAIL_PROJECTS, MARKDOWN_CACHE_SIZE, MARKDOWN_DISK_CACHE_MAX_FILES, MARKDOWN_DISK_CACHE_PRUNE_INTERVAL
+)
 from ..infrastructure.security import decrypt_sensitive
 
 # 允许的HTML标签（用于Markdown渲染）
@@ -24,9 +30,113 @@ ALLOWED_ATTRIBUTES = {'a': ['href', 'title'], 'code': ['class']}
 # 颜色验证正则
 COLOR_PATTERN = re.compile(r'^#[0-9a-fA-F]{6}$')
 
+_EMAIL_TEMPLATE_PATH = Path("templates/email_template.html")
+
+
+def _safe_color(raw_color: str) -> str:
+    """仅允许 #RRGGBB 颜色值"""
+    return raw_color if COLOR_PATTERN.match(raw_color) else "#999999"
+
+
+# 项目卡片 HTML 模板（模块级常量，每张卡片只做一次 format_map 填充）
+_TAGS_WRAPPER_FMT = '<div style="display: flex; flex-wrap: wrap; gap: 6px; margin: 8px 0;">{}</div>'
+_TAG_FMT = '<span style="background: {color}; color: white; padding: 2px 8px; border-radius: 12px; font-size: 11px; font-weight: 500;">{icon} {name}</span>'
+_CARD_FMT = {
+    'inline': '''
+                    <div style="background: #f6f8fa; border: 1px solid #e1e4e8; border-radius: 6px; padding: 16px; margin-bottom: 12px;">
+                        <div style="margin-bottom: 8px;">
+                            <span style="background: #0366d6; color: white; padding: 2px 8px; border-radius: 3px; font-size: 12px; margin-right: 8px;">#{idx}</span>
+                            <a href="{url}" style="color: #0366d6; text-decoration: none; font-size: 16px; font-weight: 600;">{name}</a>
+                        </div>
+                        {tags_html}
+                        <p style="color: #24292e; margin: 8px 0; font-size: 14px;">{description}</p>
+                        <div style="color: #28a745; margin: 8px 0; font-size: 14px; font-style: italic;">{ai_summary_html}</div>
+                        <div style="font-size: 12px; color: #586069;">
+                            <span style="margin-right: 16px;">Language: {language}</span>
+                            <span style="margin-right: 16px;">Stars: {stars:,}</span>
+                            <span>+{stars_period:,} stars</span>
+                        </div>
+                    </div>
+            ''',
+    'template': '''
+            <div style="background: #ffffff; border: 1px solid #e1e4e8; border-radius: 6px; padding: 16px; margin-bottom: 12px;">
+                <div style="display: flex; align-items: center; margin-bottom: 8px;">
+                    <span style="background: #0366d6; color: white; padding: 2px 8px; border-radius: 3px; font-size: 12px; margin-right: 8px;">#{idx}</span>
+                    <a href="{url}" style="color: #0366d6; text-decoration: none; font-size: 18px; font-weight: 600;">{name}</a>
+                </div>
+                {tags_html}
+                <p style="color: #586069; margin: 8px 0; font-size: 14px;">{description}</p>
+                <div style="color: #24292e; margin: 12px 0; font-size: 14px; background-color: #f6f8fa; padding: 12px; border-radius: 4px;">
+                    {ai_summary_html}
+                </div>
+                <div style="display: flex; gap: 16px; font-size: 12px; color: #586069;">
+                    <span>Language: {language}</span>
+                    <span>Stars: {stars:,}</span>
+                    <span>+{stars_period:,} this {time_range}</span>
+                </div>
+            </div>
+            ''',
+}
+
+# Markdown 渲染结果磁盘缓存（跨进程重启复用），文件名为渲染规则 + 原文的 blake2b 摘要
+_MD_CACHE_DIR = Path("data/md_cache")
+# 允许的标签/属性或 markdown/bleach 版本变化时摘要随之变化，旧缓存（含旧版清理结果）自然失效
+_MD_CACHE_SALT = repr((ALLOWED_TAGS, ALLOWED_ATTRIBUTES, markdown.__version__, bleach.__version__)).encode('utf-8')
+_md_cache_writes = itertools.count(1)
+
+
+def _prune_md_cache() -> None:
+    """缓存文件超过上限时按修改时间删除最旧的文件"""
+    try:
+        entries = [(entry.stat().st_mtime, entry.path) for entry in os.scandir(_MD_CACHE_DIR) if entry.name.endswith('.html')]
+    except OSError:
+        return
+    excess = len(entries) - MARKDOWN_DISK_CACHE_MAX_FILES
+    if excess <= 0:
+        return
+    entries.sort()
+    for _, path in entries[:excess]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+@functools.lru_cache(maxsize=MARKDOWN_CACHE_SIZE)
+def _render_md(md_text: str) -> str:
+    """Markdown 转为经过 XSS 清理的 HTML（进程内按原文缓存，未命中时查磁盘缓存）"""
+    if not md_text:
+        return ''
+    digest = hashlib.blake2b(_MD_CACHE_SALT, digest_size=16)
+    digest.update(md_text.encode('utf-8'))
+    cache_path = _MD_CACHE_DIR / f"{digest.hexdigest()}.html"
+    try:
+        return cache_path.read_text(encoding='utf-8')
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.debug(f"Failed to read markdown cache {cache_path}: {e}")
+
+    rendered = bleach.clean(markdown.markdown(md_text), tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True)
+
+    try:
+        _MD_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(rendered, encoding='utf-8')
+        os.replace(tmp_path, cache_path)
+        if next(_md_cache_writes) % MARKDOWN_DISK_CACHE_PRUNE_INTERVAL == 0:
+            _prune_md_cache()
+    except OSError as e:
+        logger.debug(f"Failed to write markdown cache {cache_path}: {e}")
+    return rendered
+
+
 class EmailSender:
     """邮件发送器"""
 
+    # 模板路径 -> ((st_mtime_ns, st_size), 模板内容)
+    _TEMPLATE_CACHE: Dict[Path, Tuple[Tuple[int, int], str]] = {}
+
     def __init__(self, config: Dict[str, Any]):
         """初始化邮件发送器"""
         email_config = config.get('email', {})
@@ -57,6 +167,80 @@ class EmailSender:
         # 过滤掉空的收件人
         self.recipients = [r for r in self.recipients if r and 'example.com' not in r]
 
+        # 复用的 SMTP 连接（首次发送时建立，close() 时断开），锁保证同一时刻只有一个线程使用
+        self._smtp: Optional[smtplib.SMTP] = None
+        self._smtp_lock = threading.Lock()
+
+    def __enter__(self) -> "EmailSender":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """断开复用的 SMTP 连接"""
+        with self._smtp_lock:
+            self._drop_smtp(quit_server=True)
+
+    def _drop_smtp(self, quit_server: bool = False) -> None:
+        """丢弃当前连接（调用方需持有 _smtp_lock）"""
+        server, self._smtp = self._smtp, None
+        if server is None:
+            return
+        try:
+            if quit_server:
+                server.quit()
+            else:
+                server.close()
+        except (smtplib.SMTPException, OSError):
+            pass
+
+    def _connect_smtp(self) -> smtplib.SMTP:
+        """建立新的 SMTP 连接并登录"""
+        logger.info(f"Connecting to SMTP server {self.smtp_server}:{self.smtp_port}...")
+        # 智能判断SSL/TLS模式
+        if self.smtp_port == 465:
+            # 端口465通常使用隐式SSL
+            server = smtplib.SMTP_SSL(self.smtp_server, self.smtp_port)
+        else:
+            # 端口587(Gmail等)使用显式TLS (STARTTLS)
+            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        try:
+            if self.smtp_port != 465:
+                server.starttls()
+            server.login(self.sender, self.password)
+        except BaseException:
+            server.close()
+            raise
+        return server
+
+    def _get_smtp(self) -> smtplib.SMTP:
+        """获取复用的 SMTP 连接：NOOP 探活，失效则重连（调用方需持有 _smtp_lock）"""
+        server = self._smtp
+        if server is not None:
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._drop_smtp()
+        self._smtp = self._connect_smtp()
+        return self._smtp
+
+    def _sendmail(self, msg: MIMEMultipart) -> None:
+        """通过复用连接发送一封邮件，连接在发送途中被服务器断开时重连重发一次"""
+        with self._smtp_lock:
+            server = self._get_smtp()
+            try:
+                server.sendmail(self.sender, self.recipients, msg.as_string())
+            except smtplib.SMTPServerDisconnected:
+                self._drop_smtp()
+                self._get_smtp().sendmail(self.sender, self.recipients, msg.as_string())
+            except BaseException:
+                # 其他错误后连接状态未知，下次重新建立
+                self._drop_smtp()
+                raise
+
     def _generate_card_html(self, repo: Dict[str, Any], idx: int, time_range: str, style: str = 'template') -> str:
         """Generate HTML card for a single repository (shared by template and inline methods)
 
@@ -64,75 +248,43 @@ class EmailSender:
             repo: Repository data dictionary
             idx: Card index number
             time_range: Time range (daily/weekly/monthly)
-            style: Card style ('template' or 'inline')
+            style: Card style ('template' or 'inline'), selects the format string in _CARD_FMT;
+                any other value falls back to 'template'
 
         Returns:
             HTML string for the repository card
         """
-        stars_key = f'stars_{time_range}'
-        stars_period = repo.get(stars_key, 0)
+        stars_period = repo.get(f'stars_{time_range}', 0)
 
         # Markdown to HTML with XSS prevention
-        ai_summary_md = repo.get('ai_summary', '')
-        ai_summary_html = bleach.clean(markdown.markdown(ai_summary_md), tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES, strip=True)
+        ai_summary_html = _render_md(repo.get('ai_summary') or '')
 
         # Generate tags HTML with XSS prevention
         tags_html = ""
         tags = repo.get('tags', [])
         if tags:
-            tags_html = '<div style="display: flex; flex-wrap: wrap; gap: 6px; margin: 8px 0;">'
-            for tag in tags:
-                raw_color = tag.get("color", "#999")
-                safe_color = raw_color if COLOR_PATTERN.match(raw_color) else "#999999"
-                safe_icon = html.escape(tag.get("icon", ""))
-                safe_name = html.escape(tag.get("name", ""))
-                tags_html += f'<span style="background: {safe_color}; color: white; padding: 2px 8px; border-radius: 12px; font-size: 11px; font-weight: 500;">{safe_icon} {safe_name}</span>'
-            tags_html += '</div>'
-
-        # Escape all user input to prevent XSS
-        safe_url = html.escape(repo.get('url', '#'))
-        safe_name = html.escape(repo.get('name', 'Unknown'))
-        safe_description = html.escape(repo.get('description', 'No description'))
-        safe_language = html.escape(repo.get('language', 'Unknown'))
-        stars = repo.get('stars', 0)
-
-        # Generate HTML based on style
-        if style == 'inline':
-            return f'''
-                    <div style="background: #f6f8fa; border: 1px solid #e1e4e8; border-radius: 6px; padding: 16px; margin-bottom: 12px;">
-                        <div style="margin-bottom: 8px;">
-                            <span style="background: #0366d6; color: white; padding: 2px 8px; border-radius: 3px; font-size: 12px; margin-right: 8px;">#{idx}</span>
-                            <a href="{safe_url}" style="color: #0366d6; text-decoration: none; font-size: 16px; font-weight: 600;">{safe_name}</a>
-                        </div>
-                        {tags_html}
-                        <p style="color: #24292e; margin: 8px 0; font-size: 14px;">{safe_description}</p>
-                        <div style="color: #28a745; margin: 8px 0; font-size: 14px; font-style: italic;">{ai_summary_html}</div>
-                        <div style="font-size: 12px; color: #586069;">
-                            <span style="margin-right: 16px;">Language: {safe_language}</span>
-                            <span style="margin-right: 16px;">Stars: {stars:,}</span>
-                            <span>+{stars_period:,} stars</span>
-                        </div>
-                    </div>
-            '''
-        else:  # template style
-            return f'''
-            <div style="background: #ffffff; border: 1px solid #e1e4e8; border-radius: 6px; padding: 16px; margin-bottom: 12px;">
-                <div style="display: flex; align-items: center; margin-bottom: 8px;">
-                    <span style="background: #0366d6; color: white; padding: 2px 8px; border-radius: 3px; font-size: 12px; margin-right: 8px;">#{idx}</span>
-                    <a href="{safe_url}" style="color: #0366d6; text-decoration: none; font-size: 18px; font-weight: 600;">{safe_name}</a>
-                </div>
-                {tags_html}
-                <p style="color: #586069; margin: 8px 0; font-size: 14px;">{safe_description}</p>
-                <div style="color: #24292e; margin: 12px 0; font-size: 14px; background-color: #f6f8fa; padding: 12px; border-radius: 4px;">
-                    {ai_summary_html}
-                </div>
-                <div style="display: flex; gap: 16px; font-size: 12px; color: #586069;">
-                    <span>Language: {safe_language}</span>
-                    <span>Stars: {stars:,}</span>
-                    <span>+{stars_period:,} this {time_range}</span>
-                </div>
-            </div>
-            '''
+            tags_html = _TAGS_WRAPPER_FMT.format(''.join([
+                _TAG_FMT.format(
+                    color=_safe_color(tag.get("color", "#999")),
+                    icon=html.escape(tag.get("icon", "")),
+                    name=html.escape(tag.get("name", ""))
+                )
+                for tag in tags
+            ]))
+
+        # Escape all user input to prevent XSS; unknown styles fall back to the template card
+        return _CARD_FMT.get(style, _CARD_FMT['template']).format_map({
+            'idx': idx,
+            'url': html.escape(repo.get('url', '#')),
+            'name': html.escape(repo.get('name', 'Unknown')),
+            'tags_html': tags_html,
+            'description': html.escape(repo.get('description', 'No description')),
+            'ai_summary_html': ai_summary_html,
+            'language': html.escape(repo.get('language', 'Unknown')),
+            'stars': repo.get('stars', 0),
+            'stars_period': stars_period,
+            'time_range': time_range,
+        })
 
     def send_trending_email(self, trending_data: List[Dict[str, Any]], time_range: str) -> bool:
         """
@@ -164,13 +316,28 @@ class EmailSender:
 
         return f"GitHub {range_name} Trending - {today}"
 
+    @classmethod
+    def _load_template(cls, template_path: Path) -> Optional[str]:
+        """读取邮件模板（按 mtime/大小缓存，文件未变化时不再读取），文件不存在时返回 None"""
+        try:
+            stat = template_path.stat()
+        except FileNotFoundError:
+            return None
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        entry = cls._TEMPLATE_CACHE.get(template_path)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+
+        template = template_path.read_text(encoding='utf-8')
+        cls._TEMPLATE_CACHE[template_path] = (signature, template)
+        return template
+
     def _render_html(self, data: List[Dict[str, Any]], time_range: str) -> str:
         """渲染HTML邮件内容"""
         # 尝试加载模板文件
-        template_path = Path("templates/email_template.html")
-        if template_path.exists():
-            with open(template_path, 'r', encoding='utf-8') as f:
-                template = f.read()
+        template = self._load_template(_EMAIL_TEMPLATE_PATH)
+        if template is not None:
             return self._fill_template(template, data, time_range)
 
         # 使用内置模板
@@ -182,9 +349,10 @@ class EmailSender:
         range_names_cn = {'daily': '每日', 'weekly': '每周', 'monthly': '每月'}
 
         # 生成项目卡片HTML（使用重构后的方法）
-        cards_html = ""
-        for idx, repo in enumerate(data[:MAX_EMAIL_PROJECTS], 1):
-            cards_html += self._generate_card_html(repo, idx, time_range, style='template')
+        cards_html = ''.join([
+            self._generate_card_html(repo, idx, time_range, style='template')
+            for idx, repo in enumerate(data[:MAX_EMAIL_PROJECTS], 1)
+        ])
 
         # 替换模板变量
         result = template.replace("{{TITLE}}", f"GitHub {range_names.get(time_range, 'Daily')} Trending")
@@ -217,8 +385,10 @@ class EmailSender:
                     <p style="color: #586069; margin-bottom: 20px;">Found {len(data)} trending repositories</p>
         '''
 
-        for idx, repo in enumerate(data[:MAX_EMAIL_PROJECTS], 1):
-            html += self._generate_card_html(repo, idx, time_range, style='inline')
+        html += ''.join([
+            self._generate_card_html(repo, idx, time_range, style='inline')
+            for idx, repo in enumerate(data[:MAX_EMAIL_PROJECTS], 1)
+        ])
 
         html += '''
                 </div>
@@ -232,32 +402,19 @@ class EmailSender:
 
         return html
 
+    def _build_message(self, subject: str, html_content: str) -> MIMEMultipart:
+        """构造 HTML 邮件"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = self.sender
+        msg['To'] = ', '.join(self.recipients)
+        msg.attach(MIMEText(html_content, 'html', 'utf-8'))
+        return msg
+
     def _send_email(self, subject: str, html_content: str) -> bool:
         """发送邮件"""
         try:
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = self.sender
-            msg['To'] = ', '.join(self.recipients)
-
-            html_part = MIMEText(html_content, 'html', 'utf-8')
-            msg.attach(html_part)
-
-            logger.info(f"Connecting to SMTP server {self.smtp_server}:{self.smtp_port}...")
-
-            # 智能判断SSL/TLS模式，使用上下文管理器确保连接正确关闭
-            if self.smtp_port == 465:
-                # 端口465通常使用隐式SSL
-                with smtplib.SMTP_SSL(self.smtp_server, self.smtp_port) as server:
-                    server.login(self.sender, self.password)
-                    server.sendmail(self.sender, self.recipients, msg.as_string())
-            else:
-                # 端口587(Gmail等)使用显式TLS (STARTTLS)
-                with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
-                    server.starttls()
-                    server.login(self.sender, self.password)
-                    server.sendmail(self.sender, self.recipients, msg.as_string())
-
+            self._sendmail(self._build_message(subject, html_content))
             logger.info(f"Email sent successfully to {len(self.recipients)} recipient(s)")
             return True
 
@@ -272,6 +429,14 @@ class EmailSender:
             logger.error(f"Failed to send email: {e}")
             return False
 
+    def send_many(self, messages: List[Tuple[str, str]]) -> int:
+        """
+        批量发送邮件，复用同一个 SMTP 连接
+        :param messages: (主题, HTML 内容) 列表
+        :return: 发送成功的邮件数量
+        """
+        return sum(self._send_email(subject, html_content) for subject, html_content in messages)
+
 
 def create_mailer(config: Dict[str, Any]) -> EmailSender:
     """创建邮件发送器实例"""
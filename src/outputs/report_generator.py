@@ -7,6 +7,56 @@ from pathlib import Path
 from loguru import logger
 from typing import Dict, Optional
 
+# 报告片段 HTML 模板（模块级常量，循环内只做 format_map 填充）
+_STAT_CARD_FMT = '''
+            <div class="stat-card">
+                <div class="stat-value">{value}</div>
+                <div class="stat-label">{label}</div>
+                {growth_html}
+            </div>
+            '''
+_STAT_GROWTH_FMT = '<div class="stat-growth {cls}">{symbol} {pct:.1f}% vs previous period</div>'
+
+_PROJECT_ROW_FMT = '''
+            <li class="project-item">
+                <div class="project-header">
+                    <div class="project-rank">{idx}</div>
+                    <a href="{url}" class="project-name" target="_blank">{name}</a>
+                </div>
+                <p style="color: #586069; margin: 5px 0 10px 47px;">{description}...</p>
+                <div class="project-stats">
+                    <span>⭐ {total_stars:,} stars</span>
+                    <span>📈 +{total_growth:,} growth</span>
+                    <span>💻 {language}</span>
+                    <span>📊 {appearances} appearances</span>
+                </div>
+            </li>
+            '''
+
+_KEYWORD_TAG_FMT = '<span class="keyword-tag">{keyword} ({count})</span>'
+
+_COMPARISON_CARD_FMT = '''
+        <div class="comparison-card">
+            <h3>{title} ({start_date} ~ {end_date})</h3>
+            <div class="comparison-item">
+                <span>Total Projects</span>
+                <strong>{total_projects}</strong>
+            </div>
+            <div class="comparison-item">
+                <span>Total Stars</span>
+                <strong>{total_stars:,}</strong>
+            </div>
+            <div class="comparison-item">
+                <span>Stars Growth</span>
+                <strong>{total_growth:,}</strong>
+            </div>
+            <div class="comparison-item">
+                <span>Avg Stars/Project</span>
+                <strong>{avg_stars:,}</strong>
+            </div>
+        </div>
+        '''
+
 
 class ReportGenerator:
     """报告生成器"""
@@ -77,8 +127,6 @@ class ReportGenerator:
         current = comparison['current_period']['stats']
         growth = comparison['growth_rate']
 
-        cards = []
-
         stats = [
             ('Total Projects', current['total_projects'], growth.get('total_projects', 0)),
             ('Total Stars', f"{current['total_stars']:,}", growth.get('total_stars', 0)),
@@ -86,110 +134,49 @@ class ReportGenerator:
             ('Avg Stars/Project', f"{current['avg_stars']:,}", growth.get('avg_stars', 0))
         ]
 
-        for label, value, growth_val in stats:
-            growth_class = 'positive' if growth_val > 0 else 'negative' if growth_val < 0 else ''
-            growth_symbol = '↑' if growth_val > 0 else '↓' if growth_val < 0 else '→'
-            growth_html = f'<div class="stat-growth {growth_class}">{growth_symbol} {abs(growth_val):.1f}% vs previous period</div>' if growth_val != 0 else ''
-
-            card = f'''
-            <div class="stat-card">
-                <div class="stat-value">{value}</div>
-                <div class="stat-label">{label}</div>
-                {growth_html}
-            </div>
-            '''
-            cards.append(card)
+        return ''.join([
+            _STAT_CARD_FMT.format(value=value, label=label, growth_html=self._growth_html(growth_val))
+            for label, value, growth_val in stats
+        ])
 
-        return ''.join(cards)
+    @staticmethod
+    def _growth_html(growth_val: float) -> str:
+        """生成环比变化HTML（无变化时为空）"""
+        if growth_val > 0:
+            return _STAT_GROWTH_FMT.format(cls='positive', symbol='↑', pct=growth_val)
+        if growth_val < 0:
+            return _STAT_GROWTH_FMT.format(cls='negative', symbol='↓', pct=-growth_val)
+        return ''
 
     def _generate_top_projects_html(self, projects: list) -> str:
         """生成Top项目列表HTML"""
-        items = []
-        for idx, proj in enumerate(projects[:10], 1):
-            # 转义所有用户输入防止XSS
-            safe_url = html.escape(proj['url'])
-            safe_name = html.escape(proj['name'])
-            safe_description = html.escape(proj['description'][:150])
-            safe_language = html.escape(proj['language'])
-
-            item = f'''
-            <li class="project-item">
-                <div class="project-header">
-                    <div class="project-rank">{idx}</div>
-                    <a href="{safe_url}" class="project-name" target="_blank">{safe_name}</a>
-                </div>
-                <p style="color: #586069; margin: 5px 0 10px 47px;">{safe_description}...</p>
-                <div class="project-stats">
-                    <span>⭐ {proj['total_stars']:,} stars</span>
-                    <span>📈 +{proj['total_growth']:,} growth</span>
-                    <span>💻 {safe_language}</span>
-                    <span>📊 {proj['appearances']} appearances</span>
-                </div>
-            </li>
-            '''
-            items.append(item)
-
-        return ''.join(items)
+        escape = html.escape
+        # 转义所有用户输入防止XSS
+        return ''.join([
+            _PROJECT_ROW_FMT.format_map({
+                'idx': idx,
+                'url': escape(proj['url']),
+                'name': escape(proj['name']),
+                'description': escape(proj['description'][:150]),
+                'total_stars': proj['total_stars'],
+                'total_growth': proj['total_growth'],
+                'language': escape(proj['language']),
+                'appearances': proj['appearances'],
+            })
+            for idx, proj in enumerate(projects[:10], 1)
+        ])
 
     def _generate_keyword_tags(self, keywords: list) -> str:
         """生成关键词标签HTML"""
-        tags = []
-        for kw in keywords:
-            safe_keyword = html.escape(kw["keyword"])
-            tag = f'<span class="keyword-tag">{safe_keyword} ({kw["count"]})</span>'
-            tags.append(tag)
-        return ''.join(tags)
+        escape = html.escape
+        return ''.join([_KEYWORD_TAG_FMT.format(keyword=escape(kw["keyword"]), count=kw["count"]) for kw in keywords])
 
     def _generate_comparison_cards(self, comparison: Dict) -> str:
         """生成对比卡片HTML"""
-        current = comparison['current_period']
-        previous = comparison['previous_period']
-
-        current_card = f'''
-        <div class="comparison-card">
-            <h3>Current Period ({current['start_date']} ~ {current['end_date']})</h3>
-            <div class="comparison-item">
-                <span>Total Projects</span>
-                <strong>{current['stats']['total_projects']}</strong>
-            </div>
-            <div class="comparison-item">
-                <span>Total Stars</span>
-                <strong>{current['stats']['total_stars']:,}</strong>
-            </div>
-            <div class="comparison-item">
-                <span>Stars Growth</span>
-                <strong>{current['stats']['total_growth']:,}</strong>
-            </div>
-            <div class="comparison-item">
-                <span>Avg Stars/Project</span>
-                <strong>{current['stats']['avg_stars']:,}</strong>
-            </div>
-        </div>
-        '''
-
-        previous_card = f'''
-        <div class="comparison-card">
-            <h3>Previous Period ({previous['start_date']} ~ {previous['end_date']})</h3>
-            <div class="comparison-item">
-                <span>Total Projects</span>
-                <strong>{previous['stats']['total_projects']}</strong>
-            </div>
-            <div class="comparison-item">
-                <span>Total Stars</span>
-                <strong>{previous['stats']['total_stars']:,}</strong>
-            </div>
-            <div class="comparison-item">
-                <span>Stars Growth</span>
-                <strong>{previous['stats']['total_growth']:,}</strong>
-            </div>
-            <div class="comparison-item">
-                <span>Avg Stars/Project</span>
-                <strong>{previous['stats']['avg_stars']:,}</strong>
-            </div>
-        </div>
-        '''
-
-        return current_card + previous_card
+        return ''.join([
+            _COMPARISON_CARD_FMT.format_map({**period['stats'], 'title': title, 'start_date': period['start_date'], 'end_date': period['end_date']})
+            for title, period in (('Current Period', comparison['current_period']), ('Previous Period', comparison['previous_period']))
+        ])
 
 
 def create_report_generator() -> ReportGenerator:
@@ -9,7 +9,7 @@ import asyncio
 from datetime import datetime
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
@@ -22,6 +22,7 @@ from fastapi import Security
 from ..core.database import DatabaseManager
 from ..core.data_repository import DataRepository
 from ..infrastructure.health_monitor import HealthMonitor
+from ..infrastructure.http_client import close_session
 from ..core.trending_push import TrendingPush
 from ..infrastructure.scheduler import TrendingScheduler
 from ..infrastructure.config_manager import ConfigManager
@@ -183,6 +184,10 @@ async def lifespan(app: FastAPI):
     if hasattr(app.state, 'trending_push'):
         await app.state.trending_push.close()
 
+    if hasattr(app.state, 'health_monitor'):
+        await app.state.health_monitor.aclose()
+    await close_session()
+
 
 async def _execute_task_background(app: FastAPI, task_id: str, task_type: str, is_startup: bool = False):
     """后台执行任务"""
@@ -323,10 +328,15 @@ async def health_check(request: Request):
     """健康检查端点"""
     try:
         health_monitor = request.app.state.health_monitor
-        health_result = await health_monitor.check_all()
+        health_result, etag = await health_monitor.check_all_with_etag()
+        etag = f'"{etag}"'
+        # 不健康时始终返回 503（带 ETag），使探针在故障期间不会因条件请求收到 3xx
         if health_result['status'] == 'unhealthy':
-            return JSONResponse(status_code=503, content=health_result)
-        return health_result
+            return JSONResponse(status_code=503, content=health_result, headers={"ETag": etag})
+        # 结果未变化（命中缓存）时返回 304，省去序列化与响应体
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
+        return JSONResponse(status_code=200, content=health_result, headers={"ETag": etag})
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         return JSONResponse(status_code=503, content={"status": "unhealthy", "error": "Health check failed"})
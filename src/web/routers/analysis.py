@@ -1,5 +1,4 @@
 """Analysis endpoints router"""
-import json
 from fastapi import APIRouter, Request, Depends, Path, HTTPException
 from fastapi.responses import StreamingResponse
 from loguru import logger
@@ -10,6 +9,17 @@ from ..schemas import AnalysisResponse
 from ...core.services.trending_service import TrendingService
 from ...analyzers.async_ai_summarizer import AsyncAISummarizer
 
+try:
+    import orjson
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    import json
+
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, ensure_ascii=False)
+
 router = APIRouter(prefix="/api/analysis", tags=["Analysis"])
 limiter = Limiter(key_func=get_remote_address)
 
@@ -69,7 +79,7 @@ async def get_detailed_analysis_stream(
     repo_data = service.get_repository_data(owner, repo)
     if not repo_data:
         async def error_generator():
-            yield f"event: error\ndata: {json.dumps({'message': f'Repository {owner}/{repo} not found'})}\n\n"
+            yield f"event: error\ndata: {_json_dumps({'message': f'Repository {owner}/{repo} not found'})}\n\n"
         return StreamingResponse(error_generator(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Accel-Buffering": "no"})
 
     async def event_generator():
@@ -77,13 +87,13 @@ async def get_detailed_analysis_stream(
             summarizer = get_ai_summarizer()
             async for event in summarizer.generate_detailed_report_stream(repo_data):
                 event_type = event.get('event', 'message')
-                event_data = json.dumps(event.get('data', {}), ensure_ascii=False)
+                event_data = _json_dumps(event.get('data', {}))
                 yield f"event: {event_type}\ndata: {event_data}\n\n"
         except HTTPException as e:
             logger.warning(f"HTTP exception in stream for {repo_data['name']}: {e.detail}")
-            yield f"event: error\ndata: {json.dumps({'message': e.detail})}\n\n"
+            yield f"event: error\ndata: {_json_dumps({'message': e.detail})}\n\n"
         except Exception as e:
             logger.error(f"Unexpected error in stream for {repo_data['name']}: {e}", exc_info=True)
-            yield f"event: error\ndata: {json.dumps({'message': 'Internal server error'})}\n\n"
+            yield f"event: error\ndata: {_json_dumps({'message': 'Internal server error'})}\n\n"
 
     return StreamingResponse(event_generator(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "Connection": "keep-alive", "X-Accel-Buffering": "no"})
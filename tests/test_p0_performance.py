@@ -25,6 +25,7 @@ class TestP0Performance:
         """Create DataRepository with mocked DatabaseManager"""
         db_manager = MagicMock(spec=DatabaseManager)
         db_manager.get_session.return_value.__enter__.return_value = db_session
+        db_manager.get_read_session.return_value.__enter__.return_value = db_session
         return DataRepository(db_manager)
 
     def test_n_plus_1_query_elimination(self, db_session, data_repo):
@@ -92,3 +93,19 @@ class TestP0Performance:
         print(f"Total queries executed: {query_count}")
         assert query_count < 10, f"Too many queries executed: {query_count}. N+1 problem might exist."
 
+
+    def test_save_ai_summaries_bulk(self, db_session, data_repo):
+        """Verify bulk summary save resolves repositories in one query and updates latest_summary_id"""
+        for i in range(3):
+            db_session.add(Repository(name=f"owner/bulk-{i}", url=f"https://github.com/owner/bulk-{i}"))
+        db_session.commit()
+
+        rows = [(f"owner/bulk-{i}", f"Summary {i}", "deepseek") for i in range(3)]
+        rows.append(("owner/missing", "Summary", "deepseek"))
+
+        saved = data_repo.save_ai_summaries_bulk(rows)
+        db_session.commit()
+
+        assert saved == 3
+        assert db_session.query(AISummary).count() == 3
+        assert data_repo.get_latest_summary("owner/bulk-2") == "Summary 2"
@@ -4,7 +4,7 @@ from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 
 # Import app modules
-from src.infrastructure.security import Sanitizer, encrypt_sensitive, decrypt_sensitive
+from src.infrastructure.security import Sanitizer, encrypt_sensitive, decrypt_sensitive, encrypt_sensitive_many, decrypt_sensitive_many, decrypt_sensitive_bytes, encrypt_bytes, decrypt_bytes
 from src.web.api import app
 
 client = TestClient(app)
@@ -51,6 +51,19 @@ class TestP0Security:
         assert encrypt_sensitive("") == ""
         assert decrypt_sensitive("") == ""
 
+        # Bytes-native primitives interoperate with the str wrappers
+        assert decrypt_bytes(encrypt_bytes(b"\x00raw")) == b"\x00raw"
+        assert decrypt_bytes(encrypted.encode()) == original.encode()
+
+    def test_batch_encryption_decryption(self):
+        """Test batch encryption round trip to raw bytes preserves None"""
+        originals = ["alpha", "", None, "beta"]
+        encrypted = encrypt_sensitive_many(originals)
+
+        assert isinstance(encrypted[0], bytes) and encrypted[2] is None
+        assert decrypt_sensitive_bytes(encrypted[0]) == "alpha"
+        assert decrypt_sensitive_many(encrypted) == originals
+
     def test_jwt_secret_enforcement_in_production(self):
         """Test that application refuses to start in production without valid JWT_SECRET"""
         with patch.dict(os.environ, {"ENVIRONMENT": "production", "JWT_SECRET": "dev-insecure-secret-change-in-production"}):
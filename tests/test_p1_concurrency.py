@@ -46,9 +46,9 @@ class TestP1Concurrency:
                  with patch("urllib.robotparser.RobotFileParser.can_fetch", return_value=True):
                     checker.can_fetch(url)
 
-        # 验证 LRU 缓存限制生效 (maxsize=128 on _get_parser)
-        # lru_cache 会自动淘汰旧条目，验证缓存信息
-        cache_info = checker._get_parser.cache_info()
-        assert cache_info.maxsize == 128, f"Expected maxsize=128, got {cache_info.maxsize}"
+        # 验证 LRU 缓存限制生效 (CACHE_MAXSIZE=128)
+        assert checker.CACHE_MAXSIZE == 128, f"Expected maxsize=128, got {checker.CACHE_MAXSIZE}"
         # 200 requests should result in 128 cached + 72 evicted
-        assert cache_info.currsize <= 128, f"Cache size {cache_info.currsize} exceeds maxsize"
+        cache_size = len(checker._parser_cache)
+        assert cache_size <= 128, f"Cache size {cache_size} exceeds maxsize"
+        assert "https://site199.com" in checker._parser_cache
@@ -3,9 +3,10 @@
 """Database and DataRepository 单元测试"""
 
 import pytest
+from unittest.mock import patch
 from datetime import datetime, timezone
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from src.core.models import Base, Repository, TrendingRecord
 from src.core.database import DatabaseManager
 from src.core.data_repository import DataRepository
@@ -56,6 +57,16 @@ class TestDatabaseManager:
             count = session.query(Repository).filter_by(name="test/rollback").count()
             assert count == 0
 
+    def test_read_session_does_not_commit(self, in_memory_db):
+        """测试只读会话走 AUTOCOMMIT 读引擎且不提交事务"""
+        with patch.object(Session, 'commit') as commit_spy:
+            with in_memory_db.get_read_session() as session:
+                assert session.info['readonly'] is True
+                assert session.get_bind().get_execution_options()['isolation_level'] == 'AUTOCOMMIT'
+                assert session.query(Repository).count() == 0
+                assert session.connection().get_execution_options()['isolation_level'] == 'AUTOCOMMIT'
+        commit_spy.assert_not_called()
+
 
 class TestDataRepository:
     """DataRepository 测试类"""
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""TrendingScheduler 任务历史写后队列单元测试"""
+
+import pytest
+from unittest.mock import patch
+from src.core.models import TaskHistory
+from src.core.database import DatabaseManager
+from src.infrastructure.scheduler import TrendingScheduler
+
+
+@pytest.fixture
+def file_db(tmp_path):
+    """创建文件数据库（写线程与测试线程需要看到同一个库）"""
+    db = DatabaseManager(db_path=str(tmp_path / "history.db"))
+    db.init_db()
+    yield db
+    db.close()
+
+
+@pytest.fixture
+def scheduler(file_db):
+    """不启用任何定时任务的调度器"""
+    config = {'scheduler': {name: {'enabled': False} for name in ('daily', 'weekly', 'monthly')}}
+    scheduler = TrendingScheduler(config, db_manager=file_db)
+    yield scheduler
+    scheduler._stop_history_writer()
+
+
+def _history_rows(db):
+    with db.get_read_session() as session:
+        return [(h.task_type, h.task_id, h.status, h.error_message, h.finished_at is not None)
+                for h in session.query(TaskHistory).order_by(TaskHistory.id)]
+
+
+class TestTaskHistoryWriter:
+    """任务历史写后队列测试类"""
+
+    def test_start_end_pair_is_stored(self, scheduler, file_db):
+        """测试开始/结束记录合并写入同一行"""
+        handle = scheduler.record_task_start('daily', 'task-1')
+        scheduler.record_task_end(handle, False, 'boom')
+        scheduler._stop_history_writer()
+
+        assert _history_rows(file_db) == [('daily', 'task-1', 'failed', 'boom', True)]
+        assert scheduler._history_ids == {}
+
+    def test_failed_batch_is_retried(self, scheduler, file_db):
+        """测试写入失败的批次保留并重试，结束记录不会被当作找不到而丢弃"""
+        real_get_session = file_db.get_session
+        calls = []
+
+        def flaky_get_session():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError("database is locked")
+            return real_get_session()
+
+        with patch.object(file_db, 'get_session', side_effect=flaky_get_session):
+            handle = scheduler.record_task_start('weekly', 'task-2')
+            scheduler.record_task_end(handle, True)
+            scheduler._stop_history_writer()
+
+        assert len(calls) >= 2
+        assert _history_rows(file_db) == [('weekly', 'task-2', 'success', None, True)]
+        assert scheduler._history_pending == []
+
+    def test_stop_flushes_queue(self, scheduler, file_db):
+        """测试 stop() 立即写入队列中的记录，不等待攒批间隔"""
+        with patch('src.infrastructure.scheduler.TASK_HISTORY_FLUSH_INTERVAL', 60):
+            scheduler.start()
+            handle = scheduler.record_task_start('monthly', 'task-3')
+            scheduler.record_task_end(handle, True)
+            scheduler.stop()
+
+        assert _history_rows(file_db) == [('monthly', 'task-3', 'success', None, True)]
+        assert scheduler._history_writer is None